@@ -0,0 +1,75 @@
+"""Blockly Demo: Add access buckets
+
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""A script to get all Xml entries in the datastore for Blockly demos
+and record each one in the AccessBucket for the day it was last accessed.
+This also seeds the stats counters (see stats.py) for those entries.
+
+Expiration only looks at AccessBucket rows, so this must be run once after
+deploying access buckets, or entries saved before then will never expire.
+Entries without a last_accessed time are recorded as accessed today.
+
+Auth: `gcloud auth login`
+
+Set the correct project: `gcloud config set project blockly-demo`
+
+See the current project: `gcloud config get-value project`
+
+Start a venv: `python3 -m venv venv && source venv/bin/activate`
+Inside your vm run `pip install google-cloud-ndb`
+Run the script: `python3 add_access_buckets.py`
+"""
+
+from google.cloud import ndb
+from storage import (Access, Xml, addToBucket, bucketId, contentSize,
+                     getContents)
+import collections
+import datetime
+
+PAGE_SIZE = 1000
+
+def handle_results(results):
+  today = datetime.datetime.utcnow().date()
+  accesses = ndb.get_multi([ndb.Key(Access, x.key.string_id()) for x in results])
+  buckets = collections.defaultdict(dict)
+  contents = getContents(results)
+  for x, access, content in zip(results, accesses, contents):
+    if access is not None:
+      # Already read since access buckets were deployed.
+      continue
+    xml_key = x.key.string_id()
+    day = x.last_accessed.date() if x.last_accessed else today
+    buckets[(bucketId(day, xml_key), day)][xml_key] = contentSize(content)
+  for (bucket_id, day), sizes in buckets.items():
+    addToBucket(bucket_id, day, sizes)
+
+def run_query():
+  client = ndb.Client()
+  with client.context():
+    query = Xml.query()
+    cursor = None
+    more = True
+    page_count = 0
+    result_count = 0
+    while more:
+      results, cursor, more = query.fetch_page(PAGE_SIZE, start_cursor=cursor)
+      handle_results(results)
+      page_count += 1
+      result_count += len(results)
+      print(f'{datetime.datetime.now().strftime("%I:%M:%S %p")} : page {page_count} : {result_count}')
+
+run_query()
@@ -0,0 +1,275 @@
+"""Blockly Demo: Block statistics
+
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""A script to stream every Xml entry in the datastore for Blockly demos
+and tabulate which block types are used, how large the saved workspaces
+are, and how deeply their blocks are nested.
+
+The corpus is read one page at a time.  Each page is handed to a pool of
+worker processes which parse the XML (with iterparse) or JSON content of
+every row and return small per-row summaries.  Only the block type counts
+and the depth histogram are kept across pages, so memory use is bounded by
+PAGE_SIZE * MAX_PENDING_PAGES rows no matter how large the datastore is.
+
+Three Parquet files are written to the output directory:
+  workspaces.parquet   - one row per entry: key, format, bytes, blocks,
+                         top_blocks, max_depth.
+  block_types.parquet  - block type, total uses, number of workspaces.
+  depths.parquet       - max nesting depth, number of workspaces.
+
+Auth: `gcloud auth login`
+
+Set the correct project: `gcloud config set project blockly-demo`
+
+See the current project: `gcloud config get-value project`
+
+Start a venv: `python3 -m venv venv && source venv/bin/activate`
+Inside your vm run `pip install google-cloud-ndb pyarrow`
+Run the script: `python3 block_stats.py [output_dir]`
+"""
+
+import collections
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+PAGE_SIZE = 1000
+# Pages handed to the pool but not yet collected.  Bounds memory use.
+MAX_PENDING_PAGES = 4
+
+WORKSPACE_COLUMNS = ["key", "format", "bytes", "blocks", "top_blocks",
+                     "max_depth"]
+
+
+def _local_name(tag):
+  # Strip any "{namespace}" prefix from an element tag.
+  return tag.rpartition("}")[2]
+
+
+def xml_stats(xml_content):
+  """Summarize Blockly XML without building the whole tree.
+
+  Depth counts the value and statement inputs a block is nested in, so a
+  top-level block is at depth 1 and blocks joined by <next> share a depth.
+
+  Returns:
+    A (types, blocks, top_blocks, max_depth) tuple, where types is a
+    Counter of block types.
+  """
+  types = collections.Counter()
+  top_blocks = 0
+  max_depth = 0
+  depth = 1
+  # Number of open <block> elements.
+  open_blocks = 0
+  source = io.BytesIO(xml_content.encode("utf-8"))
+  for event, elem in ET.iterparse(source, events=("start", "end")):
+    tag = _local_name(elem.tag)
+    if event == "start":
+      if tag == "block":
+        types[elem.get("type")] += 1
+        if not open_blocks:
+          top_blocks += 1
+        open_blocks += 1
+        max_depth = max(max_depth, depth)
+      elif tag in ("value", "statement"):
+        depth += 1
+    else:
+      if tag == "block":
+        open_blocks -= 1
+      elif tag in ("value", "statement"):
+        depth -= 1
+      # Discard finished subtrees to keep memory flat.
+      elem.clear()
+  return types, sum(types.values()), top_blocks, max_depth
+
+
+def json_stats(json_content):
+  """Summarize Blockly JSON serialization.
+
+  Uses the same depth rules as xml_stats.  The block tree is walked with an
+  explicit stack so deeply nested programs cannot hit the recursion limit.
+
+  Returns:
+    A (types, blocks, top_blocks, max_depth) tuple, where types is a
+    Counter of block types.
+  """
+  types = collections.Counter()
+  max_depth = 0
+  state = json.loads(json_content)
+  top = state.get("blocks", {}).get("blocks", [])
+  stack = [(block, 1) for block in top]
+  while stack:
+    block, depth = stack.pop()
+    types[block.get("type")] += 1
+    max_depth = max(max_depth, depth)
+    for connection in (block.get("inputs") or {}).values():
+      if connection.get("block"):
+        stack.append((connection["block"], depth + 1))
+    next_connection = block.get("next") or {}
+    if next_connection.get("block"):
+      stack.append((next_connection["block"], depth))
+  return types, sum(types.values()), len(top), max_depth
+
+
+def content_stats(key, content):
+  # Summarize one stored entry, which may be either XML or JSON.
+  content = content or ""
+  size = len(content.encode("utf-8"))
+  stripped = content.lstrip()
+  try:
+    if stripped.startswith("{"):
+      fmt = "json"
+      types, blocks, top_blocks, max_depth = json_stats(stripped)
+    else:
+      fmt = "xml"
+      types, blocks, top_blocks, max_depth = xml_stats(stripped)
+  except (ValueError, AttributeError, TypeError, KeyError, ET.ParseError):
+    # Malformed XML or JSON, or JSON that isn't shaped like a workspace.
+    return [key, "invalid", size, 0, 0, 0], collections.Counter()
+  return [key, fmt, size, blocks, top_blocks, max_depth], types
+
+
+def page_stats(page):
+  """Summarize a page of (key, content) pairs in a worker process.
+
+  Returns:
+    A (rows, types, workspace_types) tuple: one WORKSPACE_COLUMNS row per
+    entry, a Counter of block uses and a Counter of workspaces using each
+    block type.
+  """
+  rows = []
+  types = collections.Counter()
+  workspace_types = collections.Counter()
+  for key, content in page:
+    row, entry_types = content_stats(key, content)
+    rows.append(row)
+    types.update(entry_types)
+    workspace_types.update(entry_types.keys())
+  return rows, types, workspace_types
+
+
+class StatsWriter:
+  # Accumulates page summaries and streams per-workspace rows to Parquet.
+
+  def __init__(self, output_dir):
+    # Imported here so the parsing helpers above can be used without it.
+    import pyarrow
+    import pyarrow.parquet
+    self.pa = pyarrow
+    self.pq = pyarrow.parquet
+    self.output_dir = output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    self.schema = pyarrow.schema([
+        ("key", pyarrow.string()),
+        ("format", pyarrow.string()),
+        ("bytes", pyarrow.int64()),
+        ("blocks", pyarrow.int64()),
+        ("top_blocks", pyarrow.int64()),
+        ("max_depth", pyarrow.int64()),
+    ])
+    self.writer = pyarrow.parquet.ParquetWriter(
+        os.path.join(output_dir, "workspaces.parquet"), self.schema)
+    self.types = collections.Counter()
+    self.workspace_types = collections.Counter()
+    self.depths = collections.Counter()
+
+  def add(self, rows, types, workspace_types):
+    columns = list(zip(*rows)) if rows else [[]] * len(WORKSPACE_COLUMNS)
+    # Each page becomes one row group, so rows are never held for long.
+    self.writer.write_table(self.pa.Table.from_arrays(
+        [self.pa.array(column, type=field.type)
+         for column, field in zip(columns, self.schema)],
+        schema=self.schema))
+    self.types.update(types)
+    self.workspace_types.update(workspace_types)
+    self.depths.update(row[5] for row in rows)
+
+  def close(self):
+    self.writer.close()
+    block_types = sorted(self.types.items(), key=lambda x: (-x[1], x[0] or ""))
+    self.pq.write_table(self.pa.table({
+        "type": [t for t, _ in block_types],
+        "count": [c for _, c in block_types],
+        "workspaces": [self.workspace_types[t] for t, _ in block_types],
+    }), os.path.join(self.output_dir, "block_types.parquet"))
+    depths = sorted(self.depths.items())
+    self.pq.write_table(self.pa.table({
+        "max_depth": [d for d, _ in depths],
+        "workspaces": [c for _, c in depths],
+    }), os.path.join(self.output_dir, "depths.parquet"))
+
+
+def fetch_pages():
+  # Yield the corpus as lists of (key, content) pairs, one page at a time.
+  from google.cloud import ndb
+  from storage import Xml, getContents
+  client = ndb.Client()
+  with client.context():
+    query = Xml.query()
+    cursor = None
+    more = True
+    while more:
+      results, cursor, more = query.fetch_page(PAGE_SIZE, start_cursor=cursor)
+      keys = [x.key.string_id() for x in results]
+      yield list(zip(keys, getContents(results)))
+
+
+def run_stats(output_dir, pages=None, processes=None):
+  """Stream pages through a process pool and write the statistics.
+
+  Args:
+    output_dir: Directory for the Parquet files.
+    pages: Iterable of (key, content) lists.  Defaults to the datastore.
+    processes: Pool size.  Defaults to the number of CPUs.
+
+  Returns:
+    The number of entries processed.
+  """
+  if pages is None:
+    pages = fetch_pages()
+  writer = StatsWriter(output_dir)
+  pending = collections.deque()
+  page_count = 0
+  result_count = 0
+
+  def collect():
+    nonlocal page_count, result_count
+    rows, types, workspace_types = pending.popleft().get()
+    writer.add(rows, types, workspace_types)
+    page_count += 1
+    result_count += len(rows)
+    print(f'{datetime.datetime.now().strftime("%I:%M:%S %p")} : page {page_count} : {result_count}')
+
+  with multiprocessing.Pool(processes) as pool:
+    for page in pages:
+      pending.append(pool.apply_async(page_stats, (page,)))
+      # Pool.imap would drain the whole query; keep only a few pages in flight.
+      if len(pending) >= MAX_PENDING_PAGES:
+        collect()
+    while pending:
+      collect()
+  writer.close()
+  return result_count
+
+
+if __name__ == "__main__":
+  run_stats(sys.argv[1] if len(sys.argv) > 1 else "block_stats")
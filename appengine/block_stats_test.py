@@ -0,0 +1,67 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+"""Tests of block_stats.py.
+
+Run from this directory:  python3 block_stats_test.py
+"""
+
+import collections
+import unittest
+
+from block_stats import content_stats
+
+
+class TestContentStats(unittest.TestCase):
+  def test_xml(self):
+    content = (
+        '<xml xmlns="https://developers.google.com/blockly/xml">'
+        '<block type="a"><value name="V"><block type="b"/></value>'
+        '<next><block type="a"/></next></block>'
+        '<block type="c"/></xml>')
+    self.assertEqual(content_stats("k", content),
+                     (["k", "xml", len(content), 4, 2, 2],
+                      collections.Counter({"a": 2, "b": 1, "c": 1})))
+
+  def test_json(self):
+    content = (
+        '{"blocks": {"blocks": [{"type": "a", '
+        '"inputs": {"V": {"block": {"type": "b"}}}, '
+        '"next": {"block": {"type": "a"}}}, {"type": "c"}]}}')
+    self.assertEqual(content_stats("k", content),
+                     (["k", "json", len(content), 4, 2, 2],
+                      collections.Counter({"a": 2, "b": 1, "c": 1})))
+
+  def test_empty(self):
+    self.assertEqual(content_stats("k", None),
+                     (["k", "invalid", 0, 0, 0, 0], collections.Counter()))
+
+  def test_invalid(self):
+    # None of these may abort the run; each is counted as unparseable.
+    for content in ['<xml><block type="a">', '{"blocks": ',
+                    '{"blocks": 5}', '{"blocks": {"blocks": 5}}',
+                    '{"blocks": {"blocks": [5]}}',
+                    '{"blocks": {"blocks": [{"type": ["a"]}]}}',
+                    '{"blocks": {"blocks": [{"inputs": [1]}]}}',
+                    '{"blocks": {"blocks": [{"next": {"block": 5}}]}}']:
+      self.assertEqual(content_stats("k", content),
+                       (["k", "invalid", len(content), 0, 0, 0],
+                        collections.Counter()), content)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,107 @@
+"""Blockly Demo: Deduplication report
+
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""A script to measure how many more duplicates storage.CANONICAL_HASH
+would find in a sample of stored workspaces.
+
+Each entry is hashed twice, once as stored and once after canonicalization,
+and the number of distinct hashes (rows that would have been stored) is
+reported for both.
+
+Run against the datastore (see add_timestamps.py for setup):
+  `python3 dedup_report.py`
+Or against local files, one workspace per file:
+  `python3 dedup_report.py sample/*.xml`
+"""
+
+import hashlib
+import sys
+import storage
+
+# Number of datastore entries to sample.
+SAMPLE_SIZE = 10000
+PAGE_SIZE = 1000
+
+
+def _hash(content):
+  return hashlib.sha1(content.encode("utf-8")).digest()
+
+
+def measure(contents):
+  """Count distinct raw and canonical hashes in an iterable of contents.
+
+  Returns:
+    A dict with the number of entries, the number of rows needed with and
+    without canonicalization, and the bytes those rows would hold.
+  """
+  raw = {}
+  canonical = {}
+  count = 0
+  for content in contents:
+    count += 1
+    size = len(content.encode("utf-8"))
+    raw.setdefault(_hash(content), size)
+    canonical.setdefault(_hash(storage.canonicalize(content)), size)
+  return {
+    "entries": count,
+    "raw_rows": len(raw),
+    "canonical_rows": len(canonical),
+    "raw_bytes": sum(raw.values()),
+    "canonical_bytes": sum(canonical.values()),
+  }
+
+
+def sample_datastore():
+  # Yield up to SAMPLE_SIZE stored workspaces.
+  from google.cloud import ndb
+  client = ndb.Client()
+  with client.context():
+    query = storage.Xml.query()
+    cursor = None
+    more = True
+    fetched = 0
+    while more and fetched < SAMPLE_SIZE:
+      results, cursor, more = query.fetch_page(PAGE_SIZE, start_cursor=cursor)
+      fetched += len(results)
+      yield from storage.getContents(results)
+
+
+def sample_files(filenames):
+  for filename in filenames:
+    with open(filename, encoding="utf-8") as f:
+      yield f.read()
+
+
+def report(stats):
+  saved_rows = stats["raw_rows"] - stats["canonical_rows"]
+  saved_bytes = stats["raw_bytes"] - stats["canonical_bytes"]
+  print(f'Entries sampled: {stats["entries"]}')
+  print(f'Rows stored, hashing raw content: {stats["raw_rows"]}')
+  print(f'Rows stored, hashing canonical content: {stats["canonical_rows"]}')
+  if stats["raw_rows"]:
+    print(f'Rows saved: {saved_rows} '
+          f'({100.0 * saved_rows / stats["raw_rows"]:.1f}%)')
+  if stats["raw_bytes"]:
+    print(f'Bytes saved: {saved_bytes} '
+          f'({100.0 * saved_bytes / stats["raw_bytes"]:.1f}%)')
+
+
+if __name__ == "__main__":
+  if len(sys.argv) > 1:
+    report(measure(sample_files(sys.argv[1:])))
+  else:
+    report(measure(sample_datastore()))
@@ -20,6 +20,7 @@ limitations under the License.
 __author__ = "fenichel@google.com (Rachel Fenichel)"
 
 
+import stats
 import storage
 import datetime
 
@@ -27,19 +28,56 @@ from google.cloud import ndb
 
 
 EXPIRATION_DAYS = 365
-# Limit the query to avoid timeouts.
-QUERY_LIMIT = 1000
+# Limit the number of buckets handled per request to avoid timeouts.
+BUCKET_LIMIT = 16
 
 def delete_expired():
-  """Deletes entries that have not been accessed in more than a year."""
-  bestBefore = datetime.datetime.utcnow() - datetime.timedelta(days=EXPIRATION_DAYS)
+  """Deletes entries that have not been accessed in more than a year.
+
+  Reads are recorded in per-day AccessBucket rows, so this walks the buckets
+  older than the cutoff (in key order, no property index needed) and deletes
+  every member that hasn't been recorded in a newer bucket since, along
+  with any fragments that no other row uses.
+  """
+  bestBefore = (datetime.datetime.utcnow().date() -
+                datetime.timedelta(days=EXPIRATION_DAYS))
   client = ndb.Client()
+  deleted = 0
   with client.context():
-    query = storage.Xml.query(storage.Xml.last_accessed < bestBefore)
-    results = query.fetch(limit=QUERY_LIMIT, keys_only=True)
-    for x in results:
-      x.delete()
-  return len(results)
+    cutoff = ndb.Key(storage.AccessBucket, bestBefore.isoformat())
+    query = storage.AccessBucket.query(storage.AccessBucket.key < cutoff)
+    bucket_keys = query.fetch(limit=BUCKET_LIMIT, keys_only=True)
+    for bucket in ndb.get_multi(bucket_keys):
+      if bucket is None:
+        continue
+      accesses = ndb.get_multi(
+          [ndb.Key(storage.Access, k) for k in bucket.keys])
+      xml_keys = []
+      keys = []
+      deltas = {}
+      for k, access in zip(bucket.keys, accesses):
+        if access is not None and access.day > bucket.day:
+          # Read again since; a newer bucket holds this key.
+          continue
+        xml_keys.append(ndb.Key(storage.Xml, k))
+        if access is None:
+          continue
+        keys.append(ndb.Key(storage.Access, k))
+        size = access.size or 0
+        # Take the row out of the stats counters.
+        for name, delta in (("rows", -1), ("bytes", -size),
+                            (stats.size_counter(size), -1),
+                            (stats.access_counter(access.day), -1)):
+          deltas[name] = deltas.get(name, 0) + delta
+      # The rows are needed for the fragments they use, which are released
+      # only once the rows are gone.
+      rows = ndb.get_multi(xml_keys)
+      ndb.delete_multi(xml_keys + keys)
+      storage.releaseFragments(rows)
+      stats.increment(deltas)
+      bucket.key.delete()
+      deleted += len(xml_keys)
+  return deleted
 
 
 def app(environ, start_response):
@@ -0,0 +1,193 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""Split stored workspaces into top-level block stacks and back again.
+
+A workspace is split into a shell, which is the original text with a marker
+in place of each top-level block stack, and the text of each stack.  Every
+piece is cut from the original text, so joining them gives back exactly the
+text that was saved, byte for byte.
+"""
+
+import hashlib
+import json
+import json.decoder
+import xml.parsers.expat
+
+
+# Stands in for a block stack cut out of a workspace.  NUL is not allowed
+# anywhere in an XML document, nor unescaped in JSON, so it can't collide
+# with content.
+FRAGMENT_MARKER = "\0"
+
+_DECODER = json.JSONDecoder()
+
+
+def splitXmlStacks(xml_content):
+  # Find the top-level <block> elements of an XML workspace.
+  # Returns the list of (start, end) offsets of each stack, or None if the
+  # content can't be parsed.
+  data = xml_content.encode("utf-8")
+  parser = xml.parsers.expat.ParserCreate()
+  depth = 0
+  spans = []
+  start = None
+  # True until anything is found inside the element that was started last.
+  empty = False
+
+  def startElement(name, attrs):
+    nonlocal depth, start, empty
+    depth += 1
+    empty = True
+    if depth == 2 and name.rpartition(":")[2] == "block":
+      start = parser.CurrentByteIndex
+
+  def characterData(text):
+    nonlocal empty
+    empty = False
+
+  def endElement(name):
+    nonlocal depth, start, empty
+    if depth == 2 and start is not None:
+      end = parser.CurrentByteIndex
+      # An empty element tag (<block/>) ends at the index, just past "/>".
+      # Otherwise the index is at this element's end tag, which is included.
+      if not (empty and data.endswith(b"/>", start, end)):
+        if not data.startswith(b"</" + name.encode("utf-8"), end):
+          raise ValueError("Unexpected end of " + name)
+        end = data.index(b">", end) + 1
+      spans.append((start, end))
+      start = None
+    empty = False
+    depth -= 1
+
+  parser.StartElementHandler = startElement
+  parser.CharacterDataHandler = characterData
+  parser.EndElementHandler = endElement
+  try:
+    parser.Parse(data, True)
+  except (xml.parsers.expat.ExpatError, ValueError):
+    return None
+  return _charSpans(data, spans)
+
+
+def _charSpans(data, spans):
+  # Convert byte offsets into UTF-8 data to offsets into the decoded text.
+  result = []
+  last = 0
+  offset = 0
+  for start, end in spans:
+    offset += len(data[last:start].decode("utf-8"))
+    length = len(data[start:end].decode("utf-8"))
+    result.append((offset, offset + length))
+    offset += length
+    last = end
+  return result
+
+
+def _skipSpace(text, pos):
+  return json.decoder.WHITESPACE.match(text, pos).end()
+
+
+def _objectValue(text, pos, key):
+  # Find the value of key in the JSON object starting at pos.
+  # Returns its (start, end) offsets, or None if the object has no such key.
+  # As in json.loads, the last of any repeated keys wins.
+  if not text.startswith("{", pos):
+    return None
+  found = None
+  pos = _skipSpace(text, pos + 1)
+  if text.startswith("}", pos):
+    return None
+  while True:
+    name, pos = _DECODER.raw_decode(text, pos)
+    pos = _skipSpace(text, pos)
+    if not (isinstance(name, str) and text.startswith(":", pos)):
+      raise ValueError("Expecting a key")
+    start = _skipSpace(text, pos + 1)
+    end = _DECODER.raw_decode(text, start)[1]
+    if name == key:
+      found = (start, end)
+    pos = _skipSpace(text, end)
+    if text.startswith("}", pos):
+      return found
+    if not text.startswith(",", pos):
+      raise ValueError("Expecting ','")
+    pos = _skipSpace(text, pos + 1)
+
+
+def _arrayItems(text, pos):
+  # Return the (start, end) offsets of each item of the JSON array at pos.
+  spans = []
+  pos = _skipSpace(text, pos + 1)
+  if text.startswith("]", pos):
+    return spans
+  while True:
+    end = _DECODER.raw_decode(text, pos)[1]
+    spans.append((pos, end))
+    pos = _skipSpace(text, end)
+    if text.startswith("]", pos):
+      return spans
+    pos = _skipSpace(text, pos + 1)
+
+
+def splitJsonStacks(json_content):
+  # Find the top-level blocks of a JSON workspace.
+  # Returns the list of (start, end) offsets of each stack, or None if the
+  # content isn't a JSON workspace with a list of blocks.
+  try:
+    state = json.loads(json_content)
+    if not isinstance(state["blocks"]["blocks"], list):
+      return None
+    pos = _skipSpace(json_content, 0)
+    blocks = _objectValue(json_content, pos, "blocks")
+    blocks = _objectValue(json_content, blocks[0], "blocks")
+    return _arrayItems(json_content, blocks[0])
+  except (ValueError, TypeError, KeyError):
+    return None
+
+
+def splitStacks(content):
+  # Split XML or JSON content into a shell and its top-level block stacks.
+  # Returns None if the content can't be split.
+  if FRAGMENT_MARKER in content:
+    return None
+  if content.lstrip().startswith("{"):
+    spans = splitJsonStacks(content)
+  else:
+    spans = splitXmlStacks(content)
+  if spans is None:
+    return None
+  shell = []
+  stacks = []
+  last = 0
+  for start, end in spans:
+    shell.append(content[last:start])
+    stacks.append(content[start:end])
+    last = end
+  shell.append(content[last:])
+  return FRAGMENT_MARKER.join(shell), stacks
+
+
+def joinStacks(shell, stacks):
+  # Reverse of splitStacks.
+  parts = shell.split(FRAGMENT_MARKER)
+  return "".join(part + stack for part, stack in zip(parts, stacks)) + parts[-1]
+
+
+def fragmentHash(content):
+  return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
@@ -0,0 +1,86 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""Tests of fragments.py.
+
+Run from this directory:  python3 fragments_test.py
+"""
+
+import unittest
+
+from fragments import FRAGMENT_MARKER, joinStacks, splitStacks
+
+
+class TestSplitStacks(unittest.TestCase):
+  def assertSplit(self, content, stacks):
+    shell, found = splitStacks(content)
+    self.assertEqual(found, stacks)
+    self.assertEqual(shell.count(FRAGMENT_MARKER), len(stacks))
+    self.assertEqual(joinStacks(shell, found), content)
+
+  def test_xml(self):
+    self.assertSplit(
+        '<xml xmlns="https://developers.google.com/blockly/xml">\n'
+        '  <variables><variable id="v">x</variable></variables>\n'
+        '  <block type="a" x="1" y="2"><next><block type="b"/></next></block>\n'
+        '  <block type="c"></block>\n'
+        '</xml>',
+        ['<block type="a" x="1" y="2"><next><block type="b"/></next></block>',
+         '<block type="c"></block>'])
+
+  def test_xml_self_closing(self):
+    self.assertSplit('<xml><block type="d"/></xml>', ['<block type="d"/>'])
+    self.assertSplit('<xml><block type="d" /><block type="e"/></xml>',
+                     ['<block type="d" />', '<block type="e"/>'])
+    self.assertSplit('<xml><block type="a"><field name="F">/</field></block>'
+                     '<block type="b"><next/></block></xml>',
+                     ['<block type="a"><field name="F">/</field></block>',
+                      '<block type="b"><next/></block>'])
+
+  def test_xml_non_ascii(self):
+    self.assertSplit('<xml><!-- é --><block type="t">'
+                     '<field name="TEXT">héllo ✓</field></block></xml>',
+                     ['<block type="t"><field name="TEXT">héllo ✓</field>'
+                      '</block>'])
+
+  def test_json(self):
+    self.assertSplit(
+        '{\n  "blocks": {\n    "languageVersion": 0,\n    "blocks": [\n'
+        '      {"type": "a", "x": 1, "next": {"block": {"type": "b"}}},\n'
+        '      {"type" : "c", "fields": {"TEXT": "]}, \\u00e9"}}\n'
+        '    ]\n  },\n  "variables": []\n}',
+        ['{"type": "a", "x": 1, "next": {"block": {"type": "b"}}}',
+         '{"type" : "c", "fields": {"TEXT": "]}, \\u00e9"}}'])
+
+  def test_json_repeated_key(self):
+    # json.loads uses the last value of a repeated key, and so must this.
+    self.assertSplit('{"blocks": {"blocks": [1]}, "blocks": {"blocks": [{}]}}',
+                     ['{}'])
+
+  def test_empty(self):
+    self.assertSplit('<xml></xml>', [])
+    self.assertSplit('{"blocks": {"blocks": []}}', [])
+
+  def test_unsplittable(self):
+    self.assertIsNone(splitStacks('<xml><block></xml>'))
+    self.assertIsNone(splitStacks('{"blocks": {"blocks": {}}}'))
+    self.assertIsNone(splitStacks('{"blocks": []}'))
+    self.assertIsNone(splitStacks('{"variables": []}'))
+    self.assertIsNone(splitStacks('<xml>' + FRAGMENT_MARKER + '</xml>'))
+
+
+if __name__ == '__main__':
+  unittest.main()
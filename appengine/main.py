@@ -16,6 +16,7 @@ limitations under the License.
 
 import storage
 import expiration
+import stats
 
 
 # Route to requested handler.
@@ -26,6 +27,8 @@ def app(environ, start_response):
     return storage.app(environ, start_response)
   if environ["PATH_INFO"] == "/expiration":
     return expiration.app(environ, start_response)
+  if environ["PATH_INFO"] == "/stats":
+    return stats.app(environ, start_response)
   start_response("404 Not Found", [])
   return [b"Page not found."]
 
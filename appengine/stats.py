@@ -0,0 +1,139 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+"""Storage statistics kept in sharded counters.
+
+Counters are updated as rows are stored, read and expired, so totals never
+require a scan of the Xml kind.  Counter names:
+  rows                - number of stored Xml rows.
+  bytes               - total size of their content as saved, in UTF-8 bytes.
+  size:<upper bound>  - rows whose size is below the bound (or "max").
+  access:<YYYY-MM-DD> - rows last read on that day.
+"""
+
+import datetime
+import json
+import random
+
+from google.cloud import ndb
+
+
+# Number of entities per counter.  Each update touches one random shard,
+# so this is roughly how many concurrent updates a counter can absorb.
+COUNTER_SHARDS = 8
+
+# Upper bounds (exclusive) of the content size histogram, in bytes.
+SIZE_BOUNDS = [1024, 4096, 16384, 65536, 262144, 1048576]
+
+# Upper bounds (exclusive) of the last access age histogram, in days.
+AGE_BOUNDS = [1, 7, 30, 90, 180, 365]
+
+
+class Counter(ndb.Model):
+  # One shard of a named counter.  The id is "name/shard".
+  name = ndb.StringProperty(indexed=False)
+  value = ndb.IntegerProperty(default=0, indexed=False)
+
+
+def size_counter(size):
+  # Name of the histogram counter for a row of the given size.
+  for bound in SIZE_BOUNDS:
+    if size < bound:
+      return "size:%d" % bound
+  return "size:max"
+
+
+def access_counter(day):
+  # Name of the counter for rows last read on the given day.
+  return "access:" + day.isoformat()
+
+
+@ndb.transactional()
+def increment(deltas):
+  """Add to several counters at once.
+
+  All counters in one call are updated in the same (random) shard, so a
+  batch costs a single transaction.  Joins any enclosing transaction.
+
+  Args:
+    deltas: Dictionary mapping counter names to amounts.
+  """
+  deltas = {name: delta for name, delta in deltas.items() if delta}
+  if not deltas:
+    return
+  shard = random.randint(0, COUNTER_SHARDS - 1)
+  keys = [ndb.Key(Counter, "%s/%d" % (name, shard)) for name in deltas]
+  counters = ndb.get_multi(keys)
+  updated = []
+  for key, counter, (name, delta) in zip(keys, counters, deltas.items()):
+    if counter is None:
+      counter = Counter(key=key, name=name)
+    counter.value += delta
+    updated.append(counter)
+  ndb.put_multi(updated)
+
+
+def get_counters():
+  # Sum the shards of every counter.  The Counter kind holds a few thousand
+  # small entities at most, so this is cheap compared to scanning Xml.
+  totals = {}
+  for counter in Counter.query().fetch():
+    totals[counter.name] = totals.get(counter.name, 0) + counter.value
+  return totals
+
+
+def get_stats(today=None):
+  """Summarize the counters.
+
+  Returns:
+    Dictionary with total rows and bytes, a size histogram and a last
+    access age histogram.  Histogram keys are labels such as "<1024".
+  """
+  today = today or datetime.datetime.utcnow().date()
+  counters = get_counters()
+  sizes = {}
+  for bound in SIZE_BOUNDS:
+    sizes["<%d" % bound] = counters.get("size:%d" % bound, 0)
+  sizes[">=%d" % SIZE_BOUNDS[-1]] = counters.get("size:max", 0)
+  ages = {"<%d" % bound: 0 for bound in AGE_BOUNDS}
+  ages[">=%d" % AGE_BOUNDS[-1]] = 0
+  for name, value in counters.items():
+    if not name.startswith("access:"):
+      continue
+    age = (today - datetime.date.fromisoformat(name[len("access:"):])).days
+    label = ">=%d" % AGE_BOUNDS[-1]
+    for bound in AGE_BOUNDS:
+      if age < bound:
+        label = "<%d" % bound
+        break
+    ages[label] += value
+  return {
+    "rows": counters.get("rows", 0),
+    "bytes": counters.get("bytes", 0),
+    "size_histogram": sizes,
+    "age_histogram_days": ages,
+  }
+
+
+def app(environ, start_response):
+  headers = [
+    ("Content-Type", "application/json")
+  ]
+  client = ndb.Client()
+  with client.context():
+    stats = get_stats()
+  start_response("200 OK", headers)
+  return [json.dumps(stats, indent=2).encode("utf-8")]
@@ -20,7 +20,12 @@ limitations under the License.
 
 __author__ = "q.neutron@gmail.com (Quynh Neutron)"
 
+import datetime
 import hashlib
+import json
+import stats
+import xml.etree.ElementTree as ET
+from fragments import fragmentHash, joinStacks, splitStacks
 from google.cloud import ndb
 from random import randint
 from urllib.parse import unquote
@@ -30,7 +35,57 @@ class Xml(ndb.Model):
   # A row in the database.
   xml_hash = ndb.IntegerProperty()
   xml_content = ndb.TextProperty()
-  last_accessed = ndb.DateTimeProperty(auto_now=True)
+  # Creation time.  Reads are tracked in AccessBucket/Access rows instead,
+  # so that this (large) row isn't rewritten on every read.
+  last_accessed = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+  # Hashes of Fragment rows holding the top-level block stacks, in order.
+  # If set, xml_content is the workspace with each stack cut out.
+  fragments = ndb.StringProperty(repeated=True, indexed=False)
+
+
+class Fragment(ndb.Model):
+  # One top-level block stack, keyed by the SHA-1 of its content.
+  content = ndb.TextProperty()
+  # Number of Xml rows that use this fragment.  The fragment is deleted when
+  # this drops to zero.  None (fragments stored before rows were counted)
+  # means unknown, and the fragment is kept forever.
+  refs = ndb.IntegerProperty(indexed=False)
+
+
+class AccessBucket(ndb.Model):
+  # Keys of the Xml rows read (or created) on one day.
+  # The id is "YYYY-MM-DD:shard" so buckets sort by day.
+  day = ndb.DateProperty(indexed=False)
+  keys = ndb.StringProperty(repeated=True, indexed=False)
+
+
+class Access(ndb.Model):
+  # Day of the most recent AccessBucket holding this Xml row's key.
+  # Shares its id with the Xml row.
+  day = ndb.DateProperty(indexed=False)
+  # Size of the Xml row's content, so expiration can update the stats
+  # counters without loading the row.
+  size = ndb.IntegerProperty(indexed=False)
+
+
+# Number of AccessBucket rows per day.  Spreads write contention and keeps
+# each bucket well below the entity size limit.
+BUCKET_SHARDS = 16
+
+# Store top-level block stacks as shared Fragment rows instead of storing
+# each workspace whole.  Workspaces that are near copies of each other
+# (e.g. edits of the same starter program) then share most of their storage.
+STORE_FRAGMENTS = False
+
+# Most Fragment rows to update in one transaction.  Each fragment is its own
+# entity group, and a transaction may only touch so many.
+FRAGMENT_BATCH = 100
+
+# Hash a canonical form of the content (no block ids, no top-level
+# coordinates, sorted attributes, no formatting whitespace) so that saves of
+# the same program are stored once.  The original content is what's stored.
+# Note that rows hashed before this was enabled won't match new saves.
+CANONICAL_HASH = False
 
 
 def keyGen():
@@ -56,10 +111,212 @@ def parse_post(environ):
   return dict
 
 
+@ndb.transactional()
+def _addFragmentRefs(stacks):
+  # Count one more use of each of the given {hash: content} fragments,
+  # creating those that don't exist yet.
+  keys = [ndb.Key(Fragment, h) for h in stacks]
+  rows = []
+  for key, row in zip(keys, ndb.get_multi(keys)):
+    if row is None:
+      row = Fragment(key=key, content=stacks[key.string_id()], refs=0)
+    if row.refs is not None:
+      row.refs += 1
+    rows.append(row)
+  ndb.put_multi(rows)
+
+
+@ndb.transactional()
+def _removeFragmentRefs(counts):
+  # Count fewer uses of the given {hash: uses} fragments, deleting any that
+  # are no longer used.
+  keys = [ndb.Key(Fragment, h) for h in counts]
+  updated = []
+  unused = []
+  for key, row in zip(keys, ndb.get_multi(keys)):
+    if row is None or row.refs is None:
+      continue
+    row.refs -= counts[key.string_id()]
+    if row.refs > 0:
+      updated.append(row)
+    else:
+      unused.append(key)
+  ndb.put_multi(updated)
+  ndb.delete_multi(unused)
+
+
+def putFragments(stacks):
+  # Store each stack once under its content hash, and count the new row that
+  # uses them.  Returns the hashes.
+  # Call this before storing the row, and releaseFragments after deleting it.
+  # A failure in between then leaves a count too high, so a fragment may be
+  # kept after its last use, but it is never deleted while still in use.
+  hashes = [fragmentHash(stack) for stack in stacks]
+  unique = list(dict(zip(hashes, stacks)).items())
+  for i in range(0, len(unique), FRAGMENT_BATCH):
+    _addFragmentRefs(dict(unique[i:i + FRAGMENT_BATCH]))
+  return hashes
+
+
+def releaseFragments(rows):
+  # Count one less use of the fragments of each deleted Xml row.
+  counts = {}
+  for row in rows:
+    if row is not None:
+      for h in set(row.fragments):
+        counts[h] = counts.get(h, 0) + 1
+  counts = list(counts.items())
+  for i in range(0, len(counts), FRAGMENT_BATCH):
+    _removeFragmentRefs(dict(counts[i:i + FRAGMENT_BATCH]))
+
+
+def getContents(rows):
+  # Return the full XML/JSON for each row, reassembling fragments as needed.
+  # All fragments for all rows are fetched with one batched get.
+  hashes = list({h for row in rows for h in row.fragments})
+  fragments = ndb.get_multi([ndb.Key(Fragment, h) for h in hashes])
+  contents = dict(zip(hashes, fragments))
+  results = []
+  for row in rows:
+    if not row.fragments:
+      results.append(row.xml_content)
+      continue
+    stacks = [contents[h] for h in row.fragments]
+    if None in stacks:
+      raise Exception("Missing fragment for " + row.key.string_id())
+    results.append(joinStacks(row.xml_content, [f.content for f in stacks]))
+  return results
+
+
+def _localName(tag):
+  # Strip any "{namespace}" prefix from an element tag.
+  return tag.rpartition("}")[2]
+
+
+def canonicalXml(xml_content):
+  # Canonical form of an XML workspace, for hashing only.
+  root = ET.fromstring(xml_content)
+  for child in root:
+    if _localName(child.tag) == "block":
+      child.attrib.pop("x", None)
+      child.attrib.pop("y", None)
+  for elem in root.iter():
+    if _localName(elem.tag) in ("block", "shadow"):
+      elem.attrib.pop("id", None)
+    # Drop indentation between elements, but not whitespace inside fields.
+    if len(elem) and elem.text and not elem.text.strip():
+      elem.text = None
+    if elem.tail and not elem.tail.strip():
+      elem.tail = None
+  # C14N sorts attributes and normalizes quoting and empty elements.
+  return ET.canonicalize(ET.tostring(root, encoding="unicode"))
+
+
+def canonicalJson(json_content):
+  # Canonical form of a JSON workspace, for hashing only.
+  state = json.loads(json_content)
+  blocks = state.get("blocks", {}).get("blocks", [])
+  for block in blocks:
+    block.pop("x", None)
+    block.pop("y", None)
+  stack = list(blocks)
+  while stack:
+    block = stack.pop()
+    block.pop("id", None)
+    connections = list((block.get("inputs") or {}).values())
+    connections.append(block.get("next") or {})
+    for connection in connections:
+      for child in (connection.get("block"), connection.get("shadow")):
+        if child:
+          stack.append(child)
+  return json.dumps(state, ensure_ascii=False, sort_keys=True,
+                    separators=(",", ":"))
+
+
+def canonicalize(content):
+  # Canonical form of XML or JSON content.  Unparsable content is returned
+  # unchanged, so it is still hashed (and stored) as-is.
+  try:
+    if content.lstrip().startswith("{"):
+      return canonicalJson(content)
+    return canonicalXml(content)
+  except (ValueError, TypeError, AttributeError, ET.ParseError):
+    return content
+
+
+def contentHash(content):
+  # 64-bit signed hash used to find existing copies of the content.
+  if CANONICAL_HASH:
+    content = canonicalize(content)
+  content_hash = int(hashlib.sha1(content.encode("utf-8")).hexdigest(), 16)
+  return int(content_hash % (2 ** 64) - (2 ** 63))
+
+
+def bucketId(day, xml_key):
+  # Id of the AccessBucket that records xml_key on the given day.
+  shard = int(hashlib.sha1(xml_key.encode("utf-8")).hexdigest(), 16)
+  return "%s:%02d" % (day.isoformat(), shard % BUCKET_SHARDS)
+
+
+@ndb.transactional()
+def addToBucket(bucket_id, day, sizes):
+  # Add Xml keys to a bucket and update the stats counters.
+  # sizes maps each key to its content size, used if it's a new row.
+  bucket = AccessBucket.get_by_id(bucket_id) or AccessBucket(
+      id = bucket_id, day = day)
+  added = [k for k in sizes if k not in bucket.keys]
+  if not added:
+    return
+  bucket.keys.extend(added)
+  accesses = ndb.get_multi([ndb.Key(Access, k) for k in added])
+  deltas = {stats.access_counter(day): len(added)}
+  rows = [bucket]
+  for xml_key, access in zip(added, accesses):
+    if access is None:
+      # First time this row is seen.
+      size = sizes[xml_key]
+      access = Access(id = xml_key, size = size)
+      deltas["rows"] = deltas.get("rows", 0) + 1
+      deltas["bytes"] = deltas.get("bytes", 0) + size
+      name = stats.size_counter(size)
+      deltas[name] = deltas.get(name, 0) + 1
+    else:
+      name = stats.access_counter(access.day)
+      deltas[name] = deltas.get(name, 0) - 1
+    access.day = day
+    rows.append(access)
+  ndb.put_multi(rows)
+  stats.increment(deltas)
+
+
+def recordAccess(xml_key, size, day=None):
+  # Note that xml_key was read on the given day (default: today).
+  # Each key is written to a day's bucket at most once.
+  day = day or datetime.datetime.utcnow().date()
+  bucket_id = bucketId(day, xml_key)
+  bucket = AccessBucket.get_by_id(bucket_id)
+  if bucket and xml_key in bucket.keys:
+    return
+  addToBucket(bucket_id, day, {xml_key: size})
+
+
+@ndb.transactional()
+def putRow(row, size):
+  # Store a new Xml row and record it as read today, so that a row is never
+  # stored without being counted and eventually expired.
+  row.put()
+  recordAccess(row.key.string_id(), size)
+
+
+def contentSize(content):
+  # Size of a workspace as saved, in UTF-8 bytes.  For a row stored as
+  # fragments, this is the size of its shell and all of its fragments.
+  return len((content or "").encode("utf-8"))
+
+
 def xmlToKey(xml_content):
   # Store XML/JSON and return a generated key.
-  xml_hash = int(hashlib.sha1(xml_content.encode("utf-8")).hexdigest(), 16)
-  xml_hash = int(xml_hash % (2 ** 64) - (2 ** 63))
+  xml_hash = contentHash(xml_content)
   client = ndb.Client()
   with client.context():
     lookup_query = Xml.query(Xml.xml_hash == xml_hash)
@@ -75,8 +332,14 @@ def xmlToKey(xml_content):
           raise Exception("Sorry, the generator failed to get a key for you.")
         xml_key = keyGen()
         result = Xml.get_by_id(xml_key)
-      row = Xml(id = xml_key, xml_hash = xml_hash, xml_content = xml_content)
-      row.put()
+      split = splitStacks(xml_content) if STORE_FRAGMENTS else None
+      if split and split[1]:
+        shell, stacks = split
+        row = Xml(id = xml_key, xml_hash = xml_hash, xml_content = shell,
+                  fragments = putFragments(stacks))
+      else:
+        row = Xml(id = xml_key, xml_hash = xml_hash, xml_content = xml_content)
+      putRow(row, contentSize(xml_content))
   return xml_key
 
 
@@ -91,11 +354,10 @@ def keyToXml(key_provided):
   if not result:
     xml = ""
   else:
-    # Put it back into the datastore immediately, which updates the last
-    # accessed time.
+    # Record the read, which keeps the row from expiring.
     with client.context():
-      result.put()
-    xml = result.xml_content
+      xml = getContents([result])[0]
+      recordAccess(key_provided, contentSize(xml))
     # Add a poison line to prevent raw content from being served.
     xml = "{[(< UNTRUSTED CONTENT >)]}\n" + xml
   return xml
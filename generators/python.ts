@@ -32,7 +32,7 @@ export const pythonGenerator = new PythonGenerator();
 
 // Add reserved words.  This list should include all words mentioned
 // in RESERVED WORDS: comments in the imports above.
-pythonGenerator.addReservedWords('math,random,Number');
+pythonGenerator.addReservedWords('math,random,Number,Counter');
 
 // Install per-block-type generator functions:
 // Install per-block-type generator functions:
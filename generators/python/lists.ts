@@ -174,8 +174,13 @@ export function lists_getIndex(
       break;
     }
     case 'RANDOM':
-      (generator as AnyDuringMigration).definitions_['import_random'] =
-        'import random';
+      if (
+        mode === 'GET' ||
+        !generator.importsFunction('lists_remove_random_item')
+      ) {
+        (generator as AnyDuringMigration).definitions_['import_random'] =
+          'import random';
+      }
       if (mode === 'GET') {
         const code = 'random.choice(' + list + ')';
         return [code, Order.FUNCTION_CALL];
@@ -338,23 +343,44 @@ export function lists_sort(
   const list = generator.valueToCode(block, 'LIST', Order.NONE) || '[]';
   const type = block.getFieldValue('TYPE');
   const reverse = block.getFieldValue('DIRECTION') === '1' ? 'False' : 'True';
+  // The key functions are defined once, rather than on every call.
+  const numberKeyName = generator.provideFunction_(
+    'lists_sort_number',
+    `
+def ${generator.FUNCTION_NAME_PLACEHOLDER_}(s):
+  # float() only accepts letters alone when they spell one of these, so don't
+  # raise and catch an exception for other words.
+  if isinstance(s, str) and s.isalpha() and s.lower() not in ('inf', 'nan', 'infinity'):
+    return 0
+  try:
+    return float(s)
+  except:
+    return 0
+`,
+  );
+  const keyFuncsName = generator.provideFunction_(
+    'lists_sort_key_funcs',
+    `
+${generator.FUNCTION_NAME_PLACEHOLDER_} = {
+  "NUMERIC": ${numberKeyName},
+  "TEXT": str,
+  "IGNORE_CASE": lambda s: str(s).lower()
+}
+`,
+  );
   const sortFunctionName = generator.provideFunction_(
     'lists_sort',
     `
 def ${generator.FUNCTION_NAME_PLACEHOLDER_}(my_list, type, reverse):
-  def try_float(s):
-    try:
-      return float(s)
-    except:
-      return 0
-  key_funcs = {
-    "NUMERIC": try_float,
-    "TEXT": str,
-    "IGNORE_CASE": lambda s: str(s).lower()
-  }
-  key_func = key_funcs[type]
   list_cpy = list(my_list)
-  return sorted(list_cpy, key=key_func, reverse=reverse)
+  if type == "NUMERIC":
+    # float() returns floats unchanged and ints up to 2 ** 53 exactly, so a
+    # list of only those sorts the same without a key.
+    classes = {x.__class__ for x in list_cpy}
+    if classes <= {float, int} and (
+        int not in classes or max(map(abs, list_cpy)) <= 9007199254740992):
+      return sorted(list_cpy, reverse=reverse)
+  return sorted(list_cpy, key=${keyFuncsName}[type], reverse=reverse)
 `,
   );
 
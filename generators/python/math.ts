@@ -15,7 +15,7 @@ import type {PythonGenerator} from './python_generator.js';
 import {Order} from './python_generator.js';
 
 // If any new block imports any library, add that library name here.
-// RESERVED WORDS: 'math,random,Number'
+// RESERVED WORDS: 'math,random,Number,Counter'
 
 export function math_number(
   block: Block,
@@ -186,16 +186,27 @@ export function math_number_property(
   let code;
   if (dropdownProperty === 'PRIME') {
     // Prime is a special case as it is not a one-liner test.
-    (generator as AnyDuringMigration).definitions_['import_math'] =
-      'import math';
-    (generator as AnyDuringMigration).definitions_[
-      'from_numbers_import_Number'
-    ] = 'from numbers import Number';
+    if (!generator.importsFunction('math_isPrime')) {
+      (generator as AnyDuringMigration).definitions_['import_math'] =
+        'import math';
+      (generator as AnyDuringMigration).definitions_[
+        'from_numbers_import_Number'
+      ] = 'from numbers import Number';
+    }
+    // Small numbers are looked up in a sieve, which is shared between calls.
+    const sieveName = generator.provideFunction_(
+      'math_isPrime_sieve',
+      `
+# Primality of every number below 2 ** 20, filled in the first time it is needed.
+${generator.FUNCTION_NAME_PLACEHOLDER_} = bytearray()
+`,
+    );
     const functionName = generator.provideFunction_(
       'math_isPrime',
       `
 def ${generator.FUNCTION_NAME_PLACEHOLDER_}(n):
-  # https://en.wikipedia.org/wiki/Primality_test#Naive_methods
+  if type(n) is int and 0 <= n < len(${sieveName}):
+    return ${sieveName}[n] == 1
   # If n is not a number but a string, try parsing it.
   if not isinstance(n, Number):
     try:
@@ -207,9 +218,39 @@ def ${generator.FUNCTION_NAME_PLACEHOLDER_}(n):
   # False if n is negative, is 1, or not whole, or if n is divisible by 2 or 3.
   if n <= 1 or n % 1 != 0 or n % 2 == 0 or n % 3 == 0:
     return False
-  # Check all the numbers of form 6k +/- 1, up to sqrt(n).
-  for x in range(6, int(math.sqrt(n)) + 2, 6):
-    if n % (x - 1) == 0 or n % (x + 1) == 0:
+  n = int(n)
+  if n < 1 << 20:
+    if not ${sieveName}:
+      # https://en.wikipedia.org/wiki/Sieve_of_Eratosthenes
+      ${sieveName}.extend(bytes([1]) * (1 << 20))
+      ${sieveName}[0] = ${sieveName}[1] = 0
+      for x in range(2, 1 << 10):
+        if ${sieveName}[x]:
+          ${sieveName}[x * x::x] = bytes(len(range(x * x, 1 << 20, x)))
+    return ${sieveName}[n] == 1
+  if n >= 3317044064679887385961981:
+    # https://en.wikipedia.org/wiki/Primality_test#Naive_methods
+    # Check all the numbers of form 6k +/- 1, up to sqrt(n).
+    for x in range(6, int(math.sqrt(n)) + 2, 6):
+      if n % (x - 1) == 0 or n % (x + 1) == 0:
+        return False
+    return True
+  # https://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
+  # These bases give the right answer for every n below the bound above.
+  d = n - 1
+  s = 0
+  while d % 2 == 0:
+    d //= 2
+    s += 1
+  for a in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41):
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+      continue
+    for _ in range(s - 1):
+      x = x * x % n
+      if x == n - 1:
+        break
+    else:
       return False
   return True
 `,
@@ -231,11 +272,15 @@ def ${generator.FUNCTION_NAME_PLACEHOLDER_}(n):
 
 export function math_change(block: Block, generator: PythonGenerator) {
   // Add to a variable in place.
-  (generator as AnyDuringMigration).definitions_['from_numbers_import_Number'] =
-    'from numbers import Number';
   const argument0 =
     generator.valueToCode(block, 'DELTA', Order.ADDITIVE) || '0';
   const varName = generator.getVariableName(block.getFieldValue('VAR'));
+  if (generator.isSetToNumber(block, block.getFieldValue('VAR'))) {
+    // No need to treat a missing or non-numeric value as 0.
+    return varName + ' = ' + varName + ' + ' + argument0 + '\n';
+  }
+  (generator as AnyDuringMigration).definitions_['from_numbers_import_Number'] =
+    'from numbers import Number';
   return (
     varName +
     ' = (' +
@@ -272,9 +317,24 @@ export function math_on_list(
       code = 'max(' + list + ')';
       break;
     case 'AVERAGE': {
-      (generator as AnyDuringMigration).definitions_[
-        'from_numbers_import_Number'
-      ] = 'from numbers import Number';
+      if (generator.isNumberList(block.getInputTargetBlock('LIST'))) {
+        // Every element is a number, so there is nothing to exclude.
+        const functionName = generator.provideFunction_(
+          'math_mean_numbers',
+          `
+def ${generator.FUNCTION_NAME_PLACEHOLDER_}(myList):
+  if not myList: return
+  return float(sum(myList)) / len(myList)
+`,
+        );
+        code = functionName + '(' + list + ')';
+        break;
+      }
+      if (!generator.importsFunction('math_mean')) {
+        (generator as AnyDuringMigration).definitions_[
+          'from_numbers_import_Number'
+        ] = 'from numbers import Number';
+      }
       // This operation excludes null and values that aren't int or float:
       // math_mean([null, null, "aString", 1, 9]) -> 5.0
       const functionName = generator.provideFunction_(
@@ -290,9 +350,28 @@ def ${generator.FUNCTION_NAME_PLACEHOLDER_}(myList):
       break;
     }
     case 'MEDIAN': {
-      (generator as AnyDuringMigration).definitions_[
-        'from_numbers_import_Number'
-      ] = 'from numbers import Number';
+      if (generator.isNumberList(block.getInputTargetBlock('LIST'))) {
+        // Every element is a number, so there is nothing to exclude.
+        const functionName = generator.provideFunction_(
+          'math_median_numbers',
+          `
+def ${generator.FUNCTION_NAME_PLACEHOLDER_}(myList):
+  localList = sorted(myList)
+  if not localList: return
+  if len(localList) % 2 == 0:
+    return (localList[len(localList) // 2 - 1] + localList[len(localList) // 2]) / 2.0
+  else:
+    return localList[(len(localList) - 1) // 2]
+`,
+        );
+        code = functionName + '(' + list + ')';
+        break;
+      }
+      if (!generator.importsFunction('math_median')) {
+        (generator as AnyDuringMigration).definitions_[
+          'from_numbers_import_Number'
+        ] = 'from numbers import Number';
+      }
       // This operation excludes null values:
       // math_median([null, null, 1, 3]) -> 2.0
       const functionName = generator.provideFunction_(
@@ -314,10 +393,24 @@ def ${generator.FUNCTION_NAME_PLACEHOLDER_}(myList):
       // As a list of numbers can contain more than one mode,
       // the returned result is provided as an array.
       // Mode of [3, 'x', 'x', 1, 1, 2, '3'] -> ['x', 1]
+      if (!generator.importsFunction('math_modes')) {
+        (generator as AnyDuringMigration).definitions_[
+          'from_collections_import_Counter'
+        ] = 'from collections import Counter';
+      }
       const functionName = generator.provideFunction_(
         'math_modes',
         `
 def ${generator.FUNCTION_NAME_PLACEHOLDER_}(some_list):
+  # Count hashable items with a Counter, which keeps them in the order they
+  # were first seen. NaN is not equal to itself, so it is left to the loop below.
+  try:
+    counter = Counter(some_list)
+  except TypeError:
+    counter = None
+  if counter is not None and all(item == item for item in counter):
+    maxCount = max(counter.values(), default=1)
+    return [item for item, item_count in counter.items() if item_count == maxCount]
   modes = []
   # Using a lists of [item, count] to keep count rather than dict
   # to avoid "unhashable" errors when the counted item is itself a list or dict.
@@ -342,8 +435,10 @@ def ${generator.FUNCTION_NAME_PLACEHOLDER_}(some_list):
       break;
     }
     case 'STD_DEV': {
-      (generator as AnyDuringMigration).definitions_['import_math'] =
-        'import math';
+      if (!generator.importsFunction('math_standard_deviation')) {
+        (generator as AnyDuringMigration).definitions_['import_math'] =
+          'import math';
+      }
       const functionName = generator.provideFunction_(
         'math_standard_deviation',
         `
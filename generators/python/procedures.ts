@@ -19,17 +19,12 @@ import {Order} from './python_generator.js';
 
 export function procedures_defreturn(block: Block, generator: PythonGenerator) {
   // Define a procedure with a return value.
-  // First, add a 'global' statement for every variable that is not shadowed by
-  // a local parameter.
+  // First, add a 'global' statement for every variable that the procedure
+  // assigns to, unless it is a parameter or can be a local variable.
   const globals = [];
   const workspace = block.workspace;
-  const usedVariables = Variables.allUsedVarModels(workspace) || [];
-  for (const variable of usedVariables) {
-    const varName = variable.getName();
-    // getVars returns parameter names, not ids, for procedure blocks
-    if (!block.getVars().includes(varName)) {
-      globals.push(generator.getVariableName(varName));
-    }
+  for (const variable of generator.getProcedureGlobals(block)) {
+    globals.push(generator.getVariableName(variable.getName()));
   }
   // Add developer variables.
   const devVarList = Variables.allDeveloperVariables(workspace);
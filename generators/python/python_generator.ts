@@ -14,7 +14,12 @@
 import type {Block} from '../../core/block.js';
 import {CodeGenerator} from '../../core/generator.js';
 import {inputTypes} from '../../core/inputs/input_types.js';
-import {Names} from '../../core/names.js';
+import type {
+  IVariableModel,
+  IVariableState,
+} from '../../core/interfaces/i_variable_model.js';
+import {NameType, Names} from '../../core/names.js';
+import * as Procedures from '../../core/procedures.js';
 import * as stringUtils from '../../core/utils/string.js';
 import * as Variables from '../../core/variables.js';
 import type {Workspace} from '../../core/workspace.js';
@@ -48,6 +53,13 @@ export enum Order {
   NONE = 99,              // (...)
 }
 
+/**
+ * Kinds of number that a value can be proven to be: 'int' for Python ints
+ * (never booleans), 'number' for anything that is an instance of
+ * numbers.Number.
+ */
+export type NumberType = 'int' | 'number';
+
 /**
  * PythonScript code generator class.
  */
@@ -81,6 +93,20 @@ export class PythonGenerator extends CodeGenerator {
    */
   PASS: string = ''; // Initialised by init().
 
+  /**
+   * Name of a module to import helper functions from, instead of defining
+   * them in every program.  The module must be a copy of the blockly_runtime
+   * package in generators/python/runtime, built from the same version of
+   * Blockly.  E.g. `blockly_runtime`
+   */
+  RUNTIME_MODULE: string | null = null;
+
+  /**
+   * Types of the user variables that only ever hold numbers once they have
+   * been set, by variable ID.  Initialised by init().
+   */
+  private variableTypes = new Map<string, NumberType>();
+
   /** @param name Name of the language the generator is for. */
   constructor(name = 'Python') {
     super(name);
@@ -191,6 +217,7 @@ export class PythonGenerator extends CodeGenerator {
     }
 
     this.definitions_['variables'] = defvars.join('\n');
+    this.inferVariableTypes(workspace);
     this.isInitialized = true;
   }
 
@@ -221,6 +248,50 @@ export class PythonGenerator extends CodeGenerator {
     return allDefs.replace(/\n\n+/g, '\n\n').replace(/\n*$/, '\n\n\n') + code;
   }
 
+  /**
+   * Define a helper function, or import it from RUNTIME_MODULE if that is set
+   * and the module has it.
+   *
+   * @param desiredName The desired name of the function (e.g. math_isPrime).
+   * @param code A list of statements or one multi-line code string.
+   * @returns The actual name of the new function.
+   */
+  provideFunction_(desiredName: string, code: string[] | string): string {
+    if (!this.RUNTIME_MODULE) {
+      return super.provideFunction_(desiredName, code);
+    }
+    if (RUNTIME_INTERNALS.includes(desiredName)) {
+      // Only used by other helpers, which find it in the module themselves.
+      return desiredName;
+    }
+    if (!RUNTIME_FUNCTIONS.includes(desiredName)) {
+      return super.provideFunction_(desiredName, code);
+    }
+    if (!this.definitions_[desiredName]) {
+      const functionName = this.nameDB_!.getDistinctName(
+        desiredName,
+        NameType.PROCEDURE,
+      );
+      this.functionNames_[desiredName] = functionName;
+      this.definitions_[desiredName] =
+        `from ${this.RUNTIME_MODULE} import ${desiredName}` +
+        (functionName === desiredName ? '' : ` as ${functionName}`);
+    }
+    return this.functionNames_[desiredName];
+  }
+
+  /**
+   * Whether provideFunction_ will import a helper function from
+   * RUNTIME_MODULE rather than define it.  If so, the imports that only the
+   * helper's code needs can be left out.
+   *
+   * @param desiredName The desired name of the function (e.g. math_isPrime).
+   * @returns True if the function is imported.
+   */
+  importsFunction(desiredName: string): boolean {
+    return !!this.RUNTIME_MODULE && RUNTIME_FUNCTIONS.includes(desiredName);
+  }
+
   /**
    * Naked values are top-level blocks with outputs that aren't plugged into
    * anything.
@@ -307,6 +378,265 @@ export class PythonGenerator extends CodeGenerator {
     return commentCode + code + nextCode;
   }
 
+  /**
+   * Finds the user variables that a procedure must declare global.  Python
+   * makes every variable that a function assigns to local, so these are the
+   * variables that blocks in the procedure assign to, other than its
+   * parameters.  Variables that are only read are looked up globally without
+   * a declaration.
+   *
+   * An assigned variable stays local (which Python accesses faster) if it
+   * isn't used anywhere outside the procedure, the procedure can't call
+   * itself, and the first statement in the procedure that uses the variable
+   * sets it without reading it, so it is never read before being set.
+   *
+   * @param block The procedure definition block.
+   * @returns The variables, in the same order as they are defined.
+   */
+  getProcedureGlobals(block: Block): IVariableModel<IVariableState>[] {
+    const workspace = block.workspace;
+    // getVars returns parameter names, not ids, for procedure blocks.
+    const params = block.getVars();
+    const assigned = variableReferences(block, true);
+
+    const usedElsewhere = new Set<string>();
+    for (const topBlock of workspace.getTopBlocks(false)) {
+      if (topBlock === block) continue;
+      const topParams = PROCEDURE_DEFINITIONS.includes(topBlock.type)
+        ? topBlock.getVars()
+        : [];
+      const references = new Set<string>();
+      for (let b: Block | null = topBlock; b; b = b.getNextBlock()) {
+        variableReferences(b, false, references);
+      }
+      for (const id of references) {
+        const variable = workspace.getVariableById(id);
+        if (!variable || !topParams.includes(variable.getName())) {
+          usedElsewhere.add(id);
+        }
+      }
+    }
+
+    const recursive = isRecursive(block);
+    return (Variables.allUsedVarModels(workspace) || []).filter((variable) => {
+      const id = variable.getId();
+      if (params.includes(variable.getName()) || !assigned.has(id)) {
+        return false;
+      }
+      return recursive || usedElsewhere.has(id) || !isSetFirst(block, id);
+    });
+  }
+
+  /**
+   * Works out which user variables only ever hold numbers once they have
+   * been set, and stores their types in variableTypes.  Every variable that
+   * is assigned to starts out as an integer, then any variable that is
+   * assigned something else (given the current types of the others) is
+   * widened or dropped, until nothing changes.  Procedure parameters can
+   * be passed anything, so they are never included.
+   *
+   * @param workspace Workspace to generate code from.
+   */
+  private inferVariableTypes(workspace: Workspace) {
+    const params = new Set<string>();
+    for (const type of PROCEDURE_DEFINITIONS) {
+      for (const definition of workspace.getBlocksByType(type, false)) {
+        definition.getVars().forEach((name) => params.add(name));
+      }
+    }
+    const assignments = new Map<string, Block[]>();
+    for (const block of workspace.getAllBlocks(false)) {
+      if (VARIABLE_GETTERS.includes(block.type)) continue;
+      for (const field of block.getFields()) {
+        if (!field.referencesVariables()) continue;
+        const id = field.getValue();
+        const variable = workspace.getVariableById(id);
+        if (variable && !params.has(variable.getName())) {
+          if (!assignments.has(id)) assignments.set(id, []);
+          assignments.get(id)!.push(block);
+        }
+      }
+    }
+
+    this.variableTypes = new Map();
+    for (const id of assignments.keys()) {
+      this.variableTypes.set(id, 'int');
+    }
+    let changed = true;
+    while (changed) {
+      changed = false;
+      for (const [id, type] of this.variableTypes) {
+        let newType: NumberType | null = type;
+        for (const block of assignments.get(id)!) {
+          newType = joinNumberTypes(newType, this.getAssignedType(block));
+        }
+        if (newType !== type) {
+          changed = true;
+          if (newType) {
+            this.variableTypes.set(id, newType);
+          } else {
+            this.variableTypes.delete(id);
+          }
+        }
+      }
+    }
+  }
+
+  /**
+   * Gets the type of the values that a block assigns to its variable.
+   *
+   * @param block A block that references a variable and isn't a getter.
+   * @returns The type, or null if the values might not be numbers.
+   */
+  private getAssignedType(block: Block): NumberType | null {
+    const input = (name: string, defaultType: NumberType) => {
+      const target = block.getInputTargetBlock(name);
+      return target ? this.getNumberType(target, true) : defaultType;
+    };
+    switch (block.type) {
+      case 'variables_set':
+        return this.getNumberType(block.getInputTargetBlock('VALUE'));
+      case 'math_change': {
+        // Anything that isn't a number is treated as 0.
+        const type = this.variableTypes.get(block.getFieldValue('VAR'));
+        return joinNumberTypes(type || null, input('DELTA', 'int'));
+      }
+      case 'controls_for':
+        // Counts from FROM in steps of BY, whichever way TO is.
+        return joinNumberTypes(input('FROM', 'int'), input('BY', 'int'));
+      default:
+        return null;
+    }
+  }
+
+  /**
+   * Gets the type of number that a value block always produces, if it
+   * produces a value at all rather than raising an exception.
+   *
+   * @param block The value block, if any.
+   * @param allowNone True if the value is only used in ways that raise an
+   *     exception for None, so variables that might not have been set yet
+   *     can be counted as numbers.
+   * @returns The type, or null if the value might not be a number.
+   */
+  getNumberType(block: Block | null, allowNone = false): NumberType | null {
+    // Disabled blocks generate the input's default value instead.
+    if (!block || !block.isEnabled()) return null;
+    const input = (name: string, defaultType: NumberType | null) => {
+      const target = block.getInputTargetBlock(name);
+      return target ? this.getNumberType(target, true) : defaultType;
+    };
+    switch (block.type) {
+      case 'math_number':
+        // Matches the code that math_number generates.
+        return /^-?\d+$/.test(String(Number(block.getFieldValue('NUM'))))
+          ? 'int'
+          : 'number';
+      case 'math_constant':
+      case 'math_random_float':
+      case 'math_atan2':
+        return 'number';
+      case 'math_random_int':
+      case 'text_length':
+      case 'lists_length':
+        return 'int';
+      case 'math_arithmetic': {
+        const type = joinNumberTypes(input('A', 'int'), input('B', 'int'));
+        const op = block.getFieldValue('OP');
+        return type && (op === 'DIVIDE' || op === 'POWER') ? 'number' : type;
+      }
+      case 'math_single':
+      case 'math_round':
+      case 'math_trig': {
+        // These raise an exception for anything but a number.
+        const op = block.getFieldValue('OP');
+        if (op === 'NEG') {
+          return input('NUM', 'int');
+        }
+        return ['ROUND', 'ROUNDUP', 'ROUNDDOWN'].includes(op)
+          ? 'int'
+          : 'number';
+      }
+      case 'math_modulo':
+        // '%' formats strings, so both sides must be numbers.
+        return joinNumberTypes(
+          input('DIVIDEND', 'int'),
+          input('DIVISOR', 'int'),
+        );
+      case 'math_constrain':
+        return joinNumberTypes(
+          joinNumberTypes(input('VALUE', 'int'), input('LOW', 'int')),
+          input('HIGH', 'number'),
+        );
+      case 'logic_ternary':
+        return joinNumberTypes(
+          this.getNumberType(block.getInputTargetBlock('THEN'), allowNone),
+          this.getNumberType(block.getInputTargetBlock('ELSE'), allowNone),
+        );
+      case 'variables_get':
+        return (
+          (allowNone && this.variableTypes.get(block.getFieldValue('VAR'))) ||
+          null
+        );
+      default:
+        return null;
+    }
+  }
+
+  /**
+   * Checks whether a value block always produces a list of numbers.
+   *
+   * @param block The value block, if any.
+   * @returns True if every element of the list is known to be a number.
+   */
+  isNumberList(block: Block | null): boolean {
+    if (!block || !block.isEnabled()) return false;
+    switch (block.type) {
+      case 'lists_create_with':
+        // Empty inputs generate None.
+        return block.inputList.every(
+          (input) =>
+            !/^ADD\d+$/.test(input.name) ||
+            !!this.getNumberType(block.getInputTargetBlock(input.name)),
+        );
+      case 'lists_repeat':
+        return !!this.getNumberType(block.getInputTargetBlock('ITEM'));
+      default:
+        return false;
+    }
+  }
+
+  /**
+   * Checks whether a variable is known to hold a number when a statement
+   * runs: it only ever holds numbers once set, and an earlier statement in
+   * the same stack, or in a stack that this one is nested in, sets it.
+   *
+   * @param block The statement block.
+   * @param id ID of the variable.
+   * @returns True if the variable holds a number.
+   */
+  isSetToNumber(block: Block, id: string): boolean {
+    if (!this.variableTypes.has(id)) return false;
+    let child = block;
+    let previous = block.getPreviousBlock();
+    while (previous) {
+      if (previous.isEnabled() && previous.getFieldValue('VAR') === id) {
+        if (previous.getNextBlock() === child) {
+          // An earlier statement.
+          if (['variables_set', 'math_change'].includes(previous.type)) {
+            return true;
+          }
+        } else if (previous.type === 'controls_for') {
+          // A loop that this statement is in, counting with the variable.
+          return true;
+        }
+      }
+      child = previous;
+      previous = previous.getPreviousBlock();
+    }
+    return false;
+  }
+
   /**
    * Gets a property and adjusts the value, taking into account indexing.
    * If a static int, casts to an integer, otherwise returns a code string.
@@ -353,3 +683,136 @@ export class PythonGenerator extends CodeGenerator {
     return at;
   }
 }
+
+/**
+ * Helper functions that the runtime package defines, exactly as the block
+ * generators would.  Helpers whose code depends on the workspace, such as
+ * first_index, are left out and always defined in the program.
+ */
+const RUNTIME_FUNCTIONS = [
+  'downRange',
+  'intRange',
+  'lists_remove_random_item',
+  'lists_sort',
+  'math_isPrime',
+  'math_mean',
+  'math_mean_numbers',
+  'math_median',
+  'math_median_numbers',
+  'math_modes',
+  'math_standard_deviation',
+  'text_prompt',
+  'text_random_letter',
+  'upRange',
+];
+
+/** Definitions in the runtime package that only its functions use. */
+const RUNTIME_INTERNALS = [
+  'lists_sort_key_funcs',
+  'lists_sort_number',
+  'math_isPrime_sieve',
+];
+
+/** Types of block that only read the variables they reference. */
+const VARIABLE_GETTERS = ['variables_get', 'variables_get_dynamic'];
+
+/** Types of block that define procedures. */
+const PROCEDURE_DEFINITIONS = [
+  'procedures_defnoreturn',
+  'procedures_defreturn',
+];
+
+/**
+ * Finds the narrowest type that covers two number types.
+ *
+ * @param a A type, or null if the value might not be a number.
+ * @param b Another type, or null.
+ * @returns The combined type, or null if either value might not be a number.
+ */
+function joinNumberTypes(
+  a: NumberType | null,
+  b: NumberType | null,
+): NumberType | null {
+  if (!a || !b) return null;
+  return a === b ? a : 'number';
+}
+
+/**
+ * Collects the IDs of the variables that a block and the blocks nested in it
+ * reference.  Blocks that follow it are not included.
+ *
+ * @param block The block to search, if any.
+ * @param assignedOnly True to skip blocks that only read variables.
+ * @param ids Set to add the IDs to.
+ * @returns The set of IDs.
+ */
+function variableReferences(
+  block: Block | null,
+  assignedOnly = false,
+  ids = new Set<string>(),
+): Set<string> {
+  if (!block) return ids;
+  if (!assignedOnly || !VARIABLE_GETTERS.includes(block.type)) {
+    for (const field of block.getFields()) {
+      if (field.referencesVariables()) {
+        ids.add(field.getValue());
+      }
+    }
+  }
+  for (const input of block.inputList) {
+    let child = input.connection && input.connection.targetBlock();
+    for (; child; child = child.getNextBlock()) {
+      variableReferences(child, assignedOnly, ids);
+    }
+  }
+  return ids;
+}
+
+/**
+ * Checks whether a procedure can end up calling itself.
+ *
+ * @param block The procedure definition block.
+ * @returns True if any chain of calls leads from the procedure back to it.
+ */
+function isRecursive(block: Block): boolean {
+  const seen = new Set<Block>();
+  const pending = [block];
+  while (pending.length) {
+    const definition = pending.pop()!;
+    const callers = Procedures.getCallers(
+      definition.getFieldValue('NAME'),
+      block.workspace,
+    );
+    for (const caller of callers) {
+      const root = caller.getRootBlock();
+      if (root === block) return true;
+      if (PROCEDURE_DEFINITIONS.includes(root.type) && !seen.has(root)) {
+        seen.add(root);
+        pending.push(root);
+      }
+    }
+  }
+  return false;
+}
+
+/**
+ * Checks whether a procedure sets a variable before anything else uses it.
+ *
+ * @param block The procedure definition block.
+ * @param id ID of the variable.
+ * @returns True if the first top-level statement in the procedure that uses
+ *     the variable is an enabled set block whose value doesn't use it.
+ */
+function isSetFirst(block: Block, id: string): boolean {
+  let statement = block.getInputTargetBlock('STACK');
+  for (; statement; statement = statement.getNextBlock()) {
+    if (!variableReferences(statement).has(id)) continue;
+    return (
+      statement.type === 'variables_set' &&
+      statement.isEnabled() &&
+      statement.getFieldValue('VAR') === id &&
+      !variableReferences(statement.getInputTargetBlock('VALUE')).has(id)
+    );
+  }
+  return false;
+}
@@ -0,0 +1,235 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helper functions for Python generated by Blockly.
+
+Code generated with pythonGenerator.RUNTIME_MODULE = 'blockly_runtime'
+imports these instead of defining them in every program.  Each one is the
+same as the definition the generator would otherwise write, so use the
+version of this package that matches the version of Blockly.
+"""
+
+import math
+import random
+from collections import Counter
+from numbers import Number
+
+# Set to the version in Blockly's package.json by the release tasks.
+__version__ = '12.3.0'
+
+__all__ = [
+  'downRange',
+  'intRange',
+  'lists_remove_random_item',
+  'lists_sort',
+  'math_isPrime',
+  'math_mean',
+  'math_mean_numbers',
+  'math_median',
+  'math_median_numbers',
+  'math_modes',
+  'math_standard_deviation',
+  'text_prompt',
+  'text_random_letter',
+  'upRange',
+]
+
+
+def upRange(start, stop, step):
+  while start <= stop:
+    yield start
+    start += abs(step)
+
+
+def downRange(start, stop, step):
+  while start >= stop:
+    yield start
+    start -= abs(step)
+
+
+def intRange(start, stop, step):
+  if not step:
+    return upRange(start, stop, step) if start <= stop else downRange(start, stop, step)
+  if start <= stop:
+    return range(start, stop + 1, abs(step))
+  return range(start, stop - 1, -abs(step))
+
+
+def lists_remove_random_item(myList):
+  x = int(random.random() * len(myList))
+  return myList.pop(x)
+
+
+def lists_sort_number(s):
+  # float() only accepts letters alone when they spell one of these, so don't
+  # raise and catch an exception for other words.
+  if isinstance(s, str) and s.isalpha() and s.lower() not in ('inf', 'nan', 'infinity'):
+    return 0
+  try:
+    return float(s)
+  except:
+    return 0
+
+
+lists_sort_key_funcs = {
+  "NUMERIC": lists_sort_number,
+  "TEXT": str,
+  "IGNORE_CASE": lambda s: str(s).lower()
+}
+
+
+def lists_sort(my_list, type, reverse):
+  list_cpy = list(my_list)
+  if type == "NUMERIC":
+    # float() returns floats unchanged and ints up to 2 ** 53 exactly, so a
+    # list of only those sorts the same without a key.
+    classes = {x.__class__ for x in list_cpy}
+    if classes <= {float, int} and (
+        int not in classes or max(map(abs, list_cpy)) <= 9007199254740992):
+      return sorted(list_cpy, reverse=reverse)
+  return sorted(list_cpy, key=lists_sort_key_funcs[type], reverse=reverse)
+
+
+# Primality of every number below 2 ** 20, filled in the first time it is needed.
+math_isPrime_sieve = bytearray()
+
+
+def math_isPrime(n):
+  if type(n) is int and 0 <= n < len(math_isPrime_sieve):
+    return math_isPrime_sieve[n] == 1
+  # If n is not a number but a string, try parsing it.
+  if not isinstance(n, Number):
+    try:
+      n = float(n)
+    except:
+      return False
+  if n == 2 or n == 3:
+    return True
+  # False if n is negative, is 1, or not whole, or if n is divisible by 2 or 3.
+  if n <= 1 or n % 1 != 0 or n % 2 == 0 or n % 3 == 0:
+    return False
+  n = int(n)
+  if n < 1 << 20:
+    if not math_isPrime_sieve:
+      # https://en.wikipedia.org/wiki/Sieve_of_Eratosthenes
+      math_isPrime_sieve.extend(bytes([1]) * (1 << 20))
+      math_isPrime_sieve[0] = math_isPrime_sieve[1] = 0
+      for x in range(2, 1 << 10):
+        if math_isPrime_sieve[x]:
+          math_isPrime_sieve[x * x::x] = bytes(len(range(x * x, 1 << 20, x)))
+    return math_isPrime_sieve[n] == 1
+  if n >= 3317044064679887385961981:
+    # https://en.wikipedia.org/wiki/Primality_test#Naive_methods
+    # Check all the numbers of form 6k +/- 1, up to sqrt(n).
+    for x in range(6, int(math.sqrt(n)) + 2, 6):
+      if n % (x - 1) == 0 or n % (x + 1) == 0:
+        return False
+    return True
+  # https://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
+  # These bases give the right answer for every n below the bound above.
+  d = n - 1
+  s = 0
+  while d % 2 == 0:
+    d //= 2
+    s += 1
+  for a in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41):
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+      continue
+    for _ in range(s - 1):
+      x = x * x % n
+      if x == n - 1:
+        break
+    else:
+      return False
+  return True
+
+
+def math_mean(myList):
+  localList = [e for e in myList if isinstance(e, Number)]
+  if not localList: return
+  return float(sum(localList)) / len(localList)
+
+
+def math_mean_numbers(myList):
+  if not myList: return
+  return float(sum(myList)) / len(myList)
+
+
+def math_median(myList):
+  localList = sorted([e for e in myList if isinstance(e, Number)])
+  if not localList: return
+  if len(localList) % 2 == 0:
+    return (localList[len(localList) // 2 - 1] + localList[len(localList) // 2]) / 2.0
+  else:
+    return localList[(len(localList) - 1) // 2]
+
+
+def math_median_numbers(myList):
+  localList = sorted(myList)
+  if not localList: return
+  if len(localList) % 2 == 0:
+    return (localList[len(localList) // 2 - 1] + localList[len(localList) // 2]) / 2.0
+  else:
+    return localList[(len(localList) - 1) // 2]
+
+
+def math_modes(some_list):
+  # Count hashable items with a Counter, which keeps them in the order they
+  # were first seen. NaN is not equal to itself, so it is left to the loop below.
+  try:
+    counter = Counter(some_list)
+  except TypeError:
+    counter = None
+  if counter is not None and all(item == item for item in counter):
+    maxCount = max(counter.values(), default=1)
+    return [item for item, item_count in counter.items() if item_count == maxCount]
+  modes = []
+  # Using a lists of [item, count] to keep count rather than dict
+  # to avoid "unhashable" errors when the counted item is itself a list or dict.
+  counts = []
+  maxCount = 1
+  for item in some_list:
+    found = False
+    for count in counts:
+      if count[0] == item:
+        count[1] += 1
+        maxCount = max(maxCount, count[1])
+        found = True
+    if not found:
+      counts.append([item, 1])
+  for counted_item, item_count in counts:
+    if item_count == maxCount:
+      modes.append(counted_item)
+  return modes
+
+
+def math_standard_deviation(numbers):
+  n = len(numbers)
+  if n == 0: return
+  mean = float(sum(numbers)) / n
+  variance = sum((x - mean) ** 2 for x in numbers) / n
+  return math.sqrt(variance)
+
+
+def text_prompt(msg):
+  try:
+    return raw_input(msg)
+  except NameError:
+    return input(msg)
+
+
+def text_random_letter(text):
+  x = int(random.random() * len(text))
+  return text[x]
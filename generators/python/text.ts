@@ -164,8 +164,10 @@ export function text_charAt(
     case 'RANDOM': {
       // TODO(#7600): find better approach than casting to any to override
       // CodeGenerator declaring .definitions protected (here and below).
-      (generator as AnyDuringMigration).definitions_['import_random'] =
-        'import random';
+      if (!generator.importsFunction('text_random_letter')) {
+        (generator as AnyDuringMigration).definitions_['import_random'] =
+          'import random';
+      }
       const functionName = generator.provideFunction_(
         'text_random_letter',
         `
@@ -382,6 +382,7 @@ function buildLangfiles(done) {
   --source_constants_file ${path.join('msg', 'json', 'constants.json')} \
   --key_file ${path.join('msg', 'json', 'keys.json')} \
   --output_dir ${LANG_BUILD_DIR} \
+  --incremental \
   --quiet ${inputFiles.join(' ')}`;
   execSync(createMessagesCmd, {stdio: 'inherit'});
 
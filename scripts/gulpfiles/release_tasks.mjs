@@ -18,6 +18,9 @@ import * as packageTasks from './package_tasks.mjs';
 import {getPackageJson} from './helper_tasks.mjs';
 import {RELEASE_DIR} from './config.mjs';
 
+// The Python runtime package's __init__.py, which holds its version number.
+const PYTHON_RUNTIME_INIT =
+    'generators/python/runtime/blockly_runtime/__init__.py';
 
 // Gets the current major version.
 function getMajorVersion() {
@@ -60,6 +63,21 @@ function updateVersion(done, updateType) {
   }
 }
 
+// Copies the version number in package.json into the Python runtime package,
+// which is versioned with Blockly.
+function updatePythonRuntimeVersion(done) {
+  const { version } = getPackageJson();
+  const source = fs.readFileSync(PYTHON_RUNTIME_INIT, 'utf8');
+  const re = /^__version__ = '.*'$/m;
+  if (!re.test(source)) {
+    done(new Error(`Could not find __version__ in ${PYTHON_RUNTIME_INIT}`));
+    return;
+  }
+  fs.writeFileSync(PYTHON_RUNTIME_INIT,
+      source.replace(re, `__version__ = '${version}'`));
+  done();
+}
+
 // Prompt the user to figure out what kind of version update we should do.
 function updateVersionPrompt(done) {
   const releaseTypes = ['Major', 'Minor', 'Patch'];
@@ -157,6 +175,7 @@ export const publish = gulp.series(
 // Rebuild, package and publish a beta version of Blockly.
 export const publishBeta = gulp.series(
   updateBetaVersion,
+  updatePythonRuntimeVersion,
   packageTasks.pack,  // Does clean + build.
   checkBranch,
   checkReleaseDir,
@@ -169,6 +188,7 @@ export const recompile = gulp.series(
   gitTasks.syncDevelop(),
   gitTasks.createRebuildBranch,
   updateVersionPrompt,
+  updatePythonRuntimeVersion,
   packageTasks.pack,  // Does clean + build.
   gitTasks.pushRebuildBranch
   );
@@ -0,0 +1,362 @@
+#!/usr/bin/python3
+
+# Benchmark the i18n build pipeline.
+#
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Times the js_to_json.py -> create_messages.py -> dedup_json.py pipeline.
+
+Each stage is run in process on a copy of a corpus:
+
+  * real: msg/messages.js and msg/json/*.json as they are.
+  * keys10x: every message key repeated ten times, in messages.js and in
+    every language.
+  * langs10x: every language repeated ten times.
+
+For each stage this records the wall time (the best of --repeat runs), the
+peak memory allocated by Python (measured by tracemalloc in a separate run,
+since tracing slows everything down) and the functions with the highest
+cumulative time under cProfile (also a separate run).  The results are
+written as JSON:
+
+    python3 scripts/i18n/benchmark.py --output report.json
+
+Given an earlier report with --baseline, any stage that is more than
+--threshold times slower, or uses more than --threshold times the memory,
+is listed in the report's "regressions" and makes the script exit with
+status 1.  The on-disk JSON cache in common.py is disabled throughout, so
+every run parses its input.
+"""
+
+import argparse
+import cProfile
+import contextlib
+import io
+import json
+import os
+import platform
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common
+import create_messages
+import dedup_json
+import js_to_json
+
+
+# Files in a json directory that aren't languages.
+_NOT_LANGUAGES = ('qqq.json', 'keys.json', 'synonyms.json', 'constants.json')
+
+# Corpora, in the order they are run.
+CORPORA = ('real', 'keys10x', 'langs10x')
+
+# Stages, in pipeline order.
+STAGES = ('js_to_json', 'create_messages', 'dedup_json')
+
+# How many times larger the synthetic corpora are.
+_SCALE = 10
+
+# Slowdowns smaller than this many seconds are never regressions; they are
+# within the noise of a single run.
+_MIN_SLOWDOWN = 0.05
+
+
+def _escape_js(value):
+  return value.replace("'", "\\'")
+
+
+def _escape_description(description):
+  return description.replace('\n', '\\n')
+
+
+def _inflate_keys(key, copies):
+  """Returns the key followed by copies - 1 new keys derived from it."""
+  return [key] + ['{0}_BENCH{1}'.format(key, n) for n in range(1, copies)]
+
+
+def _write_messages_js(filename, records, copies):
+  """Writes a messages.js file with every definition repeated."""
+  lines = ["'use strict';\n"]
+  for record in records:
+    if isinstance(record, js_to_json.Synonym):
+      lines.append('Blockly.Msg.{0} = Blockly.Msg.{1};\n'.format(
+          record.key, record.target))
+      continue
+    keys = ([record.key] if isinstance(record, js_to_json.Constant)
+            else _inflate_keys(record.key, copies))
+    for key in keys:
+      if record.description:
+        lines.append('/// {0}\n'.format(
+            _escape_description(record.description)))
+      lines.append("Blockly.Msg.{0} = '{1}';\n".format(
+          key, _escape_js(record.value)))
+  with open(filename, 'w', encoding='utf-8') as outfile:
+    outfile.writelines(lines)
+
+
+def make_corpus(name, msg_dir, corpus_dir):
+  """Creates a corpus to run the pipeline on.
+
+  Args:
+    name: One of CORPORA.
+    msg_dir: The msg directory to derive the corpus from.
+    corpus_dir: Empty directory to create messages.js and json/ in.
+
+  Returns:
+    A dictionary with the number of keys and languages in the corpus.
+  """
+  json_dir = os.path.join(corpus_dir, 'json')
+  os.makedirs(json_dir)
+  source = os.path.join(msg_dir, 'messages.js')
+  with open(source, encoding='utf-8') as infile:
+    records = list(js_to_json.extract_messages(infile, warn=lambda _: None))
+  key_copies = _SCALE if name == 'keys10x' else 1
+  lang_copies = _SCALE if name == 'langs10x' else 1
+  _write_messages_js(os.path.join(corpus_dir, 'messages.js'), records,
+                     key_copies)
+
+  languages = 0
+  for filename in sorted(os.listdir(os.path.join(msg_dir, 'json'))):
+    if not filename.endswith('.json'):
+      continue
+    path = os.path.join(msg_dir, 'json', filename)
+    if filename in _NOT_LANGUAGES or (key_copies == 1 and lang_copies == 1):
+      shutil.copy(path, os.path.join(json_dir, filename))
+      languages += filename not in _NOT_LANGUAGES
+      continue
+    with open(path, encoding='utf-8') as infile:
+      defs = json.load(infile)
+    inflated = {}
+    for key, value in defs.items():
+      if key == '@metadata':
+        inflated[key] = value
+      else:
+        for new_key in _inflate_keys(key, key_copies):
+          inflated[new_key] = value
+    lang = filename[:-len('.json')]
+    for n in range(lang_copies):
+      copy_name = lang if n == 0 else '{0}-bench{1}'.format(lang, n)
+      with open(os.path.join(json_dir, copy_name + '.json'), 'w',
+                encoding='utf-8') as outfile:
+        json.dump(inflated, outfile, ensure_ascii=False, indent='\t')
+      languages += 1
+  keys = sum(1 for record in records
+             if isinstance(record, js_to_json.Definition)) * key_copies
+  return {'keys': keys, 'languages': languages}
+
+
+def _language_files(json_dir):
+  return sorted(os.path.join(json_dir, filename)
+                for filename in os.listdir(json_dir)
+                if filename.endswith('.json') and
+                filename not in _NOT_LANGUAGES)
+
+
+def run_js_to_json(corpus_dir):
+  json_dir = os.path.join(corpus_dir, 'json')
+  results, synonyms, constants = js_to_json.read_messages(
+      os.path.join(corpus_dir, 'messages.js'))
+  js_to_json.write_messages('Benchmark', 'en', json_dir, results, synonyms,
+                            constants, True)
+
+
+def run_create_messages(corpus_dir):
+  json_dir = os.path.join(corpus_dir, 'json')
+  output_dir = os.path.join(corpus_dir, 'js')
+  os.makedirs(output_dir, exist_ok=True)
+  shared = create_messages.load_shared(
+      os.path.join(json_dir, 'en.json'),
+      os.path.join(json_dir, 'synonyms.json'),
+      os.path.join(json_dir, 'constants.json'), output_dir, quiet=True)
+  create_messages._init_worker(shared)
+  for filename in _language_files(json_dir):
+    create_messages.create_lang_file(filename)
+
+
+def run_dedup_json(corpus_dir):
+  for filename in _language_files(os.path.join(corpus_dir, 'json')):
+    dedup_json.dedup_file(filename, '')
+
+
+_STAGE_FUNCTIONS = {
+  'js_to_json': run_js_to_json,
+  'create_messages': run_create_messages,
+  'dedup_json': run_dedup_json,
+}
+
+
+def _profile_summary(profile, limit):
+  """Returns the functions with the most cumulative time, as dicts."""
+  stats = pstats.Stats(profile)
+  rows = []
+  for (filename, line, function), (_, ncalls, tottime, cumtime, _) in (
+      stats.stats.items()):
+    rows.append({
+      'function': '{0}:{1}({2})'.format(
+          os.path.basename(filename), line, function),
+      'calls': ncalls,
+      'tottime': round(tottime, 6),
+      'cumtime': round(cumtime, 6),
+    })
+  rows.sort(key=lambda row: -row['cumtime'])
+  return rows[:limit]
+
+
+def measure_stage(stage, corpus_dir, repeat, profile_limit):
+  """Runs one stage repeatedly and returns its measurements.
+
+  Every run works on the same files; each stage leaves its inputs in place,
+  so later runs do the same work as the first.
+  """
+  function = _STAGE_FUNCTIONS[stage]
+  times = []
+  with contextlib.redirect_stdout(io.StringIO()):
+    for _ in range(repeat):
+      start = time.perf_counter()
+      function(corpus_dir)
+      times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+      function(corpus_dir)
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+    summary = []
+    if profile_limit:
+      profile = cProfile.Profile()
+      profile.runcall(function, corpus_dir)
+      summary = _profile_summary(profile, profile_limit)
+  return {
+    'seconds': round(min(times), 6),
+    'peak_bytes': peak,
+    'profile': summary,
+  }
+
+
+def find_regressions(report, baseline, threshold):
+  """Compares a report with a baseline report.
+
+  Returns:
+    A list of descriptions of stages that got more than threshold times
+    slower (and at least _MIN_SLOWDOWN seconds slower) or bigger.  Stages
+    missing from either report are ignored.
+  """
+  regressions = []
+  for corpus, results in sorted(report['corpora'].items()):
+    old_results = baseline.get('corpora', {}).get(corpus)
+    if not old_results:
+      continue
+    for stage, result in sorted(results['stages'].items()):
+      old = old_results['stages'].get(stage)
+      if not old:
+        continue
+      for metric in ('seconds', 'peak_bytes'):
+        if metric == 'seconds' and (
+            result[metric] - old[metric] < _MIN_SLOWDOWN):
+          continue
+        if old[metric] and result[metric] > old[metric] * threshold:
+          regressions.append('{0}/{1}: {2} went from {3} to {4}'.format(
+              corpus, stage, metric, old[metric], result[metric]))
+  return regressions
+
+
+def run_benchmarks(msg_dir, corpora, repeat=1, profile_limit=15):
+  """Runs every stage on every corpus.
+
+  Returns:
+    The report, as a dictionary.
+  """
+  report = {
+    'python': platform.python_version(),
+    'platform': platform.platform(),
+    'repeat': repeat,
+    'corpora': {},
+  }
+  old_cache_dir = common._CACHE_DIR
+  common._CACHE_DIR = ''
+  try:
+    for corpus in corpora:
+      with tempfile.TemporaryDirectory(prefix='blockly-i18n-') as corpus_dir:
+        results = make_corpus(corpus, msg_dir, corpus_dir)
+        results['stages'] = {}
+        for stage in STAGES:
+          results['stages'][stage] = measure_stage(
+              stage, corpus_dir, repeat, profile_limit)
+        results['total_seconds'] = round(sum(
+            result['seconds'] for result in results['stages'].values()), 6)
+        report['corpora'][corpus] = results
+  finally:
+    common._CACHE_DIR = old_cache_dir
+  return report
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description='Benchmark the i18n build pipeline.')
+  parser.add_argument('--msg_dir', default='msg',
+                      help='directory with messages.js and json/')
+  parser.add_argument('--corpus', action='append', choices=CORPORA,
+                      help='corpus to run (repeatable; default: all)')
+  parser.add_argument('--repeat', type=int, default=1,
+                      help='timed runs per stage; the fastest is reported')
+  parser.add_argument('--profile_limit', type=int, default=15,
+                      help='functions to list per stage profile (0 to skip '
+                      'profiling)')
+  parser.add_argument('--output', default=None,
+                      help='file to write the JSON report to '
+                      '(default: standard output)')
+  parser.add_argument('--baseline', default=None,
+                      help='earlier report to check for regressions')
+  parser.add_argument('--threshold', type=float, default=1.5,
+                      help='slowdown or memory growth ratio, relative to '
+                      'the baseline, that counts as a regression')
+  args = parser.parse_args()
+
+  report = run_benchmarks(args.msg_dir, args.corpus or CORPORA,
+                          max(args.repeat, 1), args.profile_limit)
+  regressions = []
+  if args.baseline:
+    with open(args.baseline, encoding='utf-8') as infile:
+      baseline = json.load(infile)
+    regressions = find_regressions(report, baseline, args.threshold)
+    report['threshold'] = args.threshold
+    report['regressions'] = regressions
+
+  text = json.dumps(report, indent=2, sort_keys=True) + '\n'
+  if args.output:
+    common.write_text_file(args.output, text)
+  else:
+    sys.stdout.write(text)
+  for corpus, results in report['corpora'].items():
+    sys.stderr.write('{0}: {1} keys, {2} languages\n'.format(
+        corpus, results['keys'], results['languages']))
+    for stage in STAGES:
+      result = results['stages'][stage]
+      sys.stderr.write('  {0:16} {1:9.3f} s {2:9.1f} MB\n'.format(
+          stage, result['seconds'], result['peak_bytes'] / 1e6))
+  for regression in regressions:
+    sys.stderr.write('REGRESSION: ' + regression + '\n')
+  if regressions:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
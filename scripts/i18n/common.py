@@ -17,10 +17,28 @@
 # limitations under the License.
 
 import codecs
+import hashlib
 import json
+import marshal
 import os
+import sys
+import tempfile
+import time
 from datetime import datetime
 
+# Directory for cached parsed JSON files; see read_json_file.  Set the
+# BLOCKLY_I18N_CACHE environment variable to override, or to an empty
+# string to disable the cache.
+_CACHE_DIR = os.environ.get(
+    'BLOCKLY_I18N_CACHE',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or
+                 os.path.join(os.path.expanduser('~'), '.cache'),
+                 'blockly', 'i18n'))
+
+# Part of every cache entry.  marshal's format may change between Python
+# versions, and this must change if the cached data changes.
+_CACHE_FORMAT = (1, marshal.version, sys.version_info[:2])
+
 class InputError(Exception):
     """Exception raised for errors in the input.
 
@@ -36,150 +54,224 @@ class InputError(Exception):
         self.msg = msg
 
 
-def read_json_file(filename):
+def _cache_path(filename):
+  """Returns the cache entry path for a JSON file, or None if disabled."""
+  if not _CACHE_DIR:
+    return None
+  key = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()
+  return os.path.join(_CACHE_DIR, key + '.marshal')
+
+
+def _read_cache(cache_path):
+  """Returns a (format, size, mtime, content hash, defs) cache entry or None.
+  """
+  try:
+    with open(cache_path, 'rb') as infile:
+      entry = marshal.load(infile)
+  except (IOError, OSError, EOFError, ValueError, TypeError):
+    return None
+  if not isinstance(entry, tuple) or len(entry) != 5:
+    return None
+  if entry[0] != _CACHE_FORMAT:
+    return None
+  return entry
+
+
+def _write_cache(cache_path, entry):
+  """Atomically writes a cache entry.  Failures are ignored."""
+  try:
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+    with os.fdopen(fd, 'wb') as outfile:
+      marshal.dump(entry, outfile)
+    os.replace(temp_path, cache_path)
+  except (IOError, OSError):
+    pass
+
+
+def read_json_file(filename, check_suffix=True):
   """Read a JSON file as UTF-8 into a dictionary, discarding @metadata.
 
+  Parsed files are cached on disk (see _CACHE_DIR), keyed by path, size,
+  modification time and content hash.  If the size and modification time
+  are unchanged the file isn't read at all; if only the modification time
+  changed, the content hash decides whether the cached copy is still good.
+
   Args:
-    filename: The filename, which must end ".json".
+    filename: The filename, which must end ".json" if check_suffix is true.
+    check_suffix: Whether to reject filenames that don't end ".json".
 
   Returns:
-    The dictionary.
+    The dictionary.  Each call returns a new dictionary, which the caller
+    may modify.
 
   Raises:
-    InputError: The filename did not end with ".json" or an error occurred
-        while opening or reading the file.
+    InputError: The filename did not end with ".json" (and check_suffix was
+        true) or an error occurred while opening or reading the file.
   """
-  if not filename.endswith('.json'):
+  if check_suffix and not filename.endswith('.json'):
     raise InputError(filename, 'filenames must end with ".json"')
+  cache_path = _cache_path(filename)
+  entry = _read_cache(cache_path) if cache_path else None
   try:
+    stat = os.stat(filename)
+    if entry and entry[1:3] == (stat.st_size, stat.st_mtime_ns):
+      return entry[4]
     # Read in file.
-    with codecs.open(filename, 'r', 'utf-8') as infile:
-      defs = json.load(infile)
-    if '@metadata' in defs:
-      del defs['@metadata']
+    with open(filename, 'rb') as infile:
+      data = infile.read()
+    content_hash = hashlib.sha1(data).hexdigest()
+    if entry and entry[3] == content_hash:
+      defs = entry[4]
+    else:
+      defs = json.loads(data.decode('utf-8'))
+      if '@metadata' in defs:
+        del defs['@metadata']
+    if cache_path:
+      mtime = stat.st_mtime_ns
+      if time.time_ns() - mtime < 2 * 10**9:
+        # The file could still change within the same mtime tick; make the
+        # next read check the content hash instead.
+        mtime = None
+      _write_cache(cache_path, (_CACHE_FORMAT, stat.st_size, mtime,
+                                content_hash, defs))
     return defs
   except ValueError as e:
     print('Error reading ' + filename)
     raise InputError(filename, str(e))
 
 
-def _create_qqq_file(output_dir):
-    """Creates a qqq.json file with message documentation for translatewiki.net.
-
-    The file consists of key-value pairs, where the keys are message ids and
-    the values are descriptions for the translators of the messages.
-    What documentation exists for the format can be found at:
-    http://translatewiki.net/wiki/Translating:Localisation_for_developers#Message_documentation
+def write_text_file(filename, text):
+    """Writes text to a UTF-8 file atomically, unless it is unchanged.
 
-    The file should be closed by _close_qqq_file().
+    The text is written to a temporary file in the same directory, which is
+    then renamed over the original, so an interrupted run never leaves a
+    partially written file behind.  An existing file with exactly the same
+    content is left alone, keeping its modification time.
 
-    Parameters:
-        output_dir: The output directory.
+    Args:
+        filename: The file to write.
+        text: The complete new content.
 
     Returns:
-        A pointer to a file to which a left brace and newline have been written.
+        True if the file was written, False if it was already up to date.
 
     Raises:
-        IOError: An error occurred while opening or writing the file.
+        IOError: An error occurred while writing or renaming the file.
     """
-    qqq_file_name = os.path.join(os.curdir, output_dir, 'qqq.json')
-    qqq_file = codecs.open(qqq_file_name, 'w', 'utf-8')
-    print('Created file: ' + qqq_file_name)
-    qqq_file.write('{\n')
-    return qqq_file
-
-
-def _close_qqq_file(qqq_file):
-    """Closes a qqq.json file created and opened by _create_qqq_file().
+    data = text.encode('utf-8')
+    try:
+        with open(filename, 'rb') as infile:
+            if infile.read() == data:
+                return False
+        mode = os.stat(filename).st_mode & 0o777
+    except IOError:
+        # New files get the usual permissions, not mkstemp's private ones.
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(filename) or os.curdir,
+        prefix='.' + os.path.basename(filename) + '.')
+    try:
+        with os.fdopen(fd, 'wb') as outfile:
+            outfile.write(data)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
+
+
+def _json_text(defs):
+    """Serializes a dictionary in the format used for translatewiki.net.
+
+    Entries are kept in insertion order, one per line, indented with tabs.
+    """
+    return json.dumps(defs, ensure_ascii=False, indent='\t') + '\n'
 
-    This writes the final newlines and right brace.
 
-    Args:
-        qqq_file: A file created by _create_qqq_file().
+def _write_json_file(filename, defs):
+    """Writes a dictionary to a .json file with write_text_file.
 
     Raises:
-        IOError: An error occurred while writing to or closing the file.
+        IOError: An error occurred while writing the file.
     """
-    qqq_file.write('\n}\n')
-    qqq_file.close()
-
-
-def _create_lang_file(author, lang, output_dir):
-    """Creates a <lang>.json file for translatewiki.net.
-
-    The file consists of metadata, followed by key-value pairs, where the keys
-    are message ids and the values are the messages in the language specified
-    by the corresponding command-line argument.  The file should be closed by
-    _close_lang_file().
-
-    Args:
-        author: Name and email address of contact for translators.
-        lang: ISO 639-1 source language code.
-        output_dir: Relative directory for output files.
+    if write_text_file(filename, _json_text(defs)):
+        print('Created file: ' + filename)
+    else:
+        print('Unchanged file: ' + filename)
 
-    Returns:
-        A pointer to a file to which the metadata has been written.
 
-    Raises:
-        IOError: An error occurred while opening or writing the file.
-    """
-    lang_file_name = os.path.join(os.curdir, output_dir, lang + '.json')
-    lang_file = codecs.open(lang_file_name, 'w', 'utf-8')
-    print('Created file: ' + lang_file_name)
-    # string.format doesn't like printing braces, so break up our writes.
-    lang_file.write('{\n\t"@metadata": {')
-    lang_file.write("""
-\t\t"author": "{0}",
-\t\t"lastupdated": "{1}",
-\t\t"locale": "{2}",
-\t\t"messagedocumentation" : "qqq"
-""".format(author, str(datetime.now()), lang))
-    lang_file.write('\t},\n')
-    return lang_file
+def _read_metadata(filename):
+    """Returns the @metadata of an existing .json file, or an empty dict."""
+    try:
+        with codecs.open(filename, 'r', 'utf-8') as infile:
+            metadata = json.load(infile).get('@metadata')
+    except (IOError, ValueError, AttributeError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
 
 
-def _close_lang_file(lang_file):
-    """Closes a <lang>.json file created with _create_lang_file().
+def _create_qqq_defs(units):
+    """Creates the contents of a qqq.json file for translatewiki.net.
 
-    This also writes the terminating left brace and newline.
+    The file consists of key-value pairs, where the keys are message ids and
+    the values are descriptions for the translators of the messages.
+    What documentation exists for the format can be found at:
+    http://translatewiki.net/wiki/Translating:Localisation_for_developers#Message_documentation
 
     Args:
-        lang_file: A file opened with _create_lang_file().
+        units: As for write_files.
 
-    Raises:
-        IOError: An error occurred while writing to or closing the file.
+    Returns:
+        A dictionary mapping message ids to descriptions.
     """
-    lang_file.write('\n}\n')
-    lang_file.close()
+    return {unit['meaning']: unit['description'].replace('\\n', '\n')
+            .replace('{lb}', '{').replace('{rb}', '}') for unit in units}
+
 
+def _create_lang_defs(author, lang, units, lastupdated):
+    """Creates the contents of a <lang>.json file for translatewiki.net.
 
-def _create_key_file(output_dir):
-    """Creates a keys.json file mapping Closure keys to Blockly keys.
+    The file consists of metadata, followed by key-value pairs, where the keys
+    are message ids and the values are the messages in the language specified
+    by the corresponding command-line argument.
 
     Args:
-        output_dir: Relative directory for output files.
+        author: Name and email address of contact for translators.
+        lang: ISO 639-1 source language code.
+        units: As for write_files.
+        lastupdated: Value for the "lastupdated" metadata.
 
-    Raises:
-        IOError: An error occurred while creating the file.
+    Returns:
+        A dictionary with "@metadata" followed by the messages.
     """
-    key_file_name = os.path.join(os.curdir, output_dir, 'keys.json')
-    key_file = open(key_file_name, 'w')
-    key_file.write('{\n')
-    print('Created file: ' + key_file_name)
-    return key_file
+    defs = {
+        '@metadata': {
+            'author': author,
+            'lastupdated': lastupdated,
+            'locale': lang,
+            'messagedocumentation': 'qqq',
+        },
+    }
+    for unit in units:
+        defs[unit['meaning']] = unit['source']
+    return defs
 
 
-def _close_key_file(key_file):
-    """Closes a key file created and opened with _create_key_file().
+def _create_key_defs(units):
+    """Creates the contents of a keys.json file mapping Closure keys to
+    Blockly keys.
 
     Args:
-        key_file: A file created by _create_key_file().
+        units: As for write_files.
 
-    Raises:
-        IOError: An error occurred while writing to or closing the file.
+    Returns:
+        A dictionary mapping meanings to keys.
     """
-    key_file.write('\n}\n')
-    key_file.close()
+    return {unit['meaning']: unit['key'] for unit in units}
 
 
 def write_files(author, lang, output_dir, units, write_key_file):
@@ -193,41 +285,40 @@ def write_files(author, lang, output_dir, units, write_key_file):
       codes).  This is only output if the parameter write_key_file is True.
     * qqq_file: JSON file mapping meanings to descriptions.
 
+    Each file is built in memory, serialized with the json module and
+    written with write_text_file, so files whose content is unchanged are
+    not rewritten.  The lang_file's "lastupdated" metadata is only changed
+    when some other part of it is.
+
     Args:
         author: Name and email address of contact for translators.
         lang: ISO 639-1 source language code.
         output_dir: Relative directory for output files.
         units: A list of dictionaries with entries for 'meaning', 'source',
             'description', and 'keys' (the last only if write_key_file is true),
-            in the order desired in the output files.
+            in the order desired in the output files.  Descriptions may use
+            "\\n" for line breaks and "{lb}" and "{rb}" for braces.
         write_key_file: Whether to output a keys.json file.
 
     Raises:
-        IOError: An error occurs opening, writing to, or closing a file.
+        IOError: An error occurs writing a file.
         KeyError: An expected key is missing from units.
     """
-    lang_file = _create_lang_file(author, lang, output_dir)
-    qqq_file = _create_qqq_file(output_dir)
-    if write_key_file:
-      key_file = _create_key_file(output_dir)
-    first_entry = True
-    for unit in units:
-        if not first_entry:
-            lang_file.write(',\n')
-            if write_key_file:
-              key_file.write(',\n')
-            qqq_file.write(',\n')
-        lang_file.write(u'\t"{0}": "{1}"'.format(
-            unit['meaning'],
-            unit['source'].replace('"', "'")))
-        if write_key_file:
-          key_file.write('"{0}": "{1}"'.format(unit['meaning'], unit['key']))
-        qqq_file.write(u'\t"{0}": "{1}"'.format(
-            unit['meaning'],
-            unit['description'].replace('"', "'").replace(
-                '{lb}', '{').replace('{rb}', '}')))
-        first_entry = False
-    _close_lang_file(lang_file)
+    lang_file_name = os.path.join(os.curdir, output_dir, lang + '.json')
+    # Keep the old timestamp, unless that leaves the file out of date.
+    lang_defs = _create_lang_defs(
+        author, lang, units,
+        _read_metadata(lang_file_name).get('lastupdated'))
+    try:
+        with codecs.open(lang_file_name, 'r', 'utf-8') as infile:
+            current = infile.read() == _json_text(lang_defs)
+    except IOError:
+        current = False
+    if not current:
+        lang_defs['@metadata']['lastupdated'] = str(datetime.now())
+    _write_json_file(lang_file_name, lang_defs)
     if write_key_file:
-      _close_key_file(key_file)
-    _close_qqq_file(qqq_file)
+        _write_json_file(os.path.join(os.curdir, output_dir, 'keys.json'),
+                         _create_key_defs(units))
+    _write_json_file(os.path.join(os.curdir, output_dir, 'qqq.json'),
+                     _create_qqq_defs(units))
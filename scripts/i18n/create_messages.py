@@ -18,14 +18,72 @@
 
 import argparse
 import codecs
+import hashlib
+import json
+import multiprocessing
 import os
 import re
 import sys
-from common import read_json_file
+import common
+from common import InputError, read_json_file, write_text_file
 
 
 _NEWLINE_PATTERN = re.compile('[\n\r]')
 
+# Categories written to their own chunk in --chunked mode, with the key
+# prefixes that belong to each (following the sections of msg/messages.js).
+# The first match wins, so CONTROLS_IF_* keys go with logic.  Every other
+# key, and every constant, goes in the core chunk.
+_CHUNK_PREFIXES = (
+  ('logic', ('LOGIC_', 'CONTROLS_IF_')),
+  ('loops', ('LOOPS_', 'CONTROLS_')),
+  ('math', ('MATH_',)),
+  ('text', ('TEXT_', 'TEXTS_')),
+  ('lists', ('LISTS_',)),
+  ('variables', ('VARIABLES_',)),
+  ('procedures', ('PROCEDURES_',)),
+)
+CORE_CHUNK = 'core'
+CHUNK_NAMES = (CORE_CHUNK,) + tuple(name for name, _ in _CHUNK_PREFIXES)
+
+# In --fallback mode, untranslated messages are copied from the source
+# language table in FALLBACK_FILE, which must be loaded first.  The table
+# also defines every source message itself, since a langfile wrapped in its
+# own scope (as in the packaged UMD modules) can't see Blockly.FallbackMsg,
+# and then skips the copy.
+FALLBACK_FILE = 'fallback.js'
+_FALLBACK_LINE = (u'if (Blockly.FallbackMsg) {0}.forEach(function(key) {{ '
+                  'Blockly.Msg[key] = Blockly.FallbackMsg[key]; }});'
+                  '  // untranslated\n')
+
+# Version of the key map written by --minify_keys.  Ids in a key map are
+# never reassigned, so bumping this invalidates every reference to them.
+_KEY_MAP_VERSION = 1
+# Script that defines every message in --minify_keys mode.  Values are
+# stored in an array indexed by id and synonyms as [id, target id] pairs;
+# ids are the base 36 representation of the index.  Unless keys is null,
+# every message is also defined under its full key (keys[id]), since nothing
+# in this repository rewrites Msg references in the code to use the ids.
+_MINIFIED_TEXT = (u'(function(msg, values, synonyms, keys) {{\n'
+                  '  values.forEach(function(value, id) {{\n'
+                  '    if (value !== null) msg[id.toString(36)] = value;\n'
+                  '  }});\n'
+                  '  synonyms.forEach(function(pair) {{\n'
+                  '    msg[pair[0].toString(36)] = msg[pair[1].toString(36)];\n'
+                  '  }});\n'
+                  '  if (keys) keys.forEach(function(key, id) {{\n'
+                  '    if (key !== null) msg[key] = msg[id.toString(36)];\n'
+                  '  }});\n'
+                  '}})(Blockly.Msg, [\n{0}\n], {1}, {2});\n')
+
+_HEADER = """// This file was automatically generated.  Do not modify.
+
+'use strict';
+
+var Blockly = Blockly || {{ Msg: Object.create(null) }};
+
+"""
+
 
 def string_is_ascii(s):
   try:
@@ -46,6 +104,449 @@ def load_constants(filename):
     constants_text += u'\nBlockly.Msg["{0}"] = \"{1}\";'.format(key, value)
   return constants_text
 
+def chunk_name(key):
+  """Return the name of the chunk a message key is written to."""
+  for name, prefixes in _CHUNK_PREFIXES:
+    if key.startswith(prefixes):
+      return name
+  return CORE_CHUNK
+
+
+def output_names(target_lang, chunked=False):
+  """Return the output files for a language, relative to output_dir.
+
+  Normally this is just <lang>.js.  In chunked mode it is <lang>/core.js,
+  which must be loaded first, and one <lang>/<category>.js per category.
+  """
+  if not chunked:
+    return [target_lang + '.js']
+  return [os.path.join(target_lang, name + '.js') for name in CHUNK_NAMES]
+
+
+def write_chunk_manifest(filename, source_defs, synonym_defs, constant_keys):
+  """Write the list of keys defined by each chunk.
+
+  The assignment of keys to chunks is the same for every language, so a
+  single manifest tells a loader which chunk to fetch for any message.
+  """
+  chunks = {name: [] for name in CHUNK_NAMES}
+  for key in list(source_defs) + list(synonym_defs):
+    chunks[chunk_name(key)].append(key)
+  chunks[CORE_CHUNK].extend(constant_keys)
+  manifest = {
+    'core': CORE_CHUNK,
+    'files': '{lang}/{chunk}.js',
+    'chunks': {name: sorted(keys) for name, keys in chunks.items()},
+  }
+  write_text_file(filename, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def write_fallback_table(filename, source_defs, synonym_defs):
+  """Write the source language table used by --fallback mode.
+
+  The table has every source message and every synonym of one, and defines
+  them all in Blockly.Msg too.
+
+  Returns:
+    True if the file was written.
+  """
+  defs = dict(source_defs)
+  for key, target in synonym_defs.items():
+    if target in source_defs:
+      defs[key] = source_defs[target]
+  lines = [u'"{0}": "{1}"'.format(key, defs[key].replace('"', '\\"'))
+           for key in sorted(defs)]
+  text = (_HEADER.format() + u'Blockly.FallbackMsg = {\n' +
+          u',\n'.join(lines) + u'\n};\n' +
+          u'for (var key in Blockly.FallbackMsg) {\n'
+          u'  Blockly.Msg[key] = Blockly.FallbackMsg[key];\n'
+          u'}\n')
+  return write_text_file(filename, text)
+
+
+def update_key_map(filename, keys):
+  """Assign a short id to every message key, reusing any existing ones.
+
+  The key map is a JSON file mapping each key to its id, for rewriting
+  references to Blockly.Msg in the compiled code.  No build in this
+  repository does that rewriting yet.  Keys keep their ids for
+  as long as the file is kept, and ids of deleted keys are not reused, so
+  a key map checked in alongside the code stays valid as messages are
+  added.
+
+  Args:
+    filename: Path to the key map, which need not exist yet.
+    keys: Every key that is output.
+
+  Returns:
+    A dictionary mapping each key to its id.
+  """
+  try:
+    with codecs.open(filename, 'r', 'utf-8') as infile:
+      key_map = json.load(infile)
+  except (IOError, ValueError):
+    key_map = {}
+  if key_map.get('version') != _KEY_MAP_VERSION:
+    key_map = {'version': _KEY_MAP_VERSION, 'next': 0, 'keys': {}}
+  ids = key_map['keys']
+  for key in sorted(set(keys) - set(ids)):
+    ids[key] = _base36(key_map['next'])
+    key_map['next'] += 1
+  write_text_file(filename, json.dumps(key_map, indent=2, sort_keys=True))
+  return {key: ids[key] for key in keys}
+
+
+def _base36(number):
+  """Return a non-negative integer in base 36, like toString(36) in JS."""
+  digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+  text = ''
+  while True:
+    number, digit = divmod(number, 36)
+    text = digits[digit] + text
+    if not number:
+      return text
+
+
+def file_hash(filename):
+  """Return the SHA-256 hex digest of a file's contents."""
+  with open(filename, 'rb') as infile:
+    return hashlib.sha256(infile.read()).hexdigest()
+
+
+def read_manifest(filename):
+  """Read an incremental build manifest, or return an empty one.
+
+  The manifest maps each output file name to the hash of the inputs it was
+  built from.  A missing or unreadable manifest is treated as empty, so
+  everything is rebuilt.
+  """
+  try:
+    with codecs.open(filename, 'r', 'utf-8') as infile:
+      manifest = json.load(infile)
+  except (IOError, ValueError):
+    return {}
+  return manifest.get('outputs', {})
+
+
+def write_manifest(filename, outputs):
+  """Write an incremental build manifest (see read_manifest)."""
+  write_text_file(filename, json.dumps({'outputs': outputs}, indent=2,
+                                       sort_keys=True))
+
+
+# Definitions shared by every output file, set by _init_worker.
+_shared = None
+
+
+def _init_worker(shared):
+  """Make the shared definitions available to create_lang_file.
+
+  In a process pool this runs once per worker, so the shared definitions
+  are sent to each worker once rather than with every file.
+  """
+  global _shared
+  _shared = shared
+
+
+def load_shared(source_lang_file, source_synonym_file, source_constants_file,
+                output_dir, quiet=False, chunked=False,
+                fallback=False, key_ids=None, key_aliases=True):
+  """Read the definitions shared by every output file.
+
+  Args:
+    source_lang_file: Path to .json file for source language.
+    source_synonym_file: Path to .json file with synonym definitions.
+    source_constants_file: Path to .json file with constant definitions.
+    output_dir: Relative directory for output files.
+    quiet: Whether to suppress routine messages.
+    chunked: Whether to split each language into per-category chunks.
+    fallback: Whether to copy untranslated messages from FALLBACK_FILE
+        instead of writing them into every language.
+    key_ids: Dictionary mapping keys to short ids (see update_key_map) to
+        write a minified table instead of one statement per message.
+    key_aliases: Whether a minified table also defines each message under
+        its full key.
+
+  Returns:
+    A dictionary to pass to _init_worker.
+
+  Raises:
+    InputError: The source language file contained a newline.
+  """
+  # Read in source language .json file, which provides any values missing
+  # in target languages' .json files.
+  source_defs = read_json_file(os.path.join(os.curdir, source_lang_file))
+  # Make sure the source file doesn't contain a newline or carriage return.
+  for key, value in source_defs.items():
+    if _NEWLINE_PATTERN.search(value):
+      raise InputError(source_lang_file,
+          'definition of {0} contained a newline character.'.format(key))
+  sorted_keys = sorted(source_defs.keys())
+
+  # Read in synonyms file, which must be output in every language.
+  synonym_defs = read_json_file(os.path.join(os.curdir, source_synonym_file))
+  if '#' in synonym_defs:  # Delete any comment.
+    del synonym_defs['#']
+
+  # synonym_defs is also being sorted to ensure the same order is kept
+  synonym_text = '\n'.join([u'Blockly.Msg["{0}"] = Blockly.Msg["{1}"];'
+      .format(key, synonym_defs[key]) for key in sorted(synonym_defs)])
+
+  # Read in constants file, which must be output in every language.
+  constants_text = load_constants(
+      os.path.join(os.curdir, source_constants_file))
+  constant_defs = read_json_file(
+      os.path.join(os.curdir, source_constants_file))
+  if '#' in constant_defs:  # Delete any comment.
+    del constant_defs['#']
+
+  return {
+    'source_defs': source_defs,
+    'sorted_keys': sorted_keys,
+    'synonym_defs': synonym_defs,
+    'synonym_text': synonym_text,
+    'constants_text': constants_text,
+    'constant_defs': constant_defs,
+    'output_dir': output_dir,
+    'quiet': quiet,
+    'chunked': chunked,
+    'fallback': fallback,
+    'key_ids': key_ids,
+    'key_aliases': key_aliases,
+  }
+
+
+def create_lang_file(arg_file):
+  """Generate the .js file for one language's .json file.
+
+  Args:
+    arg_file: Path to the language's .json file.
+
+  Returns:
+    A list of messages to print, in order.
+  """
+  (_, filename) = os.path.split(arg_file)
+  target_lang = filename[:filename.index('.')]
+  if target_lang in ('qqq', 'keys', 'synonyms', 'constants'):
+    return []
+  target_defs = read_json_file(os.path.join(os.curdir, arg_file))
+  return build_lang_file(arg_file, target_defs)
+
+
+def _message_lines(keys, entries, fallback, synonyms=()):
+  """Return the lines defining the given keys.
+
+  Args:
+    keys: Source keys, in output order.
+    entries: Dictionary mapping each source key to its escaped value and
+        trailing comment (which is empty unless the key is untranslated).
+    fallback: Whether untranslated keys are copied from the fallback table
+        rather than written out.
+    synonyms: Synonym keys to define as references to their targets, in
+        output order.  In fallback mode, synonyms of untranslated keys are
+        copied from the fallback table instead, since the target may not be
+        defined in the same scope.
+
+  Returns:
+    A list of lines, each ending in a newline.
+  """
+  lines = []
+  untranslated = []
+  for key in keys:
+    value, comment = entries[key]
+    if fallback and comment:
+      untranslated.append(key)
+    else:
+      lines.append(u'Blockly.Msg["{0}"] = "{1}";{2}\n'
+          .format(key, value, comment))
+  for key in synonyms:
+    target = _shared['synonym_defs'][key]
+    if fallback and entries[target][1]:
+      untranslated.append(key)
+    else:
+      lines.append(u'Blockly.Msg["{0}"] = Blockly.Msg["{1}"];\n'
+          .format(key, target))
+  if untranslated:
+    lines.append(_FALLBACK_LINE.format(
+        json.dumps(untranslated, separators=(',', ':'))))
+  return lines
+
+
+def _chunk_texts(header, entries, fallback):
+  """Split one language's messages into chunks.
+
+  Args:
+    header: Text to start every chunk with.
+    entries: As for _message_lines.
+    fallback: As for _message_lines.
+
+  Returns:
+    The text of each chunk, in CHUNK_NAMES order.
+  """
+  chunk_keys = {name: [] for name in CHUNK_NAMES}
+  for key in _shared['sorted_keys']:
+    chunk_keys[chunk_name(key)].append(key)
+  chunk_synonyms = {name: [] for name in CHUNK_NAMES}
+  copied_lines = {name: [] for name in CHUNK_NAMES}
+  for key in sorted(_shared['synonym_defs']):
+    target = _shared['synonym_defs'][key]
+    chunk = chunk_name(key)
+    if chunk_name(target) in (chunk, CORE_CHUNK):
+      chunk_synonyms[chunk].append(key)
+    else:
+      # The target's chunk might not be loaded, so copy its value.
+      copied_lines[chunk].append(u'Blockly.Msg["{0}"] = "{1}";{2}\n'
+          .format(key, *entries[target]))
+  texts = []
+  for name in CHUNK_NAMES:
+    text = header + ''.join(_message_lines(
+        chunk_keys[name], entries, fallback, chunk_synonyms[name]))
+    text += ''.join(copied_lines[name])
+    if name == CORE_CHUNK:
+      text += _shared['constants_text']
+    texts.append(text)
+  return texts
+
+
+def _minified_text(entries):
+  """Return the --minify_keys definitions of one language's messages.
+
+  Args:
+    entries: As for _message_lines.
+
+  Returns:
+    A script defining every message under its short id.
+  """
+  key_ids = _shared['key_ids']
+  values = {}
+  for key in _shared['sorted_keys']:
+    values[int(key_ids[key], 36)] = entries[key][0]
+  for key, value in _shared['constant_defs'].items():
+    values[int(key_ids[key], 36)] = value.replace('"', '\\"')
+  table = [u'"{0}"'.format(values[index]) if index in values else 'null'
+           for index in range(max(values) + 1)]
+  synonyms = [[int(key_ids[key], 36), int(key_ids[target], 36)]
+              for key, target in sorted(_shared['synonym_defs'].items())]
+  keys = None
+  if _shared['key_aliases']:
+    keys = [None] * (max(int(key_id, 36) for key_id in key_ids.values()) + 1)
+    for key, key_id in key_ids.items():
+      keys[int(key_id, 36)] = key
+  return _MINIFIED_TEXT.format(',\n'.join(table),
+                               json.dumps(synonyms, separators=(',', ':')),
+                               json.dumps(keys, separators=(',', ':')))
+
+
+def _lang_texts(header, entries, fallback):
+  """Return the text of each output file for one language.
+
+  Args:
+    header: Text to start every file with.
+    entries: As for _message_lines.
+    fallback: As for _message_lines.
+
+  Returns:
+    A list of texts, in output_names order.
+  """
+  if _shared['chunked']:
+    return _chunk_texts(header, entries, fallback)
+  if _shared['key_ids']:
+    return [header + _minified_text(entries)]
+  lines = [header]
+  if fallback:
+    lines.extend(_message_lines(_shared['sorted_keys'], entries, fallback,
+                                sorted(_shared['synonym_defs'])))
+  else:
+    lines.extend(_message_lines(_shared['sorted_keys'], entries, fallback))
+    lines.append(_shared['synonym_text'])
+  lines.append(_shared['constants_text'])
+  return [''.join(lines)]
+
+
+def build_lang_file(arg_file, target_defs):
+  """Generate the .js file(s) for one language from its parsed definitions.
+
+  Args:
+    arg_file: Path to the language's .json file.
+    target_defs: The language's definitions.  Not modified.
+
+  Returns:
+    A list of messages to print, in order.
+  """
+  messages = []
+  source_defs = _shared['source_defs']
+  synonym_defs = _shared['synonym_defs']
+  quiet = _shared['quiet']
+  (_, filename) = os.path.split(arg_file)
+  target_lang = filename[:filename.index('.')]
+  target_defs = dict(target_defs)
+  if _shared['chunked']:
+    os.makedirs(os.path.join(os.curdir, _shared['output_dir'], target_lang),
+                exist_ok=True)
+
+  # Verify that keys are 'ascii'
+  bad_keys = [key for key in target_defs if not string_is_ascii(key)]
+  if bad_keys:
+    messages.append(u'These keys in {0} contain non ascii characters: {1}'
+        .format(filename, ', '.join(bad_keys)))
+
+  # If there's a '\n' or '\r', remove it and print a warning.
+  for key, value in target_defs.items():
+    if _NEWLINE_PATTERN.search(value):
+      messages.append(u'WARNING: definition of {0} in {1} contained '
+                      'a newline character.'.format(key, arg_file))
+      target_defs[key] = _NEWLINE_PATTERN.sub(' ', value)
+
+  # For each key in the source language file, output the target value
+  # if present; otherwise, output the source language value with a
+  # warning comment.
+  entries = {}
+  for key in _shared['sorted_keys']:
+    if key in target_defs:
+      value = target_defs[key]
+      comment = ''
+      del target_defs[key]
+    else:
+      value = source_defs[key]
+      comment = '  // untranslated'
+    entries[key] = (value.replace('"', '\\"'), comment)
+
+  # Announce any keys defined only for target language.
+  if target_defs and not quiet:
+    extra_keys = [key for key in target_defs if key not in synonym_defs]
+    synonym_keys = [key for key in target_defs if key in synonym_defs]
+    if extra_keys:
+      messages.append(u'These extra keys appeared in {0}: {1}'.format(
+          filename, ', '.join(extra_keys)))
+    if synonym_keys:
+      messages.append(u'These synonym keys appeared in {0}: {1}'.format(
+          filename, ', '.join(synonym_keys)))
+
+  header = _HEADER.format(target_lang.replace('-', '.'))
+  outputs = _lang_texts(header, entries, _shared['fallback'])
+  names = output_names(target_lang, _shared['chunked'])
+  if _shared['fallback'] and not quiet:
+    # Compare with what would have been written without the table.
+    full_size = sum(len(text.encode('utf-8'))
+                    for text in _lang_texts(header, entries, False))
+    size = sum(len(text.encode('utf-8')) for text in outputs)
+    untranslated = sum(1 for _, comment in entries.values() if comment)
+    messages.append(u'Fallback table saved {0} bytes ({1:.1f}%) in {2} '
+                    '({3} untranslated messages).'.format(
+                        full_size - size, 100.0 * (full_size - size) /
+                        full_size, target_lang, untranslated))
+
+  for name, text in zip(names, outputs):
+    outname = os.path.join(os.curdir, _shared['output_dir'], name)
+    written = write_text_file(outname, text)
+    if not quiet:
+      if written:
+        messages.append('Created {0}'.format(outname))
+      else:
+        messages.append('Unchanged {0}'.format(outname))
+  return messages
+
+
 def main():
   """Generate .js files defining Blockly core and language messages."""
 
@@ -68,99 +569,149 @@ def main():
                       help='relative path to input keys file')
   parser.add_argument('--quiet', action='store_true', default=False,
                       help='do not write anything to standard output')
+  parser.add_argument('--incremental', action='store_true', default=False,
+                      help='only rebuild output files whose inputs changed')
+  parser.add_argument('--manifest', default=None,
+                      help='path to the incremental build manifest '
+                      '(default: .create_messages.json in output_dir)')
+  parser.add_argument('--jobs', type=int, default=1,
+                      help='number of processes to generate files with')
+  parser.add_argument('--chunked', action='store_true', default=False,
+                      help='split each language into a core chunk and one '
+                      'chunk per block category, listed in chunks.json')
+  parser.add_argument('--fallback', action='store_true', default=False,
+                      help='copy untranslated messages from a shared table '
+                      'of source language messages, ' + FALLBACK_FILE +
+                      ', instead of repeating them in every file')
+  parser.add_argument('--minify_keys', action='store_true', default=False,
+                      help='write messages as a compact table indexed by '
+                      'short ids, and the ids to the key map.  Each message '
+                      'is still defined under its full key too, unless '
+                      '--no_key_aliases is given')
+  parser.add_argument('--no_key_aliases', action='store_false',
+                      dest='key_aliases', default=True,
+                      help='build-internal: with --minify_keys, define '
+                      'messages only under their ids.  Only for builds that '
+                      'rewrite every Msg reference using the key map; no '
+                      'build in this repository does, and without that '
+                      'every message lookup fails')
+  parser.add_argument('--key_map', default=None,
+                      help='path to the --minify_keys key map, which keeps '
+                      'ids stable between builds '
+                      '(default: keymap.json in output_dir)')
   parser.add_argument('files', nargs='+', help='input files')
   args = parser.parse_args()
+  if args.minify_keys and (args.chunked or args.fallback):
+    parser.error('--minify_keys cannot be used with --chunked or --fallback')
   if not args.output_dir.endswith(os.path.sep):
     args.output_dir += os.path.sep
+  manifest_file = args.manifest or os.path.join(
+      os.curdir, args.output_dir, '.create_messages.json')
 
-  # Read in source language .json file, which provides any values missing
-  # in target languages' .json files.
-  source_defs = read_json_file(os.path.join(os.curdir, args.source_lang_file))
-  # Make sure the source file doesn't contain a newline or carriage return.
-  for key, value in source_defs.items():
-    if _NEWLINE_PATTERN.search(value):
-      print('ERROR: definition of {0} in {1} contained a newline character.'.
-            format(key, args.source_lang_file))
+  if args.chunked:
+    try:
+      source_defs = read_json_file(
+          os.path.join(os.curdir, args.source_lang_file))
+      synonym_defs = read_json_file(
+          os.path.join(os.curdir, args.source_synonym_file))
+      constant_defs = read_json_file(
+          os.path.join(os.curdir, args.source_constants_file))
+    except InputError as e:
+      print('ERROR: ' + str(e))
       sys.exit(1)
-  sorted_keys = sorted(source_defs.keys())
-
-  # Read in synonyms file, which must be output in every language.
-  synonym_defs = read_json_file(os.path.join(
-      os.curdir, args.source_synonym_file))
-  if '#' in synonym_defs:  # Delete any comment.
-    del synonym_defs['#']
+    write_chunk_manifest(
+        os.path.join(os.curdir, args.output_dir, 'chunks.json'),
+        source_defs, [key for key in synonym_defs if key != '#'],
+        [key for key in constant_defs if key != '#'])
 
-  # synonym_defs is also being sorted to ensure the same order is kept
-  synonym_text = '\n'.join([u'Blockly.Msg["{0}"] = Blockly.Msg["{1}"];'
-      .format(key, synonym_defs[key]) for key in sorted(synonym_defs)])
+  if args.fallback:
+    try:
+      source_defs = read_json_file(
+          os.path.join(os.curdir, args.source_lang_file))
+      synonym_defs = read_json_file(
+          os.path.join(os.curdir, args.source_synonym_file))
+    except InputError as e:
+      print('ERROR: ' + str(e))
+      sys.exit(1)
+    synonym_defs.pop('#', None)
+    outname = os.path.join(os.curdir, args.output_dir, FALLBACK_FILE)
+    if write_fallback_table(outname, source_defs, synonym_defs):
+      if not args.quiet:
+        print('Created {0}'.format(outname))
 
-  # Read in constants file, which must be output in every language.
-  constants_text = load_constants(os.path.join(os.curdir, args.source_constants_file))
-
-  # Create each output file.
-  for arg_file in args.files:
-    (_, filename) = os.path.split(arg_file)
-    target_lang = filename[:filename.index('.')]
-    if target_lang not in ('qqq', 'keys', 'synonyms', 'constants'):
-      target_defs = read_json_file(os.path.join(os.curdir, arg_file))
-
-      # Verify that keys are 'ascii'
-      bad_keys = [key for key in target_defs if not string_is_ascii(key)]
-      if bad_keys:
-        print(u'These keys in {0} contain non ascii characters: {1}'.format(
-            filename, ', '.join(bad_keys)))
-
-      # If there's a '\n' or '\r', remove it and print a warning.
-      for key, value in target_defs.items():
-        if _NEWLINE_PATTERN.search(value):
-          print(u'WARNING: definition of {0} in {1} contained '
-                'a newline character.'.
-                format(key, arg_file))
-          target_defs[key] = _NEWLINE_PATTERN.sub(' ', value)
-
-      # Output file.
-      outname = os.path.join(os.curdir, args.output_dir, target_lang + '.js')
-      with codecs.open(outname, 'w', 'utf-8') as outfile:
-        outfile.write(
-            """// This file was automatically generated.  Do not modify.
+  shared_files = [args.source_lang_file, args.source_synonym_file,
+                  args.source_constants_file]
+  key_ids = None
+  if args.minify_keys:
+    try:
+      keys = []
+      for shared_file in shared_files:
+        keys.extend(key for key in read_json_file(
+            os.path.join(os.curdir, shared_file)) if key != '#')
+    except InputError as e:
+      print('ERROR: ' + str(e))
+      sys.exit(1)
+    key_ids = update_key_map(args.key_map or os.path.join(
+        os.curdir, args.output_dir, 'keymap.json'), keys)
 
-'use strict';
+  # Hash the inputs shared by every output file, including the code that
+  # writes them.  If any of them changed, every output file is rebuilt.  So
+  # is switching output modes.
+  if args.incremental:
+    shared_hash = hashlib.sha256((''.join(
+        file_hash(os.path.join(os.curdir, f)) for f in shared_files) +
+        file_hash(__file__) + file_hash(common.__file__) +
+        repr((args.chunked, args.fallback, sorted((key_ids or {}).items()),
+              args.key_aliases))
+        ).encode('utf-8')).hexdigest()
+    old_outputs = read_manifest(manifest_file)
+    outputs = {}
+    pending = []
+    for arg_file in args.files:
+      (_, filename) = os.path.split(arg_file)
+      target_lang = filename[:filename.index('.')]
+      if target_lang in ('qqq', 'keys', 'synonyms', 'constants'):
+        continue
+      names = output_names(target_lang, args.chunked)
+      input_hash = shared_hash + ':' + file_hash(
+          os.path.join(os.curdir, arg_file))
+      outputs[names[0]] = input_hash
+      if (old_outputs.get(names[0]) != input_hash or not all(
+          os.path.exists(os.path.join(os.curdir, args.output_dir, name))
+          for name in names)):
+        pending.append(arg_file)
+    if not pending:
+      if not args.quiet:
+        print('All {0} output files are up to date.'.format(len(outputs)))
+      write_manifest(manifest_file, outputs)
+      return
+  else:
+    pending = args.files
 
-var Blockly = Blockly || {{ Msg: Object.create(null) }};
+  try:
+    shared = load_shared(args.source_lang_file, args.source_synonym_file,
+                         args.source_constants_file, args.output_dir,
+                         args.quiet, args.chunked,
+                         args.fallback, key_ids, args.key_aliases)
+  except InputError as e:
+    print('ERROR: ' + str(e))
+    sys.exit(1)
 
-""".format(target_lang.replace('-', '.')))
-        # For each key in the source language file, output the target value
-        # if present; otherwise, output the source language value with a
-        # warning comment.
-        for key in sorted_keys:
-          if key in target_defs:
-            value = target_defs[key]
-            comment = ''
-            del target_defs[key]
-          else:
-            value = source_defs[key]
-            comment = '  // untranslated'
-          value = value.replace('"', '\\"')
-          outfile.write(u'Blockly.Msg["{0}"] = "{1}";{2}\n'
-              .format(key, value, comment))
-
-        # Announce any keys defined only for target language.
-        if target_defs:
-          extra_keys = [key for key in target_defs if key not in synonym_defs]
-          synonym_keys = [key for key in target_defs if key in synonym_defs]
-          if not args.quiet:
-            if extra_keys:
-              print(u'These extra keys appeared in {0}: {1}'.format(
-                  filename, ', '.join(extra_keys)))
-            if synonym_keys:
-              print(u'These synonym keys appeared in {0}: {1}'.format(
-                  filename, ', '.join(synonym_keys)))
-
-        outfile.write(synonym_text)
-        outfile.write(constants_text)
+  # Create each output file.  Warnings are collected per file and printed
+  # in input order, so the output is the same however many jobs are used.
+  if args.jobs > 1 and len(pending) > 1:
+    with multiprocessing.Pool(min(args.jobs, len(pending)), _init_worker,
+                              (shared,)) as pool:
+      results = pool.map(create_lang_file, pending)
+  else:
+    _init_worker(shared)
+    results = map(create_lang_file, pending)
+  for messages in results:
+    for message in messages:
+      print(message)
 
-      if not args.quiet:
-        print('Created {0}'.format(outname))
+  if args.incremental:
+    write_manifest(manifest_file, outputs)
 
 
 if __name__ == '__main__':
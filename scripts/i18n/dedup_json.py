@@ -21,9 +21,41 @@
 # limitations under the License.
 
 import argparse
-import codecs
+import functools
 import json
-from common import InputError
+import multiprocessing
+from common import read_json_file, write_text_file
+
+
+def dedup_file(filename, suffix):
+  """Removes duplicate key-value pairs from one JSON file.
+
+  Args:
+    filename: The file to read.
+    suffix: Suffix for the output file name; if empty, the file is changed
+        in place.
+
+  Returns:
+    A list of messages to print, in order.
+
+  Raises:
+    IOError: An I/O error occurred with an input or output file.
+    InputError: Input JSON could not be parsed.
+  """
+  messages = ['Processing ' + filename + '...']
+  # Read in json using Python libraries.  This eliminates duplicates (and
+  # drops @metadata).  Any file name is accepted, as it always has been.
+  j = read_json_file(filename, check_suffix=False)
+
+  # Built up output strings as an array to make output of delimiters easier.
+  output = []
+  for key in j:
+    output.append('\t' + json.dumps(key, ensure_ascii=False) + ': ' +
+                  json.dumps(j[key], ensure_ascii=False))
+
+  # Output results.
+  write_text_file(filename + suffix, '{\n' + ',\n'.join(output) + '\n}\n')
+  return messages
 
 
 def main():
@@ -41,31 +73,21 @@ def main():
                       help='optional suffix for output files; '
                       'if empty, files will be changed in place')
   parser.add_argument('files', nargs='+', help='input files')
+  parser.add_argument('--jobs', type=int, default=1,
+                      help='number of processes to use')
   args = parser.parse_args()
 
-  # Iterate over files.
-  for filename in args.files:
-    # Read in json using Python libraries.  This eliminates duplicates.
-    print('Processing ' + filename + '...')
-    try:
-      with codecs.open(filename, 'r', 'utf-8') as infile:
-        j = json.load(infile)
-    except ValueError as e:
-      print('Error reading ' + filename)
-      raise InputError(filename, str(e))
-
-    # Built up output strings as an array to make output of delimiters easier.
-    output = []
-    for key in j:
-      if key != '@metadata':
-        output.append('\t"' + key + '": "' +
-                      j[key].replace('\n', '\\n') + '"')
-
-    # Output results.
-    with codecs.open(filename + args.suffix, 'w', 'utf-8') as outfile:
-      outfile.write('{\n')
-      outfile.write(',\n'.join(output))
-      outfile.write('\n}\n')
+  # Iterate over files.  Messages are printed in input order, however many
+  # jobs are used.
+  process = functools.partial(dedup_file, suffix=args.suffix)
+  if args.jobs > 1 and len(args.files) > 1:
+    with multiprocessing.Pool(min(args.jobs, len(args.files))) as pool:
+      results = pool.map(process, args.files)
+  else:
+    results = map(process, args.files)
+  for messages in results:
+    for message in messages:
+      print(message)
 
 
 if __name__ == '__main__':
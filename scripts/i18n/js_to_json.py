@@ -23,7 +23,8 @@ Specifically, lines with the following formats are extracted:
     /// Here is a description of the following message.
     Blockly.SOME_KEY = 'Some value';
 
-Adjacent "///" lines are concatenated.
+Adjacent "///" lines are concatenated.  The parsing is available to other
+scripts as extract_messages().
 
 There are two output files, each of which is proper JSON.  For each key, the
 file en.json would get an entry of the form:
@@ -39,20 +40,155 @@ Commas would of course be omitted for the final entry of each value.
 
 import argparse
 import codecs
+import collections
 import json
 import os
 import re
-from common import write_files
+from common import write_files, write_text_file
 
 
-_INPUT_DEF_PATTERN = re.compile("""Blockly.Msg.(\w*)\s*=\s*'(.*)';?\r?$""")
+_INPUT_DEF_PATTERN = re.compile(r"""Blockly\.Msg\.(\w*)\s*=\s*'(.*)';?\r?$""")
 
 _INPUT_SYN_PATTERN = re.compile(
-    """Blockly.Msg.(\w*)\s*=\s*Blockly.Msg.(\w*);""")
+    r"""Blockly\.Msg\.(\w*)\s*=\s*Blockly\.Msg\.(\w*);""")
 
 _CONSTANT_DESCRIPTION_PATTERN = re.compile(
     """{{Notranslate}}""", re.IGNORECASE)
 
+# Records yielded by extract_messages.  line is the 1-based line number of
+# the definition.
+Definition = collections.namedtuple(
+    'Definition', ['key', 'value', 'description', 'line'])
+Synonym = collections.namedtuple('Synonym', ['key', 'target', 'line'])
+Constant = collections.namedtuple(
+    'Constant', ['key', 'value', 'description', 'line'])
+
+
+def _warn(message):
+  print('Warning: ' + message)
+
+
+def _join_description(description, line):
+  """Appends one "///" comment line to a description.
+
+  Lines are joined with a space, except around an explicit "\\n", which
+  becomes a newline.
+  """
+  text = line[3:].strip().replace('\\n', '\n')
+  if not description:
+    return text
+  if description.endswith('\n') or text.startswith('\n'):
+    return description + text
+  return description + ' ' + text
+
+
+def extract_messages(stream, warn=_warn):
+  """Extracts message definitions from the lines of a messages.js file.
+
+  This is a single pass over the input, so it can be used on any iterable
+  of lines, including an open file.  Each "///" comment, which may span
+  several lines, describes the definition that follows it.
+
+  Args:
+    stream: Iterable of lines.
+    warn: Function called with a message for each problem found.
+
+  Yields:
+    A Definition for each translatable message, a Constant for each value
+    that is the same in all languages (described as {{Notranslate}}) and a
+    Synonym for each key defined as another key, in file order.
+  """
+  description = ''
+  for line_number, line in enumerate(stream, 1):
+    if line.startswith('///'):
+      description = _join_description(description, line)
+      continue
+    match = _INPUT_DEF_PATTERN.match(line)
+    if match:
+      key = match.group(1)
+      value = match.group(2).replace("\\'", "'")
+      if not description:
+        warn('No description for ' + key)
+      if _CONSTANT_DESCRIPTION_PATTERN.search(description):
+        yield Constant(key, value, description, line_number)
+      else:
+        yield Definition(key, value, description, line_number)
+      description = ''
+      continue
+    match = _INPUT_SYN_PATTERN.match(line)
+    if match:
+      if description:
+        warn('Description preceding definition of synonym {0}.'.format(
+            match.group(1)))
+        description = ''
+      yield Synonym(match.group(1), match.group(2), line_number)
+
+
+def read_messages(input_file):
+  """Reads message definitions from a messages.js file.
+
+  Args:
+    input_file: Path to the messages.js file.
+
+  Returns:
+    A (results, synonyms, constants) tuple: a list of dictionaries with
+    entries for 'meaning', 'source' and 'description', in file order; a
+    dictionary mapping synonym keys to the keys they stand for; and a
+    dictionary of values that are constant across all languages.
+  """
+  results = []
+  synonyms = {}
+  constants = {}  # Values that are constant across all languages.
+  with codecs.open(input_file, 'r', 'utf-8') as infile:
+    for record in extract_messages(infile):
+      if isinstance(record, Definition):
+        results.append({
+          'meaning': record.key,
+          'source': record.value,
+          'description': record.description,
+        })
+      elif isinstance(record, Constant):
+        constants[record.key] = record.value
+      else:
+        synonyms[record.key] = record.target
+  return results, synonyms, constants
+
+
+def write_messages(author, lang, output_dir, results, synonyms, constants,
+                   quiet):
+  """Writes <lang>.json, qqq.json, synonyms.json and constants.json.
+
+  Args:
+    author: Name and email address of contact for translators.
+    lang: ISO 639-1 source language code.
+    output_dir: Relative directory for output files.
+    results, synonyms, constants: As returned by read_messages().
+    quiet: Whether to only display warnings, not routine info.
+  """
+  # Create <lang_file>.json, keys.json, and qqq.json.
+  write_files(author, lang, output_dir, results, False)
+
+  # Create synonyms.json.
+  synonyms = dict(synonyms)
+  synonym_file_name = os.path.join(os.curdir, output_dir, 'synonyms.json')
+  synonyms['#'] = 'Automatically generated, do not edit this file!'
+  write_text_file(synonym_file_name,
+                  json.dumps(synonyms, indent=2, sort_keys=True))
+  if not quiet:
+    print("Wrote {0} synonym pairs to {1}.".format(
+        len(synonyms) - 1, synonym_file_name))
+
+  # Create constants.json
+  constants = dict(constants)
+  constants_file_name = os.path.join(os.curdir, output_dir, 'constants.json')
+  constants['#'] = 'Automatically generated, do not edit this file!'
+  write_text_file(constants_file_name,
+                  json.dumps(constants, indent=2, sort_keys=True))
+  if not quiet:
+    print("Wrote {0} constant pairs to {1}.".format(
+        len(constants) - 1, constants_file_name))
+
+
 def main():
   # Set up argument parser.
   parser = argparse.ArgumentParser(description='Create translation files.')
@@ -73,63 +209,9 @@ def main():
     args.output_dir += os.path.sep
 
   # Read and parse input file.
-  results = []
-  synonyms = {}
-  constants = {}  # Values that are constant across all languages.
-  description = ''
-  infile = codecs.open(args.input_file, 'r', 'utf-8')
-  for line in infile:
-    if line.startswith('///'):
-      if description:
-        description += ' ' + line[3:].strip()
-      else:
-        description = line[3:].strip()
-    else:
-      match = _INPUT_DEF_PATTERN.match(line)
-      if match:
-        key = match.group(1)
-        value = match.group(2).replace("\\'", "'")
-        if not description:
-          print('Warning: No description for ' + result['meaning'])
-        if (description and _CONSTANT_DESCRIPTION_PATTERN.search(description)):
-          constants[key] = value
-        else:
-          result = {}
-          result['meaning'] = key
-          result['source'] = value
-          result['description'] = description
-          results.append(result)
-        description = ''
-      else:
-        match = _INPUT_SYN_PATTERN.match(line)
-        if match:
-          if description:
-            print('Warning: Description preceding definition of synonym {0}.'.
-                  format(match.group(1)))
-            description = ''
-          synonyms[match.group(1)] = match.group(2)
-  infile.close()
-
-  # Create <lang_file>.json, keys.json, and qqq.json.
-  write_files(args.author, args.lang, args.output_dir, results, False)
-
-  # Create synonyms.json.
-  synonym_file_name = os.path.join(os.curdir, args.output_dir, 'synonyms.json')
-  synonyms['#'] = 'Automatically generated, do not edit this file!'
-  with open(synonym_file_name, 'w') as outfile:
-    json.dump(synonyms, outfile, indent=2, sort_keys=True)
-  if not args.quiet:
-    print("Wrote {0} synonym pairs to {1}.".format(
-        len(synonyms) - 1, synonym_file_name))
-
-  # Create constants.json
-  constants_file_name = os.path.join(os.curdir, args.output_dir, 'constants.json')
-  constants['#'] = 'Automatically generated, do not edit this file!'
-  with open(constants_file_name, 'w') as outfile:
-    json.dump(constants, outfile, indent=2, sort_keys=True)
-  if not args.quiet:
-    print("Wrote {0} constant pairs to {1}.".format(
-        len(constants) - 1, synonym_file_name))
+  results, synonyms, constants = read_messages(args.input_file)
+  write_messages(args.author, args.lang, args.output_dir, results, synonyms,
+                 constants, args.quiet)
 
 if __name__ == '__main__':
   main()
@@ -17,30 +17,509 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+# Run from this directory:  python3 tests.py
+
+import argparse
+import benchmark
 import common
+import contextlib
+import create_messages
+import dedup_json
+import io
+import js_to_json
+import json
+import os
 import re
+import shutil
+import subprocess
+import tempfile
 import unittest
+import watch_messages
+
+
+_MESSAGES_JS = u"""'use strict';
+
+/// {{Notranslate}} Hue value for all logic blocks.
+Blockly.Msg.LOGIC_HUE = '210';
+
+/** @type {string} */
+/// default name - A simple, general default name for a variable.
+/// For more context, see
+/// [[Translating:Blockly#infrequent_message_types]].\\n{{Identical|Item}}
+Blockly.Msg.VARIABLES_DEFAULT_NAME = 'item';
+/// block text - Repeat some blocks.
+/// \\n\\nParameters:\\n* %1 - the number of times
+Blockly.Msg.CONTROLS_REPEAT_TITLE = 'repeat %1 times';
+/// block text - Do these blocks.
+Blockly.Msg.CONTROLS_REPEAT_INPUT_DO = 'do';
+Blockly.Msg.CONTROLS_IF_MSG_THEN = Blockly.Msg.CONTROLS_REPEAT_INPUT_DO;
+/// tooltip - Say "hello".
+Blockly.Msg.TEXT_PRINT_TOOLTIP = 'Print "%1", don\\'t stop.';
+Blockly.Msg.MATH_NUMBER_TOOLTIP = 'A number.';
+"""
+
+
+def _load_messages(text):
+  """Evaluates the Blockly.Msg assignments in generated .js text."""
+  msg = {}
+  fallback = {}
+  for match in re.finditer(r'^"(\w+)": "((?:[^"\\]|\\.)*)",?$', text, re.M):
+    fallback[match.group(1)] = match.group(2)
+  for match in re.finditer(
+      r'^(?:Blockly\.Msg\["(\w+)"\] = (?:"((?:[^"\\]|\\.)*)"|'
+      r'Blockly\.Msg\["(\w+)"\]);|'
+      r'if \(Blockly\.FallbackMsg\) (\[.*\])\.forEach)', text, re.M):
+    if match.group(4):
+      for key in json.loads(match.group(4)):
+        msg[key] = fallback[key]
+    elif match.group(3):
+      msg[match.group(1)] = msg[match.group(3)]
+    else:
+      msg[match.group(1)] = match.group(2)
+  return msg
+
+
+# Loads message files the way each environment does.  'browser' and 'node'
+# wrap each file in the template used to package locales (see
+# scripts/gulpfiles/package_tasks.mjs), and merge the modules into one
+# Blockly.Msg in load order; 'script' runs the files as they are.
+_RUN_PACKAGED_JS = """
+const fs = require('fs');
+const vm = require('vm');
+const [template, mode, ...files] = process.argv.slice(1);
+const msg = {};
+const context = vm.createContext(mode === 'node' ? {} : {Blockly: {Msg: msg}});
+for (const file of files) {
+  let code = fs.readFileSync(file, 'utf8');
+  if (mode !== 'script') {
+    code = fs.readFileSync(template, 'utf8')
+        .replace('<%= amd %>', '[]')
+        .replace('<%= namespace %>', 'Blockly.Msg')
+        .replace('<%= contents %>',
+                 () => code.replace(/goog\\.[^\\n]+/g, ''));
+  }
+  if (mode === 'node') {
+    context.module = {exports: {}};
+    context.exports = context.module.exports;
+  }
+  vm.runInContext(code, context, {filename: file});
+  if (mode === 'node') Object.assign(msg, context.module.exports);
+}
+process.stdout.write(JSON.stringify(msg));
+"""
+
+_UMD_MSG_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 os.pardir, 'package', 'templates',
+                                 'umd-msg.template')
+
+
+def _run_packaged(files, mode):
+  """Runs message files in node and returns the messages they define."""
+  result = subprocess.run(
+      ['node', '-e', _RUN_PACKAGED_JS, _UMD_MSG_TEMPLATE, mode] + files,
+      check=True, stdout=subprocess.PIPE)
+  return json.loads(result.stdout.decode('utf-8'))
+
+
+class TempDirTestCase(unittest.TestCase):
+  """Runs each test in a new directory, with the JSON cache disabled."""
+
+  def setUp(self):
+    self.dir = tempfile.mkdtemp()
+    self.old_cache_dir = common._CACHE_DIR
+    common._CACHE_DIR = ''
+
+  def tearDown(self):
+    common._CACHE_DIR = self.old_cache_dir
+    shutil.rmtree(self.dir)
+
+  def path(self, *names):
+    return os.path.join(self.dir, *names)
+
+  def write_json(self, name, defs):
+    with open(self.path(name), 'w', encoding='utf-8') as outfile:
+      json.dump(defs, outfile, ensure_ascii=False)
+    return self.path(name)
+
+  def read(self, *names):
+    with open(self.path(*names), encoding='utf-8') as infile:
+      return infile.read()
+
+
+class TestCommon(TempDirTestCase):
+  def test_read_json_file_drops_metadata(self):
+    filename = self.write_json('fr.json', {'@metadata': {'a': 'b'},
+                                           'KEY': 'valeur'})
+    self.assertEqual({'KEY': 'valeur'}, common.read_json_file(filename))
+
+  def test_read_json_file_errors(self):
+    with self.assertRaises(common.InputError):
+      common.read_json_file(self.path('fr.txt'))
+    with open(self.path('bad.json'), 'w') as outfile:
+      outfile.write('{"KEY": ')
+    with contextlib.redirect_stdout(io.StringIO()):
+      with self.assertRaises(common.InputError):
+        common.read_json_file(self.path('bad.json'))
+
+  def test_read_json_file_cache(self):
+    common._CACHE_DIR = self.path('cache')
+    filename = self.write_json('fr.json', {'KEY': 'un'})
+    self.assertEqual({'KEY': 'un'}, common.read_json_file(filename))
+    # Modified within the same second, keeping the size: the cached copy
+    # must not be used.
+    self.write_json('fr.json', {'KEY': 'deux'[:2]})
+    self.assertEqual({'KEY': 'de'}, common.read_json_file(filename))
+    defs = common.read_json_file(filename)
+    defs['OTHER'] = 'x'
+    self.assertEqual({'KEY': 'de'}, common.read_json_file(filename))
+
+  def test_write_text_file(self):
+    filename = self.path('out.txt')
+    self.assertTrue(common.write_text_file(filename, u'café'))
+    self.assertFalse(common.write_text_file(filename, u'café'))
+    self.assertTrue(common.write_text_file(filename, u'thé'))
+    self.assertEqual(u'thé', self.read('out.txt'))
+    # No temporary files are left behind.
+    self.assertEqual(['out.txt'], os.listdir(self.dir))
+
+  def test_write_files(self):
+    units = [{'meaning': 'SAY', 'source': 'Say "%1"',
+              'description': 'block text\\nSee {lb}x{rb}', 'key': 'k1'}]
+    with contextlib.redirect_stdout(io.StringIO()):
+      common.write_files('Me', 'en', self.dir, units, True)
+      before = self.read('en.json')
+      common.write_files('Me', 'en', self.dir, units, True)
+    # Unchanged, including the timestamp.
+    self.assertEqual(before, self.read('en.json'))
+    en = json.loads(before)
+    self.assertEqual('Say "%1"', en['SAY'])
+    self.assertEqual(['@metadata', 'SAY'], list(en))
+    self.assertEqual('en', en['@metadata']['locale'])
+    qqq = json.loads(self.read('qqq.json'))
+    self.assertEqual({'SAY': 'block text\nSee {x}'}, qqq)
+    self.assertEqual({'SAY': 'k1'}, json.loads(self.read('keys.json')))
+
+
+class TestJsToJson(TempDirTestCase):
+  def test_extract_messages(self):
+    warnings = []
+    records = list(js_to_json.extract_messages(
+        io.StringIO(_MESSAGES_JS), warnings.append))
+    self.assertEqual(
+        ['Constant', 'Definition', 'Definition', 'Definition', 'Synonym',
+         'Definition', 'Definition'],
+        [type(record).__name__ for record in records])
+    self.assertEqual(('LOGIC_HUE', '210'), records[0][:2])
+    self.assertEqual(
+        'default name - A simple, general default name for a variable. '
+        'For more context, see '
+        '[[Translating:Blockly#infrequent_message_types]].\n'
+        '{{Identical|Item}}', records[1].description)
+    self.assertEqual(
+        'block text - Repeat some blocks.\n\nParameters:\n'
+        '* %1 - the number of times', records[2].description)
+    self.assertEqual(13, records[2].line)
+    self.assertEqual(('CONTROLS_IF_MSG_THEN', 'CONTROLS_REPEAT_INPUT_DO'),
+                     records[4][:2])
+    self.assertEqual('Print "%1", don\'t stop.', records[5].value)
+    self.assertEqual(['No description for MATH_NUMBER_TOOLTIP'], warnings)
+
+  def test_read_messages(self):
+    with open(self.path('messages.js'), 'w', encoding='utf-8') as outfile:
+      outfile.write(_MESSAGES_JS)
+    with contextlib.redirect_stdout(io.StringIO()):
+      results, synonyms, constants = js_to_json.read_messages(
+          self.path('messages.js'))
+    self.assertEqual(['VARIABLES_DEFAULT_NAME', 'CONTROLS_REPEAT_TITLE',
+                      'CONTROLS_REPEAT_INPUT_DO', 'TEXT_PRINT_TOOLTIP',
+                      'MATH_NUMBER_TOOLTIP'],
+                     [result['meaning'] for result in results])
+    self.assertEqual({'CONTROLS_IF_MSG_THEN': 'CONTROLS_REPEAT_INPUT_DO'},
+                     synonyms)
+    self.assertEqual({'LOGIC_HUE': '210'}, constants)
+
+
+class TestCreateMessages(TempDirTestCase):
+  def setUp(self):
+    super().setUp()
+    with open(self.path('messages.js'), 'w', encoding='utf-8') as outfile:
+      outfile.write(_MESSAGES_JS)
+    with contextlib.redirect_stdout(io.StringIO()):
+      js_to_json.write_messages(
+          'Me', 'en', self.dir,
+          *js_to_json.read_messages(self.path('messages.js')), quiet=True)
+    self.fr = self.write_json('fr.json', {
+      '@metadata': {'authors': ['Moi']},
+      'CONTROLS_REPEAT_TITLE': u'répéter %1 fois',
+      'CONTROLS_REPEAT_INPUT_DO': 'faire',
+      'TEXT_PRINT_TOOLTIP': u'Affiche "%1".',
+    })
+    os.mkdir(self.path('js'))
+
+  def build(self, **options):
+    shared = create_messages.load_shared(
+        self.path('en.json'), self.path('synonyms.json'),
+        self.path('constants.json'), self.path('js'), quiet=True, **options)
+    create_messages._init_worker(shared)
+    return create_messages.create_lang_file(self.fr)
+
+  def expected(self):
+    return {
+      'LOGIC_HUE': '210',
+      'VARIABLES_DEFAULT_NAME': 'item',
+      'CONTROLS_REPEAT_TITLE': u'répéter %1 fois',
+      'CONTROLS_REPEAT_INPUT_DO': 'faire',
+      'CONTROLS_IF_MSG_THEN': 'faire',
+      'TEXT_PRINT_TOOLTIP': u'Affiche \\"%1\\".',
+      'MATH_NUMBER_TOOLTIP': 'A number.',
+    }
+
+  def test_lang_file(self):
+    self.assertEqual([], self.build())
+    text = self.read('js', 'fr.js')
+    self.assertIn('Blockly.Msg["MATH_NUMBER_TOOLTIP"] = "A number.";'
+                  '  // untranslated', text)
+    self.assertEqual(self.expected(), _load_messages(text))
+
+  def test_unchanged_file_kept(self):
+    # Every output goes through common.write_text_file, which leaves files
+    # that are already up to date alone.
+    self.build()
+    mtime = os.stat(self.path('js', 'fr.js')).st_mtime_ns
+    os.utime(self.path('js', 'fr.js'), ns=(0, 0))
+    self.build()
+    self.assertEqual(0, os.stat(self.path('js', 'fr.js')).st_mtime_ns)
+    self.assertNotEqual(0, mtime)
+
+  def test_chunked(self):
+    self.build(chunked=True)
+    self.assertEqual(sorted(name + '.js'
+                            for name in create_messages.CHUNK_NAMES),
+                     sorted(os.listdir(self.path('js', 'fr'))))
+    core = _load_messages(self.read('js', 'fr', 'core.js'))
+    self.assertEqual({'LOGIC_HUE': '210'}, core)
+    # Each category chunk only needs core.js.
+    logic = _load_messages(self.read('js', 'fr', 'logic.js'))
+    self.assertEqual({'CONTROLS_IF_MSG_THEN': 'faire'}, logic)
+    merged = {}
+    for name in create_messages.CHUNK_NAMES:
+      merged.update(_load_messages(self.read('js', 'fr', name + '.js')))
+    self.assertEqual(self.expected(), merged)
+    self.assertEqual('logic', create_messages.chunk_name('CONTROLS_IF_MSG'))
+    self.assertEqual('loops', create_messages.chunk_name('CONTROLS_FOR'))
+    self.assertEqual('core', create_messages.chunk_name('UNDO'))
+
+  def write_fallback_table(self):
+    create_messages.write_fallback_table(
+        self.path('js', create_messages.FALLBACK_FILE),
+        common.read_json_file(self.path('en.json')),
+        common.read_json_file(self.path('synonyms.json')))
+
+  def test_fallback(self):
+    messages = self.build(fallback=True)
+    self.assertEqual([], messages)
+    self.write_fallback_table()
+    text = self.read('js', 'fr.js')
+    self.assertNotIn('"A number."', text)
+    self.assertEqual(self.expected(), _load_messages(
+        self.read('js', create_messages.FALLBACK_FILE) + text))
+
+  @unittest.skipUnless(shutil.which('node'), 'needs node')
+  def test_fallback_packaged(self):
+    # Leave the target of the CONTROLS_IF_MSG_THEN synonym untranslated.
+    self.write_json('fr.json', {'CONTROLS_REPEAT_TITLE': u'répéter %1 fois'})
+    self.build(fallback=True)
+    self.write_fallback_table()
+    expected = {
+      'LOGIC_HUE': '210',
+      'VARIABLES_DEFAULT_NAME': 'item',
+      'CONTROLS_REPEAT_TITLE': u'répéter %1 fois',
+      'CONTROLS_REPEAT_INPUT_DO': 'do',
+      'CONTROLS_IF_MSG_THEN': 'do',
+      'TEXT_PRINT_TOOLTIP': 'Print "%1", don\'t stop.',
+      'MATH_NUMBER_TOOLTIP': 'A number.',
+    }
+    files = [self.path('js', create_messages.FALLBACK_FILE),
+             self.path('js', 'fr.js')]
+    self.assertEqual(expected, _run_packaged(files, 'browser'))
+    self.assertEqual(expected, _run_packaged(files, 'node'))
+    # Loaded as plain scripts, the fallback table is in scope.
+    self.assertEqual(expected, _run_packaged(files, 'script'))
+
+  def test_minify_keys(self):
+    keys = ['A', 'B']
+    key_map = self.path('keymap.json')
+    self.assertEqual({'A': '0', 'B': '1'},
+                     create_messages.update_key_map(key_map, keys))
+    # Ids are kept, even for keys that are not output for a while, and are
+    # never reused.
+    self.assertEqual({'B': '1', 'C': '2'},
+                     create_messages.update_key_map(key_map, ['B', 'C']))
+    self.assertEqual({'A': '0', 'D': '3'},
+                     create_messages.update_key_map(key_map, ['A', 'D']))
+    self.assertEqual('10', create_messages._base36(36))
+
+  @unittest.skipUnless(shutil.which('node'), 'needs node')
+  def test_minify_keys_lang_file(self):
+    keys = []
+    for name in ('en.json', 'synonyms.json', 'constants.json'):
+      keys.extend(common.read_json_file(self.path(name)))
+    key_ids = create_messages.update_key_map(self.path('keymap.json'), keys)
+    expected = {key: value.replace('\\"', '"')
+                for key, value in self.expected().items()}
+    files = [self.path('js', 'fr.js')]
+    self.build(key_ids=key_ids)
+    # Every message can still be looked up by its key.
+    for mode in ('script', 'browser'):
+      msg = _run_packaged(files, mode)
+      self.assertEqual(expected, {key: msg[key] for key in expected})
+      self.assertEqual('faire', msg[key_ids['CONTROLS_IF_MSG_THEN']])
+    self.build(key_ids=key_ids, key_aliases=False)
+    msg = _run_packaged(files, 'script')
+    self.assertEqual(expected, {key: msg[key_ids[key]] for key in expected})
+    self.assertNotIn('MATH_NUMBER_TOOLTIP', msg)
+
+  def test_newline_in_source(self):
+    self.write_json('en.json', {'KEY': 'two\nlines'})
+    with self.assertRaises(common.InputError):
+      self.build()
+
+
+class TestWatchMessages(TempDirTestCase):
+  def setUp(self):
+    super().setUp()
+    with open(self.path('messages.js'), 'w', encoding='utf-8') as outfile:
+      outfile.write(_MESSAGES_JS)
+    with contextlib.redirect_stdout(io.StringIO()):
+      js_to_json.write_messages(
+          'Me', 'en', self.dir,
+          *js_to_json.read_messages(self.path('messages.js')), quiet=True)
+    self.write_json('fr.json', {'CONTROLS_REPEAT_INPUT_DO': 'faire'})
+    os.mkdir(self.path('js'))
+    self.watcher = watch_messages.Watcher(argparse.Namespace(
+        input_file=self.path('missing.js'), json_dir=self.dir,
+        output_dir=self.path('js') + os.path.sep, author='Me', quiet=True))
+
+  def poll(self):
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+      count = self.watcher.poll()
+    return count, output.getvalue()
+
+  def write_text(self, name, text):
+    with open(self.path(name), 'w', encoding='utf-8') as outfile:
+      outfile.write(text)
+
+  def set_en(self, key, value):
+    en = json.loads(self.read('en.json'))
+    en[key] = value
+    self.write_json('en.json', en)
+
+  def messages(self, lang):
+    return _load_messages(self.read('js', lang + '.js'))
+
+  def test_poll(self):
+    self.assertEqual((2, ''), self.poll())
+    self.assertEqual('faire', self.messages('fr')['CONTROLS_REPEAT_INPUT_DO'])
+    self.assertEqual((0, ''), self.poll())
+    self.write_json('fr.json', {'CONTROLS_REPEAT_INPUT_DO': 'fais'})
+    self.assertEqual((1, ''), self.poll())
+    self.assertEqual('fais', self.messages('fr')['CONTROLS_REPEAT_INPUT_DO'])
+
+  def test_invalid_target(self):
+    # A file caught mid-save doesn't stop other changes from being built,
+    # and is built once it has been saved.
+    self.poll()
+    self.set_en('MATH_NUMBER_TOOLTIP', 'Any number.')
+    self.write_text('de.json', '{"CONTROLS_REPEAT_INPUT_DO": ')
+    count, output = self.poll()
+    self.assertEqual(2, count)
+    self.assertIn('ERROR', output)
+    self.assertEqual('Any number.', self.messages('fr')['MATH_NUMBER_TOOLTIP'])
+    self.assertFalse(os.path.exists(self.path('js', 'de.js')))
+    self.write_json('de.json', {'CONTROLS_REPEAT_INPUT_DO': 'mache'})
+    self.assertEqual((1, ''), self.poll())
+    self.assertEqual('Any number.', self.messages('de')['MATH_NUMBER_TOOLTIP'])
+    self.assertEqual('mache', self.messages('de')['CONTROLS_REPEAT_INPUT_DO'])
+
+  def test_invalid_shared(self):
+    # Nothing is built while en.json can't be read, and everything that
+    # changed in the meantime is built once it can.
+    self.write_text('en.json', '{"MATH_NUMBER_TOOLTIP": ')
+    with self.assertRaises(common.InputError):
+      self.poll()
+    self.write_json('fr.json', {'CONTROLS_REPEAT_INPUT_DO': 'fais'})
+    with self.assertRaises(common.InputError):
+      self.poll()
+    self.assertFalse(os.path.exists(self.path('js', 'fr.js')))
+    with contextlib.redirect_stdout(io.StringIO()):
+      js_to_json.write_messages(
+          'Me', 'en', self.dir,
+          *js_to_json.read_messages(self.path('messages.js')), quiet=True)
+    self.assertEqual((2, ''), self.poll())
+    self.assertEqual('fais', self.messages('fr')['CONTROLS_REPEAT_INPUT_DO'])
+
+
+class TestDedupJson(TempDirTestCase):
+  def test_dedup_file(self):
+    with open(self.path('fr.json'), 'w', encoding='utf-8') as outfile:
+      outfile.write(u'{"A": "un", "B": "deux\\ntrois", "A": "un"}')
+    dedup_json.dedup_file(self.path('fr.json'), '.out')
+    self.assertEqual({'A': 'un', 'B': u'deux\ntrois'},
+                     json.loads(self.read('fr.json.out')))
+
+  def test_dedup_file_escapes(self):
+    with open(self.path('fr.json'), 'w', encoding='utf-8') as outfile:
+      outfile.write(u'{"A \\"1\\"": "dit \\"oui\\"\\tou \\\\non",'
+                    u' "B": "\u00e9t\u00e9"}')
+    dedup_json.dedup_file(self.path('fr.json'), '.out')
+    self.assertEqual({'A "1"': u'dit "oui"\tou \\non', 'B': u'\u00e9t\u00e9'},
+                     json.loads(self.read('fr.json.out')))
+    self.assertIn(u'"B": "\u00e9t\u00e9"', self.read('fr.json.out'))
+
+  def test_dedup_file_any_name(self):
+    with open(self.path('fr.txt'), 'w', encoding='utf-8') as outfile:
+      outfile.write(u'{"@metadata": {}, "A": "un", "A": "un"}')
+    dedup_json.dedup_file(self.path('fr.txt'), '')
+    self.assertEqual({'A': 'un'}, json.loads(self.read('fr.txt')))
+
+
+class TestBenchmark(TempDirTestCase):
+  def test_make_corpus(self):
+    os.mkdir(self.path('msg'))
+    os.mkdir(self.path('msg', 'json'))
+    with open(self.path('msg', 'messages.js'), 'w',
+              encoding='utf-8') as outfile:
+      outfile.write(_MESSAGES_JS)
+    with open(self.path('msg', 'json', 'fr.json'), 'w',
+              encoding='utf-8') as outfile:
+      json.dump({'CONTROLS_REPEAT_INPUT_DO': 'faire'}, outfile)
+    corpus = self.path('keys10x')
+    os.mkdir(corpus)
+    self.assertEqual({'keys': 50, 'languages': 1},
+                     benchmark.make_corpus('keys10x', self.path('msg'),
+                                           corpus))
+    with open(os.path.join(corpus, 'messages.js'), encoding='utf-8') as infile:
+      records = list(js_to_json.extract_messages(infile, lambda _: None))
+    self.assertEqual(52, len(records))
+    values = {record.key: record.value for record in records
+              if not isinstance(record, js_to_json.Synonym)}
+    self.assertEqual('Print "%1", don\'t stop.',
+                     values['TEXT_PRINT_TOOLTIP_BENCH9'])
+    with contextlib.redirect_stdout(io.StringIO()):
+      for stage in benchmark.STAGES:
+        benchmark._STAGE_FUNCTIONS[stage](corpus)
 
-class TestSequenceFunctions(unittest.TestCase):
-  def test_insert_breaks(self):
-    spaces = re.compile(r'\s+|\\n')
-    def contains_all_chars(orig, result):
-      return re.sub(spaces, '', orig) == re.sub(spaces, '', result)
-
-    sentences = [u'Quay Pegman qua bên trái hoặc bên phải 90 độ.',
-                 u'Foo bar baz this is english that is okay bye.',
-                 u'If there is a path in the specified direction, \nthen ' +
-                 u'do some actions.',
-                 u'If there is a path in the specified direction, then do ' +
-                 u'the first block of actions. Otherwise, do the second ' +
-                 u'block of actions.']
-    for sentence in sentences:
-      output = common.insert_breaks(sentence, 30, 50)
-      self.assertTrue(contains_all_chars(sentence, output),
-                   u'Mismatch between:\n{0}\n{1}'.format(
-                       re.sub(spaces, '', sentence),
-                       re.sub(spaces, '', output)))
+  def test_find_regressions(self):
+    def report(seconds, peak_bytes):
+      return {'corpora': {'real': {'stages': {'create_messages': {
+          'seconds': seconds, 'peak_bytes': peak_bytes}}}}}
+    self.assertEqual([], benchmark.find_regressions(
+        report(1.2, 100), report(1.0, 100), 1.5))
+    self.assertEqual([], benchmark.find_regressions(
+        report(0.02, 100), report(0.01, 100), 1.5))
+    self.assertEqual(2, len(benchmark.find_regressions(
+        report(2.0, 200), report(1.0, 100), 1.5)))
 
 
 if __name__ == '__main__':
-    unittest.main()
+  unittest.main()
@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+
+# Regenerate message files whenever their sources change.
+#
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Watches msg/messages.js and msg/json/*.json and keeps the langfiles
+built from them up to date.
+
+This does the work of js_to_json.py followed by create_messages.py, but
+stays running and keeps every parsed definition in memory, so a change
+only costs re-reading the file that changed and regenerating the outputs
+that depend on it:
+
+  * messages.js: en.json, qqq.json, synonyms.json and constants.json are
+    regenerated, and then every langfile.
+  * en.json, synonyms.json or constants.json: every langfile.
+  * <lang>.json: only <lang>.js.
+
+Changes are found by polling modification times, so no extra services or
+packages are needed.  Run from the repository root:
+
+    python3 scripts/i18n/watch_messages.py
+
+Stop with Ctrl-C.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import create_messages
+import js_to_json
+from common import InputError, read_json_file
+
+
+# Files every langfile depends on.
+_SHARED_FILES = ('en.json', 'synonyms.json', 'constants.json')
+# Files that aren't a language (en.json is both shared and a language).
+_NOT_LANGUAGES = ('qqq.json', 'keys.json', 'synonyms.json', 'constants.json')
+
+
+def file_state(filename):
+  """Returns a value that changes whenever the file does, or None."""
+  try:
+    stat = os.stat(filename)
+  except OSError:
+    return None
+  return (stat.st_mtime_ns, stat.st_size)
+
+
+class Watcher(object):
+  """Keeps parsed definitions in memory and regenerates changed outputs."""
+
+  def __init__(self, args):
+    self.args = args
+    self.states = {}
+    self.shared = None
+    # Whether en.json, synonyms.json or constants.json changed since they
+    # were last read successfully.
+    self.shared_dirty = False
+    # Parsed target language definitions, keyed by path.
+    self.targets = {}
+    # Target .json files whose langfiles haven't been regenerated since
+    # they (or the shared files) changed.
+    self.pending = set()
+
+  def json_path(self, name):
+    return os.path.join(self.args.json_dir, name)
+
+  def log(self, message):
+    if not self.args.quiet:
+      print(message)
+
+  def changed(self, filename):
+    """Records the file's current state and returns whether it changed."""
+    state = file_state(filename)
+    if self.states.get(filename) == state:
+      return False
+    self.states[filename] = state
+    return True
+
+  def update_messages(self):
+    """Regenerates the source .json files from messages.js."""
+    results, synonyms, constants = js_to_json.read_messages(
+        self.args.input_file)
+    js_to_json.write_messages(self.args.author, 'en', self.args.json_dir,
+                              results, synonyms, constants, self.args.quiet)
+
+  def update_shared(self):
+    """Re-reads en.json, synonyms.json and constants.json."""
+    self.shared = create_messages.load_shared(
+        self.json_path('en.json'), self.json_path('synonyms.json'),
+        self.json_path('constants.json'), self.args.output_dir,
+        quiet=self.args.quiet)
+    create_messages._init_worker(self.shared)
+
+  def build(self, filenames):
+    """Regenerates the langfiles for the given .json files."""
+    for filename in sorted(filenames):
+      for message in create_messages.build_lang_file(
+          filename, self.targets[filename]):
+        print(message)
+      self.pending.discard(filename)
+
+  def poll(self):
+    """Checks every watched file once and rebuilds what is out of date.
+
+    Returns:
+      The number of langfiles regenerated.
+    """
+    if os.path.exists(self.args.input_file) and self.changed(
+        self.args.input_file):
+      self.log('Reading ' + self.args.input_file)
+      self.update_messages()
+
+    filenames = glob.glob(self.json_path('*.json'))
+    for filename in filter(self.changed, filenames):
+      name = os.path.basename(filename)
+      if name in _SHARED_FILES:
+        self.shared_dirty = True
+      if name not in _NOT_LANGUAGES:
+        self.pending.add(filename)
+    languages = set(filename for filename in filenames
+                    if os.path.basename(filename) not in _NOT_LANGUAGES)
+    for filename in set(self.targets) - languages:
+      # Deleted; its old langfile is left alone.
+      del self.targets[filename]
+      del self.states[filename]
+    self.pending &= languages
+
+    # The pending work is only cleared once it is done, so that a file
+    # caught mid-edit doesn't cause changes to other files to be lost.
+    if self.shared_dirty:
+      self.update_shared()
+      self.shared_dirty = False
+      self.pending |= languages
+    rebuild = set()
+    for filename in sorted(self.pending):
+      try:
+        self.targets[filename] = read_json_file(filename)
+      except InputError as e:
+        # Probably caught mid-edit.  It stays pending and is read again on
+        # the next poll.
+        print('ERROR: ' + str(e))
+        continue
+      rebuild.add(filename)
+    self.build(rebuild)
+    return len(rebuild)
+
+  def run(self):
+    os.makedirs(self.args.output_dir, exist_ok=True)
+    # Don't regenerate the .json files from messages.js until it changes;
+    # that would discard edits made by translators.
+    self.changed(self.args.input_file)
+    while True:
+      start = time.perf_counter()
+      try:
+        count = self.poll()
+      except InputError as e:
+        # messages.js or a shared file was probably caught mid-edit.
+        # Forget the file's state so that it is read again on the next poll.
+        print('ERROR: ' + str(e))
+        self.states.pop(e.location, None)
+        count = 0
+      if count:
+        self.log('Regenerated {0} file(s) in {1:.0f} ms.'.format(
+            count, (time.perf_counter() - start) * 1000))
+      time.sleep(self.args.interval)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description='Regenerate message files when their sources change.')
+  parser.add_argument('--input_file',
+                      default=os.path.join('msg', 'messages.js'),
+                      help='messages.js file to extract definitions from')
+  parser.add_argument('--json_dir', default=os.path.join('msg', 'json'),
+                      help='directory of .json message files')
+  parser.add_argument('--output_dir', default=os.path.join('build', 'msg'),
+                      help='directory for generated .js files')
+  parser.add_argument(
+      '--author',
+      default='Ellen Spertus <ellen.spertus@gmail.com>',
+      help='name and email address of contact for translators')
+  parser.add_argument('--interval', type=float, default=0.25,
+                      help='seconds between polls')
+  parser.add_argument('--quiet', action='store_true', default=False,
+                      help='only display warnings, not routine info')
+  args = parser.parse_args()
+  if not args.output_dir.endswith(os.path.sep):
+    args.output_dir += os.path.sep
+
+  try:
+    Watcher(args).run()
+  except KeyboardInterrupt:
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+  main()
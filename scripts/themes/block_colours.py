@@ -0,0 +1,93 @@
+# !/usr/bin/env python
+# Derives block style colours, for use from other Python code.
+#
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Usage:
+#    import block_colours
+#    block_colours.derive_style(210)
+#    # {'colourPrimary': '#5b67a5', 'colourSecondary': ..., ...}
+#    block_colours.derive_styles([210, '#5ba55b'])
+#    block_colours.derive_style_map({'logic_blocks': 210})
+#
+# The results are exactly those of create_blockStyles.py.  Hues from 0 to
+# 360 at the default saturation and brightness are looked up in a table
+# built at import; other colours are derived once and then cached, one
+# colour at a time.
+
+import functools
+
+import create_blockStyles
+
+# Most recently used colours to remember, beyond the hue table.
+CACHE_SIZE = 4096
+
+# (colourPrimary, colourSecondary, colourTertiary) for each whole hue from 0
+# to 360, at HSV_SATURATION and BRIGHTNESS_VAL.
+HUE_TABLE = tuple(
+   (style['colourPrimary'], style['colourSecondary'], style['colourTertiary'])
+   for style in create_blockStyles.findOtherColoursBatch(range(361)))
+
+
+def _as_style(colours):
+   return {
+      'colourPrimary': colours[0],
+      'colourSecondary': colours[1],
+      'colourTertiary': colours[2]
+   }
+
+
+def _table_hue(colour):
+   # Returns the colour's index in HUE_TABLE, or None if it has none.
+   try:
+      hue = int(colour)
+   except (TypeError, ValueError):
+      return None
+   return hue if 0 <= hue <= 360 else None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _derive(colour):
+   style = create_blockStyles.findOtherColours(
+      create_blockStyles.findRgbVal(colour))
+   return (style['colourPrimary'], style['colourSecondary'],
+           style['colourTertiary'])
+
+
+#Returns the primary, secondary and tertiary colours for a hue (number or
+#numeric string) or a hex colour (string), as a new dict each time
+def derive_style(colour):
+   hue = _table_hue(colour)
+   if hue is not None:
+      return _as_style(HUE_TABLE[hue])
+   try:
+      hash(colour)
+   except TypeError:
+      # Can't be cached, but create_blockStyles.py may still accept it.
+      return _as_style(_derive.__wrapped__(colour))
+   return _as_style(_derive(colour))
+
+
+#Returns derive_style(colour) for every colour in a sequence
+def derive_styles(colours):
+   return [derive_style(colour) for colour in colours]
+
+
+#Returns a map of style names to derived styles, given a map of style names
+#to colours, as in a create_blockStyles.py input file
+def derive_style_map(colours):
+   names = list(colours)
+   return dict(zip(names, derive_styles(colours[name] for name in names)))
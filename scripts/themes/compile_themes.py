@@ -0,0 +1,200 @@
+# !/usr/bin/env python
+# Compiles theme spec files into Blockly theme definitions.
+#
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#
+# Usage: compile_themes.py [--output_dir <dir>] [--jobs <n>] [--force]
+#                          <specFile> ...
+#
+# Input: JSON theme specs.  Colours may be given as a hue (number) or a hex
+# value (string), as for create_blockStyles.py.
+# Ex: {"name": "tenant",
+#      "base": "classic",
+#      "blockStyles": {"logic_blocks": 210, "loop_blocks": "#5ba55b"},
+#      "categoryStyles": {"logic_category": 210},
+#      "componentStyles": {"workspaceBackgroundColour": "#ffffff",
+#                          "flyoutOpacity": 0.8}}
+#
+# Output: One JSON file per spec, named after the spec file, that can be
+# passed to Blockly.Theme.defineTheme.  Each block style colour becomes an
+# object with colourPrimary, colourSecondary and colourTertiary; each
+# category style colour becomes {"colour": "hexVal"}; hues in
+# componentStyles become hex values.  Block and category styles that are
+# already objects, and every other key, are copied unchanged.
+#
+# Specs are compiled in parallel.  A manifest in the output directory
+# records a hash of each spec and of the colour code, and specs whose hash
+# is unchanged are skipped.
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+
+import block_colours
+import create_blockStyles
+
+# Version of the manifest's own layout.  Changes to the compiled output
+# need no bump: inputHash covers this script and the colour code, so any
+# edit to them already recompiles every spec.  Bump it only if the manifest
+# is stored differently, so that older manifests are ignored rather than
+# misread.
+MANIFEST_VERSION = 1
+MANIFEST_NAME = '.compile_themes.json'
+
+#Replaces the colours in a map of styles with the styles derived from them,
+#leaving any that are already objects alone
+def compileStyles(styles, toStyle):
+   names = [name for name in styles if not isinstance(styles[name], dict)]
+   derived = block_colours.derive_styles([styles[name] for name in names])
+   compiled = dict(styles)
+   for name, style in zip(names, derived):
+      compiled[name] = toStyle(style)
+   return compiled
+
+
+#Converts a theme spec into a Blockly theme definition
+def compileTheme(spec, defaultName):
+   if not isinstance(spec, dict):
+      raise ValueError('a theme spec must be a JSON object')
+   theme = dict(spec)
+   theme.setdefault('name', defaultName)
+   if 'blockStyles' in spec:
+      theme['blockStyles'] = compileStyles(spec['blockStyles'],
+                                           lambda style: style)
+   if 'categoryStyles' in spec:
+      theme['categoryStyles'] = compileStyles(
+            spec['categoryStyles'],
+            lambda style: {'colour': style['colourPrimary']})
+   if 'componentStyles' in spec:
+      components = dict(spec['componentStyles'])
+      hues = [name for name, value in components.items()
+              if name.endswith('Colour') and not isinstance(value, str)]
+      for name, style in zip(hues, block_colours.derive_styles(
+            [components[name] for name in hues])):
+         components[name] = style['colourPrimary']
+      theme['componentStyles'] = components
+   return theme
+
+
+#Returns the hash of everything an output depends on: the spec itself and
+#the code that compiles it
+def inputHash(specFile):
+   digest = hashlib.sha256()
+   for fileName in (specFile, create_blockStyles.__file__,
+                    block_colours.__file__, __file__):
+      with open(fileName, 'rb') as f:
+         digest.update(hashlib.sha256(f.read()).digest())
+   return digest.hexdigest()
+
+
+def outputName(specFile):
+   return os.path.splitext(os.path.basename(specFile))[0] + '.json'
+
+
+#Compiles one spec file.  Runs in a worker process, so errors are returned
+#as a message rather than raised.
+def compileSpec(args):
+   (specFile, outputDir) = args
+   try:
+      with open(specFile) as f:
+         spec = json.load(f)
+      name = os.path.splitext(os.path.basename(specFile))[0]
+      theme = compileTheme(spec, name)
+      with open(os.path.join(outputDir, outputName(specFile)), 'w') as f:
+         f.write(json.dumps(theme, indent=2, sort_keys=True))
+   except (IOError, ValueError, TypeError, KeyError, OverflowError) as err:
+      return '%s: %s' % (specFile, err)
+   return None
+
+
+def readManifest(fileName):
+   try:
+      with open(fileName) as f:
+         manifest = json.load(f)
+   except (IOError, ValueError):
+      return {}
+   if manifest.get('version') != MANIFEST_VERSION:
+      return {}
+   return manifest.get('outputs', {})
+
+
+def writeManifest(fileName, outputs):
+   with open(fileName, 'w') as f:
+      json.dump({'version': MANIFEST_VERSION, 'outputs': outputs}, f,
+                indent=2, sort_keys=True)
+
+
+def main():
+   parser = argparse.ArgumentParser(
+         description='Compile theme specs into Blockly theme definitions.')
+   parser.add_argument('--output_dir', default='themes',
+                       help='directory for compiled themes')
+   parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='number of processes to compile with')
+   parser.add_argument('--force', action='store_true', default=False,
+                       help='compile every spec, even if unchanged')
+   parser.add_argument('--quiet', action='store_true', default=False,
+                       help='only display errors')
+   parser.add_argument('specs', nargs='+', help='theme spec files')
+   args = parser.parse_args()
+
+   os.makedirs(args.output_dir, exist_ok=True)
+   manifestFile = os.path.join(args.output_dir, MANIFEST_NAME)
+   oldOutputs = {} if args.force else readManifest(manifestFile)
+   outputs = {}
+   pending = []
+   for specFile in args.specs:
+      name = outputName(specFile)
+      if name in outputs:
+         print('ERROR: more than one spec would be written to ' + name)
+         sys.exit(1)
+      try:
+         outputs[name] = inputHash(specFile)
+      except IOError as err:
+         print('ERROR: %s: %s' % (specFile, err))
+         sys.exit(1)
+      if (oldOutputs.get(name) != outputs[name] or
+          not os.path.exists(os.path.join(args.output_dir, name))):
+         pending.append(specFile)
+
+   work = [(specFile, args.output_dir) for specFile in pending]
+   if args.jobs > 1 and len(work) > 1:
+      with multiprocessing.Pool(min(args.jobs, len(work))) as pool:
+         errors = pool.map(compileSpec, work)
+   else:
+      errors = list(map(compileSpec, work))
+
+   failed = 0
+   for specFile, error in zip(pending, errors):
+      if error:
+         print('ERROR: ' + error)
+         # Compile it again next time.
+         del outputs[outputName(specFile)]
+         failed += 1
+      elif not args.quiet:
+         print('Compiled ' + specFile)
+   if not args.quiet:
+      print('%d compiled, %d unchanged, %d failed.' % (
+            len(pending) - failed, len(args.specs) - len(pending), failed))
+   writeManifest(manifestFile, outputs)
+   if failed:
+      sys.exit(1)
+
+if __name__ == '__main__':
+   main()
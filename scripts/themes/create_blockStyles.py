@@ -41,10 +41,19 @@ import math
 import json
 import sys
 
+try:
+   import numpy
+except ImportError:
+   # The batch functions below fall back to the pure Python versions.
+   numpy = None
+
 HSV_SATURATION = .45
 BRIGHTNESS_VAL = .65 * 255
 LIGHT_FACTOR = .8
 DARK_FACTOR = .2
+# Range of hues that findRgbValArray converts with numpy.
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
 
 #Change HSV (Hue Saturation Value) to RGB
 #This is adapted to python from the js version found here:
@@ -152,6 +161,104 @@ def findRgbVal(colour):
       rgb = hexToRgb(hexColour)
    return rgb
 
+#Vectorized version of hsvToRgb for an array of hues.  Hues outside
+#[0, 360) give black, as they do in hsvToRgb.
+def hsvToRgbArray(hues, s, brightness):
+   hues = numpy.asarray(hues)
+   if (s == 0):
+      rgb = numpy.full((len(hues), 3), math.floor(brightness))
+      return rgb.astype(numpy.int64)
+   sextant = numpy.floor(hues / 60)
+   remainder = (hues.astype(numpy.float64) / float(60)) - sextant
+   val1 = numpy.full(hues.shape, brightness * (1 - s))
+   val2 = brightness * (1 - (s * remainder))
+   val3 = brightness * (1 - (s * (1 - remainder)))
+   full = numpy.full(hues.shape, float(brightness))
+   zero = numpy.zeros(hues.shape)
+   conditions = [sextant == i for i in range(6)]
+   red = numpy.select(conditions, [full, val2, val1, val1, val3, full], zero)
+   green = numpy.select(conditions, [val3, full, full, val2, val1, val1], zero)
+   blue = numpy.select(conditions, [val1, val1, val3, full, full, val2], zero)
+   return numpy.floor(numpy.stack([red, green, blue], axis=1)).astype(
+         numpy.int64)
+
+
+#Vectorized version of blend for an array of rgb colours
+def blendArray(rgb1, rgbs, factor):
+   factor = max(min(factor, 1), 0)
+   rgb1 = numpy.asarray(rgb1, dtype=numpy.int64)
+   # numpy.round rounds halves to even, as Python's round does.
+   return numpy.round(rgbs + factor * (rgb1 - rgbs)).astype(numpy.int64)
+
+
+#Vectorized version of rgbToHex for an array of rgb colours.  The hex digits
+#are looked up for all colours at once and decoded as a single string.
+def rgbToHexArray(rgbs):
+   digits = numpy.frombuffer(b'0123456789abcdef', dtype=numpy.uint8)
+   nibbles = numpy.stack([rgbs >> 4, rgbs & 0xf], axis=2).reshape(-1, 6)
+   chars = numpy.empty((len(rgbs), 7), dtype=numpy.uint8)
+   chars[:, 0] = ord('#')
+   chars[:, 1:] = digits[nibbles]
+   text = chars.tobytes().decode('ascii')
+   return [text[i:i + 7] for i in range(0, len(text), 7)]
+
+
+#Vectorized version of hexToRgb for a list of hex colours
+def hexToRgbArray(hexColours):
+   return numpy.array([[int(hexColour[1:3], 16), int(hexColour[3:5], 16),
+                        int(hexColour[5:7], 16)] for hexColour in hexColours],
+                      dtype=numpy.int64).reshape(-1, 3)
+
+
+#Vectorized version of findRgbVal for a list of hues and hex colours.
+#Hues that don't fit in an int64 are left to findRgbVal itself.
+def findRgbValArray(colours):
+   hues = []
+   hueIndices = []
+   hexColours = []
+   hexIndices = []
+   rgbs = numpy.zeros((len(colours), 3), dtype=numpy.int64)
+   for index, colour in enumerate(colours):
+      try:
+         hue = int(colour)
+      except (TypeError, ValueError):
+         hexColours.append(colour)
+         hexIndices.append(index)
+         continue
+      except OverflowError:
+         hue = None
+      if hue is not None and INT64_MIN <= hue <= INT64_MAX:
+         hues.append(hue)
+         hueIndices.append(index)
+      else:
+         rgbs[index] = findRgbVal(colour)
+   if hues:
+      rgbs[hueIndices] = hsvToRgbArray(numpy.array(hues, dtype=numpy.int64),
+                                       HSV_SATURATION, BRIGHTNESS_VAL)
+   if hexColours:
+      rgbs[hexIndices] = hexToRgbArray(hexColours)
+   return rgbs
+
+
+#Calculates the primary, secondary and tertiary colours for many colours at
+#once, each either a hue or a hex colour.  Uses numpy if it is installed,
+#giving exactly the same results as findOtherColours(findRgbVal(colour)).
+def findOtherColoursBatch(colours):
+   colours = list(colours)
+   if numpy is None or not colours:
+      return [findOtherColours(findRgbVal(colour)) for colour in colours]
+   rgbs = findRgbValArray(colours)
+   white = [255, 255, 255]
+   black = [0, 0, 0]
+   primary = rgbToHexArray(rgbs)
+   secondary = rgbToHexArray(blendArray(white, rgbs, LIGHT_FACTOR))
+   tertiary = rgbToHexArray(blendArray(black, rgbs, DARK_FACTOR))
+   return [{
+      "colourPrimary": colours[0],
+      "colourSecondary": colours[1],
+      "colourTertiary": colours[2]
+   } for colours in zip(primary, secondary, tertiary)]
+
 # Get info on the input file
 def getFileInfo():
    if (len(sys.argv) < 2):
@@ -170,12 +277,12 @@ def getFileInfo():
 def createColourMap():
    (jsonFile, fileName) = getFileInfo()
    jsonData = json.loads(jsonFile)
-   colourObj = {}
-   for key in jsonData.keys():
-      rgbVal = findRgbVal(jsonData[key])
-      colourObj[key] = findOtherColours(rgbVal)
-      f= open("new_" + fileName,"w+")
-      f.write(json.dumps(colourObj, indent=2, sort_keys=True))
-      f.close()
-
-createColourMap()
+   keys = list(jsonData.keys())
+   styles = findOtherColoursBatch([jsonData[key] for key in keys])
+   colourObj = dict(zip(keys, styles))
+   f= open("new_" + fileName,"w+")
+   f.write(json.dumps(colourObj, indent=2, sort_keys=True))
+   f.close()
+
+if __name__ == '__main__':
+   createColourMap()
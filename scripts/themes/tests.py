@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+
+# Tests of theme scripts.
+#
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Run from this directory:  python3 tests.py
+
+import block_colours
+import compile_themes
+import contextlib
+import create_blockStyles
+import io
+import json
+import numpy
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+
+def findOtherColoursScalar(colours):
+   return [create_blockStyles.findOtherColours(
+         create_blockStyles.findRgbVal(colour)) for colour in colours]
+
+
+class TestFindOtherColoursBatch(unittest.TestCase):
+   def assertMatchesScalar(self, colours):
+      self.assertEqual(findOtherColoursScalar(colours),
+                       create_blockStyles.findOtherColoursBatch(colours))
+
+   def test_hues(self):
+      self.assertMatchesScalar(list(range(-1000, 1001)))
+
+   def test_hue_strings_and_floats(self):
+      self.assertMatchesScalar(['0', '59', '60', '359', '360', '-1',
+                                59.9, 60.0, 359.5, -0.5])
+
+   def test_hex_colours(self):
+      generator = random.Random(0)
+      self.assertMatchesScalar(
+            ['#%06x' % generator.randrange(0x1000000) for _ in range(2000)] +
+            ['#000000', '#ffffff', '#FFFFFF', '#5b80a5'])
+
+   def test_huge_hues(self):
+      # These don't fit in an int64 and are converted one at a time.
+      self.assertMatchesScalar([10**20, -10**20, 2**63, 2**63 - 1, -2**63,
+                                -2**63 - 1, 1e30, str(10**20), 120])
+
+   def test_infinite_hue(self):
+      with self.assertRaises(OverflowError):
+         create_blockStyles.findRgbVal(float('inf'))
+      with self.assertRaises(OverflowError):
+         create_blockStyles.findOtherColoursBatch([120, float('inf')])
+
+   def test_mixed(self):
+      self.assertMatchesScalar([10, '#5b80a5', 10**20, '230', 400])
+
+   def test_empty(self):
+      self.assertEqual([], create_blockStyles.findOtherColoursBatch([]))
+
+
+class TestBlockColours(unittest.TestCase):
+   # Whole hues, hues outside the table, strings, hex colours, huge hues
+   # and repeats.
+   COLOURS = ([0, 59, 210, 360, '120', 59.9, -1, 361, 1000, '400',
+               '#5b80a5', '#FFFFFF', 10**20, 210, '#5b80a5', 1000] +
+              list(range(-10, 370, 7)))
+
+   def test_hue_table(self):
+      self.assertEqual(
+            [(style['colourPrimary'], style['colourSecondary'],
+              style['colourTertiary'])
+             for style in findOtherColoursScalar(range(361))],
+            list(block_colours.HUE_TABLE))
+
+   def test_derive_style(self):
+      self.assertEqual(findOtherColoursScalar(self.COLOURS),
+                       [block_colours.derive_style(colour)
+                        for colour in self.COLOURS])
+
+   def test_derive_styles(self):
+      self.assertEqual(findOtherColoursScalar(self.COLOURS),
+                       block_colours.derive_styles(self.COLOURS))
+      self.assertEqual(findOtherColoursScalar(self.COLOURS),
+                       block_colours.derive_styles(iter(self.COLOURS)))
+      self.assertEqual([], block_colours.derive_styles([]))
+
+   def test_derive_style_map(self):
+      colours = {'logic_blocks': 210, 'loop_blocks': '#5ba55b',
+                 'other_blocks': 400}
+      self.assertEqual(
+            dict(zip(colours, findOtherColoursScalar(colours.values()))),
+            block_colours.derive_style_map(colours))
+
+   def test_new_dicts(self):
+      style = block_colours.derive_style('#5b80a5')
+      style['colourPrimary'] = '#000000'
+      self.assertEqual('#5b80a5',
+                       block_colours.derive_style('#5b80a5')['colourPrimary'])
+
+   def test_unhashable(self):
+      colours = [numpy.array(400), numpy.array(210),
+                 bytearray(b'#5b80a5')]
+      self.assertEqual(findOtherColoursScalar(colours),
+                       block_colours.derive_styles(colours))
+      # As in create_blockStyles.py, a list isn't a colour.
+      with self.assertRaises(TypeError):
+         block_colours.derive_style([210])
+
+
+class TestCompileThemes(unittest.TestCase):
+   def setUp(self):
+      self.dir = tempfile.mkdtemp()
+      self.outputDir = os.path.join(self.dir, 'out')
+      # A non-finite hue overflows when converted to an integer.
+      self.specs = [self.writeSpec('good', {'blockStyles': {'a': 210}}),
+                    self.writeSpec('bad', {'blockStyles': {'a': 1e400}}),
+                    self.writeSpec('other', {'categoryStyles': {'b': 120}})]
+
+   def tearDown(self):
+      shutil.rmtree(self.dir)
+
+   def writeSpec(self, name, spec):
+      fileName = os.path.join(self.dir, name + '.json')
+      with open(fileName, 'w') as f:
+         json.dump(spec, f)
+      return fileName
+
+   def outputFile(self, name):
+      return os.path.join(self.outputDir, name)
+
+   def compile(self, jobs):
+      argv = sys.argv
+      sys.argv = (['compile_themes.py', '--output_dir', self.outputDir,
+                   '--jobs', str(jobs)] + self.specs)
+      try:
+         with contextlib.redirect_stdout(io.StringIO()) as output:
+            with self.assertRaises(SystemExit) as cm:
+               compile_themes.main()
+      finally:
+         sys.argv = argv
+      self.assertEqual(1, cm.exception.code)
+      return output.getvalue()
+
+   def assertSkipsBadSpec(self, jobs):
+      output = self.compile(jobs)
+      self.assertIn('ERROR: ' + self.specs[1], output)
+      self.assertIn('2 compiled, 0 unchanged, 1 failed.', output)
+      with open(self.outputFile('good.json')) as f:
+         self.assertEqual(
+               create_blockStyles.findOtherColoursBatch([210])[0],
+               json.load(f)['blockStyles']['a'])
+      self.assertTrue(os.path.exists(self.outputFile('other.json')))
+      self.assertFalse(os.path.exists(self.outputFile('bad.json')))
+      self.assertEqual(
+            ['good.json', 'other.json'],
+            sorted(compile_themes.readManifest(
+                  self.outputFile(compile_themes.MANIFEST_NAME))))
+
+      # Only the spec that failed is compiled again.
+      os.utime(self.outputFile('good.json'), ns=(0, 0))
+      output = self.compile(jobs)
+      self.assertIn('0 compiled, 2 unchanged, 1 failed.', output)
+      self.assertEqual(0, os.stat(self.outputFile('good.json')).st_mtime_ns)
+
+   def test_serial(self):
+      self.assertSkipsBadSpec(1)
+
+   def test_parallel(self):
+      self.assertSkipsBadSpec(2)
+
+
+if __name__ == '__main__':
+   unittest.main()
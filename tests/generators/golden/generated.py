@@ -1,5 +1,6 @@
-from numbers import Number
 import math
+from numbers import Number
+from collections import Counter
 import random
 import sys
 
@@ -72,7 +73,7 @@ def fail(message):
 
 # Describe this function...
 def test_if():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global ok, unittestResults
   if False:
     fail('if false')
   ok = False
@@ -104,7 +105,7 @@ def test_if():
 
 # Describe this function...
 def test_ifelse():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global ok, unittestResults
   ok = False
   if True:
     ok = True
@@ -120,7 +121,7 @@ def test_ifelse():
 
 # Describe this function...
 def test_equalities():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(2 == 2, True, 'Equal yes')
   assertEquals(3 == 4, False, 'Equal no')
   assertEquals(5 != 6, True, 'Not equal yes')
@@ -136,7 +137,7 @@ def test_equalities():
 
 # Describe this function...
 def test_and():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(True and True, True, 'And true/true')
   assertEquals(False and True, False, 'And false/true')
   assertEquals(True and False, False, 'And true/false')
@@ -144,7 +145,7 @@ def test_and():
 
 # Describe this function...
 def test_or():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(True or True, True, 'Or true/true')
   assertEquals(False or True, True, 'Or false/true')
   assertEquals(True or False, True, 'Or true/false')
@@ -152,13 +153,13 @@ def test_or():
 
 # Describe this function...
 def test_ternary():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(42 if True else 99, 42, 'if true')
   assertEquals(42 if False else 99, 99, 'if true')
 
 # Describe this function...
 def test_foreach():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global log, x, unittestResults
   log = ''
   for x in ['a', 'b', 'c']:
     log = str(log) + str(x)
@@ -166,34 +167,34 @@ def test_foreach():
 
 # Describe this function...
 def test_repeat():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global count, unittestResults
   count = 0
   for count2 in range(10):
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 10, 'repeat 10')
 
 # Describe this function...
 def test_while():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global count, unittestResults
   while False:
     fail('while 0')
   while not True:
     fail('until 0')
   count = 1
   while count != 10:
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 10, 'while 10')
   count = 1
   while not count == 10:
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 10, 'until 10')
 
 # Describe this function...
 def test_repeat_ext():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global count, unittestResults
   count = 0
   for count3 in range(10):
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 10, 'repeat 10')
 
 def upRange(start, stop, step):
@@ -206,9 +207,16 @@ def downRange(start, stop, step):
     yield start
     start -= abs(step)
 
+def intRange(start, stop, step):
+  if not step:
+    return upRange(start, stop, step) if start <= stop else downRange(start, stop, step)
+  if start <= stop:
+    return range(start, stop + 1, abs(step))
+  return range(start, stop - 1, -abs(step))
+
 # Describe this function...
 def test_count_by():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global log, x, loglist, unittestResults
   log = ''
   for x in range(1, 9, 2):
     log = str(log) + str(x)
@@ -225,13 +233,13 @@ def test_count_by():
   x_start = 1 + 0
   x_end = 8 + 0
   x_inc = 1 - 2
-  for x in (x_start <= x_end) and upRange(x_start, x_end, x_inc) or downRange(x_start, x_end, x_inc):
+  for x in intRange(x_start, x_end, x_inc):
     loglist.append(x)
   assertEquals(loglist, [1, 2, 3, 4, 5, 6, 7, 8], 'count up non-trivial ints')
   loglist = []
   x_start2 = 8 + 0
   x_end2 = 1 + 0
-  for x in (x_start2 <= x_end2) and upRange(x_start2, x_end2, 2) or downRange(x_start2, x_end2, 2):
+  for x in range(x_start2, x_end2 + 1, 2) if x_start2 <= x_end2 else range(x_start2, x_end2 - 1, -2):
     loglist.append(x)
   assertEquals(loglist, [8, 6, 4, 2], 'count down non-trivial ints')
   loglist = []
@@ -244,7 +252,7 @@ def test_count_by():
 
 # Describe this function...
 def test_count_loops():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global log, x, loglist, unittestResults
   log = ''
   for x in range(1, 9):
     log = str(log) + str(x)
@@ -256,23 +264,23 @@ def test_count_loops():
   loglist = []
   x_start4 = 1 + 0
   x_end4 = 4 + 0
-  for x in (x_start4 <= x_end4) and upRange(x_start4, x_end4, 1) or downRange(x_start4, x_end4, 1):
+  for x in range(x_start4, x_end4 + 1) if x_start4 <= x_end4 else range(x_start4, x_end4 - 1, -1):
     loglist.append(x)
   assertEquals(loglist, [1, 2, 3, 4], 'count up non-trivial')
   loglist = []
   x_start5 = 3 + 1
   x_end5 = 1 + 0
-  for x in (x_start5 <= x_end5) and upRange(x_start5, x_end5, 1) or downRange(x_start5, x_end5, 1):
+  for x in range(x_start5, x_end5 + 1) if x_start5 <= x_end5 else range(x_start5, x_end5 - 1, -1):
     loglist.append(x)
   assertEquals(loglist, [4, 3, 2, 1], 'count down non-trivial')
 
 # Describe this function...
 def test_continue():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global log, count, x, unittestResults
   log = ''
   count = 0
   while count != 8:
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
     if count == 5:
       continue
     log = str(log) + str(count)
@@ -280,7 +288,7 @@ def test_continue():
   log = ''
   count = 0
   while not count == 8:
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
     if count == 5:
       continue
     log = str(log) + str(count)
@@ -300,18 +308,18 @@ def test_continue():
 
 # Describe this function...
 def test_break():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global log, count, x, unittestResults
   count = 1
   while count != 10:
     if count == 5:
       break
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 5, 'while break')
   count = 1
   while not count == 10:
     if count == 5:
       break
-    count = (count if isinstance(count, Number) else 0) + 1
+    count = count + 1
   assertEquals(count, 5, 'until break')
   log = ''
   for x in range(1, 9):
@@ -328,7 +336,7 @@ def test_break():
 
 # Tests the "single" block.
 def test_single():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(math.sqrt(25), 5, 'sqrt')
   assertEquals(math.fabs(-25), 25, 'abs')
   assertEquals(-(-25), 25, 'negate')
@@ -340,7 +348,7 @@ def test_single():
 # Tests the "arithmetic" block for all operations and checks
 # parenthesis are properly generated for different orders.
 def test_arithmetic():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(1 + 2, 3, 'add')
   assertEquals(1 - 2, -1, 'subtract')
   assertEquals(1 - (0 + 2), -1, 'subtract order with add')
@@ -354,7 +362,7 @@ def test_arithmetic():
 
 # Tests the "trig" block.
 def test_trig():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(math.sin(90 / 180.0 * math.pi), 1, 'sin')
   assertEquals(math.cos(180 / 180.0 * math.pi), -1, 'cos')
   assertEquals(math.tan(0 / 180.0 * math.pi), 0, 'tan')
@@ -364,7 +372,7 @@ def test_trig():
 
 # Tests the "constant" blocks.
 def test_constant():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(math.floor(math.pi * 1000), 3141, 'const pi')
   assertEquals(math.floor(math.e * 1000), 2718, 'const e')
   assertEquals(math.floor(((1 + math.sqrt(5)) / 2) * 1000), 1618, 'const golden')
@@ -372,8 +380,12 @@ def test_constant():
   assertEquals(math.floor(math.sqrt(1.0 / 2) * 1000), 707, 'const sqrt 0.5')
   assertEquals(9999 < float('inf'), True, 'const infinity')
 
+# Primality of every number below 2 ** 20, filled in the first time it is needed.
+math_isPrime_sieve = bytearray()
+
 def math_isPrime(n):
-  # https://en.wikipedia.org/wiki/Primality_test#Naive_methods
+  if type(n) is int and 0 <= n < len(math_isPrime_sieve):
+    return math_isPrime_sieve[n] == 1
   # If n is not a number but a string, try parsing it.
   if not isinstance(n, Number):
     try:
@@ -385,15 +397,45 @@ def math_isPrime(n):
   # False if n is negative, is 1, or not whole, or if n is divisible by 2 or 3.
   if n <= 1 or n % 1 != 0 or n % 2 == 0 or n % 3 == 0:
     return False
-  # Check all the numbers of form 6k +/- 1, up to sqrt(n).
-  for x in range(6, int(math.sqrt(n)) + 2, 6):
-    if n % (x - 1) == 0 or n % (x + 1) == 0:
+  n = int(n)
+  if n < 1 << 20:
+    if not math_isPrime_sieve:
+      # https://en.wikipedia.org/wiki/Sieve_of_Eratosthenes
+      math_isPrime_sieve.extend(bytes([1]) * (1 << 20))
+      math_isPrime_sieve[0] = math_isPrime_sieve[1] = 0
+      for x in range(2, 1 << 10):
+        if math_isPrime_sieve[x]:
+          math_isPrime_sieve[x * x::x] = bytes(len(range(x * x, 1 << 20, x)))
+    return math_isPrime_sieve[n] == 1
+  if n >= 3317044064679887385961981:
+    # https://en.wikipedia.org/wiki/Primality_test#Naive_methods
+    # Check all the numbers of form 6k +/- 1, up to sqrt(n).
+    for x in range(6, int(math.sqrt(n)) + 2, 6):
+      if n % (x - 1) == 0 or n % (x + 1) == 0:
+        return False
+    return True
+  # https://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
+  # These bases give the right answer for every n below the bound above.
+  d = n - 1
+  s = 0
+  while d % 2 == 0:
+    d //= 2
+    s += 1
+  for a in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41):
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+      continue
+    for _ in range(s - 1):
+      x = x * x % n
+      if x == n - 1:
+        break
+    else:
       return False
   return True
 
 # Tests the "number property" blocks.
 def test_number_properties():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(42 % 2 == 0, True, 'even')
   assertEquals(42.1 % 2 == 1, False, 'odd')
   assertEquals(math_isPrime(5), True, 'prime 5')
@@ -410,25 +452,24 @@ def test_number_properties():
 
 # Tests the "round" block.
 def test_round():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(round(42.42), 42, 'round')
   assertEquals(math.ceil(-42.42), -42, 'round up')
   assertEquals(math.floor(42.42), 42, 'round down')
 
 # Tests the "change" block.
 def test_change():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   varToChange = 100
-  varToChange = (varToChange if isinstance(varToChange, Number) else 0) + 42
+  varToChange = varToChange + 42
   assertEquals(varToChange, 142, 'change')
 
-def math_mean(myList):
-  localList = [e for e in myList if isinstance(e, Number)]
-  if not localList: return
-  return float(sum(localList)) / len(localList)
+def math_mean_numbers(myList):
+  if not myList: return
+  return float(sum(myList)) / len(myList)
 
-def math_median(myList):
-  localList = sorted([e for e in myList if isinstance(e, Number)])
+def math_median_numbers(myList):
+  localList = sorted(myList)
   if not localList: return
   if len(localList) % 2 == 0:
     return (localList[len(localList) // 2 - 1] + localList[len(localList) // 2]) / 2.0
@@ -436,6 +477,15 @@ def math_median(myList):
     return localList[(len(localList) - 1) // 2]
 
 def math_modes(some_list):
+  # Count hashable items with a Counter, which keeps them in the order they
+  # were first seen. NaN is not equal to itself, so it is left to the loop below.
+  try:
+    counter = Counter(some_list)
+  except TypeError:
+    counter = None
+  if counter is not None and all(item == item for item in counter):
+    maxCount = max(counter.values(), default=1)
+    return [item for item, item_count in counter.items() if item_count == maxCount]
   modes = []
   # Using a lists of [item, count] to keep count rather than dict
   # to avoid "unhashable" errors when the counted item is itself a list or dict.
@@ -469,12 +519,12 @@ def first_index(my_list, elem):
 
 # Tests the "list operation" blocks.
 def test_operations_on_list():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(sum([3, 4, 5]), 12, 'sum')
   assertEquals(min([3, 4, 5]), 3, 'min')
   assertEquals(max([3, 4, 5]), 5, 'max')
-  assertEquals(math_mean([3, 4, 5]), 4, 'average')
-  assertEquals(math_median([3, 4, 5, 1]), 3.5, 'median')
+  assertEquals(math_mean_numbers([3, 4, 5]), 4, 'average')
+  assertEquals(math_median_numbers([3, 4, 5, 1]), 3.5, 'median')
   assertEquals(math_modes([3, 4, 3]), [3], 'modes')
   assertEquals(math_modes([3, 4, 3, 1, 4]), [3, 4], 'modes multiple')
   assertEquals(math_standard_deviation([3, 3, 3]), 0, 'standard dev')
@@ -482,43 +532,43 @@ def test_operations_on_list():
 
 # Tests the "mod" block.
 def test_mod():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(42 % 5, 2, 'mod')
 
 # Tests the "constrain" block.
 def test_constraint():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(min(max(100, 0), 42), 42, 'constraint')
 
 # Tests the "random integer" block.
 def test_random_integer():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global rand, unittestResults
   rand = random.randint(5, 10)
   assertEquals(rand >= 5 and rand <= 10, True, 'randRange')
   assertEquals(rand % 1 == 0, True, 'randInteger')
 
 # Tests the "random fraction" block.
 def test_random_fraction():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global rand, unittestResults
   rand = random.random()
   assertEquals(rand >= 0 and rand <= 1, True, 'randFloat')
 
 # Describe this function...
 def test_atan2():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(math.atan2(5, -5) / math.pi * 180, 135, 'atan2')
   assertEquals(math.atan2(-12, 0) / math.pi * 180, -90, 'atan2')
 
 # Checks that the number of calls is one in order
 # to confirm that a function was only called once.
 def check_number_of_calls(test_name):
-  global naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   test_name = str(test_name) + 'number of calls'
   assertEquals(number_of_calls, 1, test_name)
 
 # Tests the "create text with" block with varying number of inputs.
 def test_create_text():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals('', '', 'no text')
   assertEquals('Hello', 'Hello', 'create single')
   assertEquals(str(-1), '-1', 'create single number')
@@ -529,12 +579,12 @@ def test_create_text():
 
 # Creates an empty string for use with the empty test.
 def get_empty():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   return ''
 
 # Tests the "is empty" block".
 def test_empty_text():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(not len('Google'), False, 'not empty')
   assertEquals(not len(''), True, 'empty')
   assertEquals(not len(get_empty()), True, 'empty complex')
@@ -542,14 +592,14 @@ def test_empty_text():
 
 # Tests the "length" block.
 def test_text_length():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(len(''), 0, 'zero length')
   assertEquals(len('Google'), 6, 'non-zero length')
   assertEquals(len('car' if True else None), 3, 'length order')
 
 # Tests the "append text" block with different types of parameters.
 def test_append():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global item, unittestResults
   item = 'Miserable'
   item = str(item) + 'Failure'
   assertEquals(item, 'MiserableFailure', 'append text')
@@ -562,7 +612,7 @@ def test_append():
 
 # Tests the "find" block with a variable.
 def test_find_text_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = 'Banana'
   assertEquals(text.find('an') + 1, 2, 'find first simple')
   assertEquals(text.rfind('an') + 1, 4, 'find last simple')
@@ -570,13 +620,13 @@ def test_find_text_simple():
 
 # Creates a string for use with the find test.
 def get_fruit():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return 'Banana'
 
 # Tests the "find" block with a function call.
 def test_find_text_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = 0
   assertEquals(get_fruit().find('an') + 1, 2, 'find first complex')
   check_number_of_calls('find first complex')
@@ -602,7 +652,7 @@ def text_random_letter(text):
 
 # Tests the "get letter" block with a variable.
 def test_get_text_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = 'Blockly'
   assertEquals(text[0], 'B', 'get first simple')
   assertEquals(text[-1], 'y', 'get last simple')
@@ -615,13 +665,13 @@ def test_get_text_simple():
 
 # Creates a string for use with the get test.
 def get_Blockly():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return 'Blockly'
 
 # Tests the "get letter" block with a function call.
 def test_get_text_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, number_of_calls, unittestResults
   text = 'Blockly'
   number_of_calls = 0
   assertEquals(get_Blockly()[0], 'B', 'get first complex')
@@ -657,13 +707,13 @@ def test_get_text_complex():
 
 # Creates a string for use with the substring test.
 def get_numbers():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return '123456789'
 
 # Tests the "get substring" block with a variable.
 def test_substring_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = '123456789'
   assertEquals(text[1 : 3], '23', 'substring # simple')
   assertEquals(text[int((2 if True else None) - 1) : int(3 if True else None)], '23', 'substring # simple order')
@@ -684,7 +734,7 @@ def test_substring_simple():
 
 # Tests the "get substring" block with a function call.
 def test_substring_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = 0
   assertEquals(get_numbers()[1 : 3], '23', 'substring # complex')
   check_number_of_calls('substring # complex')
@@ -732,7 +782,7 @@ def test_substring_complex():
 
 # Tests the "change casing" block.
 def test_case():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = 'Hello World'
   assertEquals(text.upper(), 'HELLO WORLD', 'uppercase')
   assertEquals((text if True else None).upper(), 'HELLO WORLD', 'uppercase order')
@@ -745,7 +795,7 @@ def test_case():
 
 # Tests the "trim" block.
 def test_trim():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = '   abc def   '
   assertEquals(text.strip(), 'abc def', 'trim both')
   assertEquals((text if True else None).strip(), 'abc def', 'trim both order')
@@ -756,7 +806,7 @@ def test_trim():
 
 # Tests the "trim" block.
 def test_count_text():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = 'woolloomooloo'
   assertEquals(text.count('o'), 8, 'len 1')
   assertEquals(text.count('oo'), 4, 'len 2')
@@ -768,7 +818,7 @@ def test_count_text():
 
 # Tests the "trim" block.
 def test_text_reverse():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(''[::-1], '', 'empty string')
   assertEquals('a'[::-1], 'a', 'len 1')
   assertEquals('ab'[::-1], 'ba', 'len 2')
@@ -776,7 +826,7 @@ def test_text_reverse():
 
 # Tests the "trim" block.
 def test_replace():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals('woolloomooloo'.replace('oo', '123'), 'w123ll123m123l123', 'replace all instances 1')
   assertEquals('woolloomooloo'.replace('.oo', 'X'), 'woolloomooloo', 'literal string replacement')
   assertEquals('woolloomooloo'.replace('abc', 'X'), 'woolloomooloo', 'not found')
@@ -788,13 +838,13 @@ def test_replace():
 # Checks that the number of calls is one in order
 # to confirm that a function was only called once.
 def check_number_of_calls2(test_name):
-  global naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   test_name = str(test_name) + 'number of calls'
   assertEquals(number_of_calls, 1, test_name)
 
 # Tests the "create list with" and "create empty list" blocks.
 def test_create_lists():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals([], [], 'create empty')
   assertEquals([True, 'love'], [True, 'love'], 'create items')
   assertEquals(['Eject'] * 3, ['Eject', 'Eject', 'Eject'], 'create repeated')
@@ -802,12 +852,12 @@ def test_create_lists():
 
 # Creates an empty list for use with the empty test.
 def get_empty_list():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   return []
 
 # Tests the "is empty" block.
 def test_lists_empty():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(not len([0]), False, 'not empty')
   assertEquals(not len([]), True, 'empty')
   assertEquals(not len(get_empty_list()), True, 'empty complex')
@@ -815,7 +865,7 @@ def test_lists_empty():
 
 # Tests the "length" block.
 def test_lists_length():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(len([]), 0, 'zero length')
   assertEquals(len(['cat']), 1, 'one length')
   assertEquals(len(['cat', True, []]), 3, 'three length')
@@ -828,7 +878,7 @@ def last_index(my_list, elem):
 
 # Tests the "find" block with a variable.
 def test_find_lists_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Alice', 'Eve', 'Bob', 'Eve']
   assertEquals(first_index(list2, 'Eve'), 2, 'find first simple')
   assertEquals(last_index(list2, 'Eve'), 4, 'find last simple')
@@ -836,13 +886,13 @@ def test_find_lists_simple():
 
 # Creates a list for use with the find test.
 def get_names():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return ['Alice', 'Eve', 'Bob', 'Eve']
 
 # Tests the "find" block with a function call.
 def test_find_lists_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = 0
   assertEquals(first_index(get_names(), 'Eve'), 2, 'find first complex')
   check_number_of_calls('find first complex')
@@ -864,7 +914,7 @@ def test_find_lists_complex():
 
 # Tests the "get" block with a variable.
 def test_get_lists_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Kirk', 'Spock', 'McCoy']
   assertEquals(list2[0], 'Kirk', 'get first simple')
   assertEquals(list2[-1], 'McCoy', 'get last simple')
@@ -877,7 +927,7 @@ def test_get_lists_simple():
 
 # Tests the "get" block with create list call.
 def test_get_lists_create_list():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   assertEquals(['Kirk', 'Spock', 'McCoy'][0], 'Kirk', 'get first create list')
   assertEquals(['Kirk', 'Spock', 'McCoy'][-1], 'McCoy', 'get last simple')
   assertEquals(first_index(['Kirk', 'Spock', 'McCoy'], random.choice(['Kirk', 'Spock', 'McCoy'])) > 0, True, 'get random simple')
@@ -889,13 +939,13 @@ def test_get_lists_create_list():
 
 # Creates a list for use with the get test.
 def get_star_wars():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return ['Kirk', 'Spock', 'McCoy']
 
 # Tests the "get" block with a function call.
 def test_get_lists_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, list2, unittestResults
   list2 = ['Kirk', 'Spock', 'McCoy']
   number_of_calls = 0
   assertEquals(get_star_wars()[0], 'Kirk', 'get first complex')
@@ -935,7 +985,7 @@ def lists_remove_random_item(myList):
 
 # Tests the "get and remove" block.
 def test_getRemove():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Kirk', 'Spock', 'McCoy']
   assertEquals(list2.pop(0), 'Kirk', 'getremove first')
   assertEquals(list2, ['Spock', 'McCoy'], 'getremove first list')
@@ -970,7 +1020,7 @@ def test_getRemove():
 
 # Tests the "remove" block.
 def test_remove():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Kirk', 'Spock', 'McCoy']
   list2.pop(0)
   assertEquals(list2, ['Spock', 'McCoy'], 'remove first list')
@@ -1006,7 +1056,7 @@ def test_remove():
 
 # Tests the "set" block.
 def test_set():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Picard', 'Riker', 'Crusher']
   list2[0] = 'Jean-Luc'
   assertEquals(list2, ['Jean-Luc', 'Riker', 'Crusher'], 'set first list')
@@ -1045,7 +1095,7 @@ def test_set():
 
 # Tests the "insert" block.
 def test_insert():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Picard', 'Riker', 'Crusher']
   list2.insert(0, 'Data')
   assertEquals(list2, ['Data', 'Picard', 'Riker', 'Crusher'], 'insert first list')
@@ -1084,7 +1134,7 @@ def test_insert():
 
 # Tests the "get sub-list" block with a variable.
 def test_sublist_simple():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Columbia', 'Challenger', 'Discovery', 'Atlantis', 'Endeavour']
   assertEquals(list2[1 : 3], ['Challenger', 'Discovery'], 'sublist # simple')
   assertEquals(list2[int((2 if True else None) - 1) : int(3 if True else None)], ['Challenger', 'Discovery'], 'sublist # simple order')
@@ -1109,13 +1159,13 @@ def test_sublist_simple():
 
 # Creates a list for use with the sublist test.
 def get_space_shuttles():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = (number_of_calls if isinstance(number_of_calls, Number) else 0) + 1
   return ['Columbia', 'Challenger', 'Discovery', 'Atlantis', 'Endeavour']
 
 # Tests the "get sub-list" block with a function call.
 def test_sublist_complex():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global number_of_calls, unittestResults
   number_of_calls = 0
   assertEquals(get_space_shuttles()[1 : 3], ['Challenger', 'Discovery'], 'sublist # start complex')
   check_number_of_calls('sublist # start complex')
@@ -1163,57 +1213,69 @@ def test_sublist_complex():
 
 # Tests the "join" block.
 def test_join():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Vulcan', 'Klingon', 'Borg']
   assertEquals(','.join(list2), 'Vulcan,Klingon,Borg', 'join')
   assertEquals(','.join(list2 if True else None), 'Vulcan,Klingon,Borg', 'join order')
 
 # Tests the "split" block.
 def test_split():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   text = 'Vulcan,Klingon,Borg'
   assertEquals(text.split(','), ['Vulcan', 'Klingon', 'Borg'], 'split')
   assertEquals((text if True else None).split(','), ['Vulcan', 'Klingon', 'Borg'], 'split order')
 
+def lists_sort_number(s):
+  # float() only accepts letters alone when they spell one of these, so don't
+  # raise and catch an exception for other words.
+  if isinstance(s, str) and s.isalpha() and s.lower() not in ('inf', 'nan', 'infinity'):
+    return 0
+  try:
+    return float(s)
+  except:
+    return 0
+
+lists_sort_key_funcs = {
+  "NUMERIC": lists_sort_number,
+  "TEXT": str,
+  "IGNORE_CASE": lambda s: str(s).lower()
+}
+
 def lists_sort(my_list, type, reverse):
-  def try_float(s):
-    try:
-      return float(s)
-    except:
-      return 0
-  key_funcs = {
-    "NUMERIC": try_float,
-    "TEXT": str,
-    "IGNORE_CASE": lambda s: str(s).lower()
-  }
-  key_func = key_funcs[type]
   list_cpy = list(my_list)
-  return sorted(list_cpy, key=key_func, reverse=reverse)
+  if type == "NUMERIC":
+    # float() returns floats unchanged and ints up to 2 ** 53 exactly, so a
+    # list of only those sorts the same without a key.
+    classes = {x.__class__ for x in list_cpy}
+    if classes <= {float, int} and (
+        int not in classes or max(map(abs, list_cpy)) <= 9007199254740992):
+      return sorted(list_cpy, reverse=reverse)
+  return sorted(list_cpy, key=lists_sort_key_funcs[type], reverse=reverse)
 
 # Tests the "alphabetic sort" block.
 def test_sort_alphabetic():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Vulcan', 'klingon', 'Borg']
   assertEquals(lists_sort(list2, "TEXT", False), ['Borg', 'Vulcan', 'klingon'], 'sort alphabetic ascending')
   assertEquals(lists_sort(list2 if True else None, "TEXT", False), ['Borg', 'Vulcan', 'klingon'], 'sort alphabetic ascending order')
 
 # Tests the "alphabetic sort ignore case" block.
 def test_sort_ignoreCase():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = ['Vulcan', 'klingon', 'Borg']
   assertEquals(lists_sort(list2, "IGNORE_CASE", False), ['Borg', 'klingon', 'Vulcan'], 'sort ignore case ascending')
   assertEquals(lists_sort(list2 if True else None, "IGNORE_CASE", False), ['Borg', 'klingon', 'Vulcan'], 'sort ignore case ascending order')
 
 # Tests the "numeric sort" block.
 def test_sort_numeric():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = [8, 18, -1]
   assertEquals(lists_sort(list2, "NUMERIC", True), [18, 8, -1], 'sort numeric descending')
   assertEquals(lists_sort(list2 if True else None, "NUMERIC", True), [18, 8, -1], 'sort numeric descending order')
 
 # Tests the "list reverse" block.
 def test_lists_reverse():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global list2, unittestResults
   list2 = [8, 18, -1, 64]
   assertEquals(list(reversed(list2)), [64, -1, 18, 8], 'reverse a copy')
   assertEquals(list2, [8, 18, -1, 64], 'reverse a copy original')
@@ -1222,7 +1284,7 @@ def test_lists_reverse():
 
 # Describe this function...
 def test_procedure():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global proc_w, unittestResults
   procedure_1(8, 2)
   assertEquals(proc_z, 4, 'procedure with global')
   proc_w = False
@@ -1234,19 +1296,19 @@ def test_procedure():
 
 # Describe this function...
 def procedure_1(proc_x, proc_y):
-  global test_name, naked, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global proc_z, unittestResults
   proc_z = proc_x / proc_y
 
 # Describe this function...
 def procedure_2(proc_x):
-  global test_name, naked, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global proc_w, unittestResults
   if proc_x:
     return
   proc_w = True
 
 # Describe this function...
 def test_function():
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global func_c, unittestResults
   assertEquals(function_1(2, 3), -1, 'function with arguments')
   assertEquals(func_z, 'side effect', 'function with side effect')
   func_a = 'unchanged'
@@ -1258,26 +1320,26 @@ def test_function():
 
 # Describe this function...
 def function_1(func_x, func_y):
-  global test_name, naked, proc_x, proc_y, func_a, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global func_z, unittestResults
   func_z = 'side effect'
   return func_x - func_y
 
 # Describe this function...
 def function_2(func_a):
-  global test_name, naked, proc_x, proc_y, func_x, func_y, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   func_a = (func_a if isinstance(func_a, Number) else 0) + 1
   return str(func_a) + str(func_c)
 
 # Describe this function...
 def function_3(func_a):
-  global test_name, naked, proc_x, proc_y, func_x, func_y, n, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global unittestResults
   if func_a:
     return True
   return False
 
 # Describe this function...
 def recurse(n):
-  global test_name, naked, proc_x, proc_y, func_x, func_y, func_a, ok, log, count, varToChange, rand, item, text, number_of_calls, list2, proc_z, func_z, x, proc_w, func_c, if2, loglist, changing_list, list_copy, unittestResults
+  global text, unittestResults
   if n > 0:
     text = ''.join([str(x4) for x4 in [recurse(n - 1), n, recurse(n - 1)]])
   else:
@@ -9,6 +9,7 @@ import {DartGenerator} from '../../build/src/generators/dart/dart_generator.js';
 import {JavascriptGenerator} from '../../build/src/generators/javascript/javascript_generator.js';
 import {LuaGenerator} from '../../build/src/generators/lua/lua_generator.js';
 import {PhpGenerator} from '../../build/src/generators/php/php_generator.js';
+import {pythonGenerator} from '../../build/src/generators/python.js';
 import {PythonGenerator} from '../../build/src/generators/python/python_generator.js';
 import {assert} from '../../node_modules/chai/index.js';
 import {
@@ -230,4 +231,496 @@ suite('Generator', function () {
       });
     });
   });
+
+  suite('Python', function () {
+    // Builders for the JSON state of the blocks used below.  Variables and
+    // procedure parameters are referred to by name, which is also their ID.
+    function stack(...blocks) {
+      for (let i = blocks.length - 1; i > 0; i--) {
+        blocks[i - 1]['next'] = {'block': blocks[i]};
+      }
+      return blocks[0];
+    }
+    function number(value) {
+      return {'type': 'math_number', 'fields': {'NUM': value}};
+    }
+    function text(value) {
+      return {'type': 'text', 'fields': {'TEXT': value}};
+    }
+    function list(...items) {
+      const inputs = {};
+      items.forEach((item, i) => {
+        if (item) inputs['ADD' + i] = {'block': item};
+      });
+      return {
+        'type': 'lists_create_with',
+        'extraState': {'itemCount': items.length},
+        'inputs': inputs,
+      };
+    }
+    function onList(op, value) {
+      return {
+        'type': 'math_on_list',
+        'fields': {'OP': op},
+        'inputs': {'LIST': {'block': value}},
+      };
+    }
+    function get(name) {
+      return {'type': 'variables_get', 'fields': {'VAR': {'id': name}}};
+    }
+    function set(name, value) {
+      return {
+        'type': 'variables_set',
+        'fields': {'VAR': {'id': name}},
+        'inputs': {'VALUE': {'block': value}},
+      };
+    }
+    function change(name, delta) {
+      return {
+        'type': 'math_change',
+        'fields': {'VAR': {'id': name}},
+        'inputs': {'DELTA': {'block': delta}},
+      };
+    }
+    function count(name, from, to, by) {
+      return {
+        'type': 'controls_for',
+        'fields': {'VAR': {'id': name}},
+        'inputs': {
+          'FROM': {'block': from},
+          'TO': {'block': to},
+          'BY': {'block': by},
+        },
+      };
+    }
+    function isPrime(value) {
+      return {
+        'type': 'math_number_property',
+        'fields': {'PROPERTY': 'PRIME'},
+        'inputs': {'NUMBER_TO_CHECK': {'block': value}},
+      };
+    }
+    function print(value) {
+      return {'type': 'text_print', 'inputs': {'TEXT': {'block': value}}};
+    }
+    function define(name, params, ...statements) {
+      const block = {
+        'type': 'procedures_defnoreturn',
+        'extraState': {
+          'params': params.map((param) => ({'name': param, 'id': param})),
+        },
+        'fields': {'NAME': name},
+      };
+      if (statements.length) {
+        block['inputs'] = {'STACK': {'block': stack(...statements)}};
+      }
+      return block;
+    }
+    function call(name) {
+      return {'type': 'procedures_callnoreturn', 'extraState': {'name': name}};
+    }
+
+    setup(function () {
+      this.load = function (variables, blocks) {
+        Blockly.serialization.workspaces.load(
+          {
+            'variables': variables.map((name) => ({'name': name, 'id': name})),
+            'blocks': {'languageVersion': 0, 'blocks': blocks},
+          },
+          this.workspace,
+        );
+      };
+      this.generateCode = function (variables, blocks) {
+        this.load(variables, blocks);
+        return pythonGenerator.workspaceToCode(this.workspace);
+      };
+    });
+
+    suite('getProcedureGlobals', function () {
+      setup(function () {
+        this.assertGlobals = function (procedureName, expected) {
+          const block = Blockly.Procedures.getDefinition(
+            procedureName,
+            this.workspace,
+          );
+          const globals = pythonGenerator.getProcedureGlobals(block);
+          assert.deepEqual(
+            globals.map((variable) => variable.getName()),
+            expected,
+          );
+        };
+      });
+
+      test('Variable only read', function () {
+        this.load(
+          ['x'],
+          [set('x', number(1)), define('f', [], print(get('x')))],
+        );
+        this.assertGlobals('f', []);
+      });
+
+      test('Variable assigned', function () {
+        this.load(
+          ['x'],
+          [print(get('x')), define('f', [], set('x', number(1)))],
+        );
+        this.assertGlobals('f', ['x']);
+      });
+
+      test('Variable assigned and used only in the procedure', function () {
+        this.load(
+          ['x'],
+          [define('f', [], set('x', number(1)), print(get('x')))],
+        );
+        this.assertGlobals('f', []);
+      });
+
+      test('Variable read before it is assigned', function () {
+        this.load(
+          ['x'],
+          [define('f', [], print(get('x')), set('x', number(1)))],
+        );
+        this.assertGlobals('f', ['x']);
+      });
+
+      test('Variable assigned from itself', function () {
+        this.load(['x'], [define('f', [], set('x', get('x')))]);
+        this.assertGlobals('f', ['x']);
+      });
+
+      test('Recursive procedure', function () {
+        this.load(
+          ['x'],
+          [define('f', [], set('x', number(1)), print(get('x')), call('f'))],
+        );
+        this.assertGlobals('f', ['x']);
+      });
+
+      test('Mutually recursive procedures', function () {
+        this.load(
+          ['x'],
+          [
+            define('f', [], set('x', number(1)), call('g')),
+            define('g', [], call('f')),
+          ],
+        );
+        this.assertGlobals('f', ['x']);
+      });
+
+      test('Procedure called from another procedure', function () {
+        this.load(
+          ['x'],
+          [
+            define('f', [], set('x', number(1)), print(get('x'))),
+            define('g', [], call('f')),
+            call('g'),
+          ],
+        );
+        this.assertGlobals('f', []);
+      });
+
+      test('Parameter shadows a workspace variable', function () {
+        this.load(
+          ['x'],
+          [
+            set('x', number(5)),
+            define('f', ['x'], set('x', number(1))),
+            define('g', [], set('x', number(2))),
+          ],
+        );
+        this.assertGlobals('f', []);
+        this.assertGlobals('g', ['x']);
+      });
+
+      test('Generated global statement', function () {
+        const code = this.generateCode(
+          ['x', 'y'],
+          [
+            print(get('x')),
+            define(
+              'f',
+              [],
+              set('x', number(1)),
+              set('y', number(2)),
+              print(get('y')),
+            ),
+          ],
+        );
+        assert.include(code, 'def f():\n  global x\n  x = 1\n  y = 2\n');
+      });
+    });
+
+    suite('Number types', function () {
+      const checkedChange = 'x = (x if isinstance(x, Number) else 0) + 1\n';
+
+      test('Variable set to a number', function () {
+        const code = this.generateCode(
+          ['x'],
+          [stack(set('x', number(1)), change('x', number(1)))],
+        );
+        assert.include(code, '\nx = x + 1\n');
+        assert.notInclude(code, 'Number');
+      });
+
+      test('Variable set to a number and a string', function () {
+        const code = this.generateCode(
+          ['x'],
+          [
+            stack(set('x', number(1)), change('x', number(1))),
+            set('x', text('a')),
+          ],
+        );
+        assert.include(code, 'from numbers import Number\n');
+        assert.include(code, '\n' + checkedChange);
+      });
+
+      test('Unset variable', function () {
+        const code = this.generateCode(['x'], [change('x', number(1))]);
+        assert.include(code, '\n' + checkedChange);
+      });
+
+      test('Procedure parameter', function () {
+        const code = this.generateCode(
+          ['x'],
+          [define('f', ['x'], set('x', number(1)), change('x', number(1)))],
+        );
+        assert.include(code, '\n  ' + checkedChange);
+      });
+
+      test('List of numbers', function () {
+        const code = this.generateCode(
+          [],
+          [
+            print(onList('AVERAGE', list(number(1), number(2.5)))),
+            print(onList('MEDIAN', list(number(1), number(2.5)))),
+          ],
+        );
+        assert.include(code, 'print(math_mean_numbers([1, 2.5]))\n');
+        assert.include(code, 'print(math_median_numbers([1, 2.5]))\n');
+        assert.notInclude(code, 'isinstance');
+      });
+
+      test('List with a non-number member', function () {
+        const code = this.generateCode(
+          [],
+          [
+            print(onList('AVERAGE', list(number(1), text('a')))),
+            print(onList('MEDIAN', list(number(1), text('a')))),
+          ],
+        );
+        assert.include(code, "print(math_mean([1, 'a']))\n");
+        assert.include(code, "print(math_median([1, 'a']))\n");
+        assert.include(code, 'isinstance(e, Number)');
+      });
+
+      test('List with an empty slot', function () {
+        const code = this.generateCode(
+          [],
+          [print(onList('AVERAGE', list(number(1), null)))],
+        );
+        assert.include(code, 'print(math_mean([1, None]))\n');
+      });
+    });
+
+    suite('controls_for', function () {
+      setup(function () {
+        // Generates a loop counting with i, after setting a to 1, b to the
+        // given number and s to 2.
+        this.generateLoop = function (from, to, by, b = 5) {
+          return this.generateCode(
+            ['a', 'b', 's', 'i'],
+            [
+              stack(
+                set('a', number(1)),
+                set('b', number(b)),
+                set('s', number(2)),
+                count('i', from, to, by),
+              ),
+            ],
+          );
+        };
+      });
+
+      test('Integer variables with a literal step', function () {
+        const code = this.generateLoop(get('a'), get('b'), number(1));
+        assert.include(
+          code,
+          '\nfor i in range(a, b + 1) if a <= b else range(a, b - 1, -1):\n',
+        );
+      });
+
+      test('Integer variables with a literal step of 2', function () {
+        const code = this.generateLoop(get('a'), get('b'), number(2));
+        assert.include(
+          code,
+          '\nfor i in range(a, b + 1, 2) if a <= b else range(a, b - 1, -2):\n',
+        );
+      });
+
+      test('Integer variables with a negative literal step', function () {
+        const code = this.generateLoop(get('a'), get('b'), number(-2));
+        assert.include(
+          code,
+          '\nfor i in range(a, b + 1, 2) if a <= b else range(a, b - 1, -2):\n',
+        );
+      });
+
+      test('Integer variable and a literal bound', function () {
+        const code = this.generateLoop(get('a'), number(10), number(1));
+        assert.include(
+          code,
+          '\nfor i in range(a, 11) if a <= 10 else range(a, 9, -1):\n',
+        );
+      });
+
+      test('Integer variable step', function () {
+        const code = this.generateLoop(get('a'), get('b'), get('s'));
+        assert.include(code, '\nfor i in intRange(a, b, s):\n');
+        assert.include(code, '\ndef intRange(start, stop, step):\n');
+      });
+
+      test('Float variable', function () {
+        const code = this.generateLoop(get('a'), get('b'), get('s'), 2.5);
+        assert.include(
+          code,
+          '\nfor i in (a <= b) and upRange(a, b, s) or downRange(a, b, s):\n',
+        );
+        assert.notInclude(code, 'intRange');
+      });
+
+      test('Float step', function () {
+        const code = this.generateLoop(get('a'), get('b'), number(0.5));
+        assert.include(
+          code,
+          '\nfor i in (a <= b) and upRange(a, b, 0.5) or downRange(a, b, 0.5):\n',
+        );
+      });
+    });
+
+    suite('RUNTIME_MODULE', function () {
+      setup(function () {
+        pythonGenerator.RUNTIME_MODULE = 'blockly_runtime';
+      });
+
+      teardown(function () {
+        pythonGenerator.RUNTIME_MODULE = null;
+      });
+
+      test('Helper imported', function () {
+        const code = this.generateCode([], [print(isPrime(number(7)))]);
+        assert.include(code, 'from blockly_runtime import math_isPrime\n');
+        assert.include(code, 'print(math_isPrime(7))\n');
+        assert.notInclude(code, 'def math_isPrime');
+        assert.notInclude(code, 'math_isPrime_sieve');
+        // Only the helper used these.
+        assert.notMatch(code, /^import math$/m);
+        assert.notInclude(code, 'from numbers import Number');
+      });
+
+      test('Imports used only by imported helpers', function () {
+        const values = list(number(1), text('a'));
+        const removeRandom = (mode) => ({
+          'type': 'lists_getIndex',
+          'fields': {'MODE': mode, 'WHERE': 'RANDOM'},
+          'inputs': {'VALUE': {'block': list(number(1))}},
+        });
+        const code = this.generateCode(
+          [],
+          [
+            stack(
+              print(onList('AVERAGE', values)),
+              print(onList('MEDIAN', values)),
+              print(onList('MODE', values)),
+              print(onList('STD_DEV', values)),
+              print({
+                'type': 'text_charAt',
+                'fields': {'WHERE': 'RANDOM'},
+                'inputs': {'VALUE': {'block': text('abc')}},
+              }),
+              print(removeRandom('GET_REMOVE')),
+            ),
+          ],
+        );
+        assert.include(code, 'from blockly_runtime import math_modes\n');
+        assert.include(
+          code,
+          'from blockly_runtime import text_random_letter\n',
+        );
+        assert.include(
+          code,
+          'from blockly_runtime import lists_remove_random_item\n',
+        );
+        assert.notMatch(code, /^import (math|random)$/m);
+        assert.notInclude(code, 'from numbers import Number');
+        assert.notInclude(code, 'from collections import Counter');
+
+        // random.choice is still called in the program itself.
+        const choice = this.generateCode([], [print(removeRandom('GET'))]);
+        assert.match(choice, /^import random$/m);
+        assert.include(choice, 'print(random.choice([1]))\n');
+      });
+
+      test('Helper name taken by a variable', function () {
+        const code = this.generateCode(
+          ['math_isPrime'],
+          [
+            stack(
+              set('math_isPrime', number(7)),
+              print(isPrime(get('math_isPrime'))),
+            ),
+          ],
+        );
+        assert.include(
+          code,
+          'from blockly_runtime import math_isPrime as math_isPrime2\n',
+        );
+        assert.include(code, 'math_isPrime = 7\n');
+        assert.include(code, 'print(math_isPrime2(math_isPrime))\n');
+      });
+
+      test('Helpers used only by other helpers', function () {
+        const code = this.generateCode(
+          [],
+          [
+            print({
+              'type': 'lists_sort',
+              'fields': {'TYPE': 'NUMERIC', 'DIRECTION': '1'},
+              'inputs': {'LIST': {'block': list(number(2), number(1))}},
+            }),
+          ],
+        );
+        assert.include(code, 'from blockly_runtime import lists_sort\n');
+        assert.include(code, 'print(lists_sort([2, 1], "NUMERIC", False))\n');
+        assert.notInclude(code, 'lists_sort_number');
+        assert.notInclude(code, 'lists_sort_key_funcs');
+      });
+
+      test('Helper that depends on the workspace', function () {
+        const code = this.generateCode(
+          [],
+          [
+            print({
+              'type': 'lists_indexOf',
+              'fields': {'END': 'FIRST'},
+              'inputs': {
+                'VALUE': {'block': list(number(2), number(1))},
+                'FIND': {'block': number(1)},
+              },
+            }),
+          ],
+        );
+        assert.include(code, '\ndef first_index(my_list, elem):\n');
+        assert.notInclude(code, 'blockly_runtime');
+      });
+
+      test('Inlined by default', function () {
+        pythonGenerator.RUNTIME_MODULE = null;
+        const code = this.generateCode([], [print(isPrime(number(7)))]);
+        assert.include(code, '\ndef math_isPrime(n):\n');
+        assert.match(code, /^import math$/m);
+        assert.include(code, 'from numbers import Number\n');
+        assert.notInclude(code, 'blockly_runtime');
+      });
+    });
+  });
 });
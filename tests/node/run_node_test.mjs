@@ -24,7 +24,10 @@ console.log(process.cwd());
 
 import * as Blockly from 'blockly-test';
 import {javascriptGenerator} from 'blockly-test/javascript';
+import {pythonGenerator} from 'blockly-test/python';
 import {assert} from 'chai';
+import {spawnSync} from 'child_process';
+import * as fs from 'fs';
 
 const xmlText =
   '<xml xmlns="https://developers.google.com/blockly/xml">\n' +
@@ -137,6 +140,210 @@ const json = {
   },
 };
 
+// Counts from 1 to 3 in steps of s, which is 0, until n reaches 5.
+const countByZeroXmlText =
+  '<xml xmlns="https://developers.google.com/blockly/xml">\n' +
+  '  <variables>\n' +
+  '    <variable id="n">n</variable>\n' +
+  '    <variable id="s">s</variable>\n' +
+  '    <variable id="i">i</variable>\n' +
+  '  </variables>\n' +
+  '  <block type="variables_set">\n' +
+  '    <field name="VAR" id="n">n</field>\n' +
+  '    <value name="VALUE">\n' +
+  '      <block type="math_number"><field name="NUM">0</field></block>\n' +
+  '    </value>\n' +
+  '    <next>\n' +
+  '      <block type="variables_set">\n' +
+  '        <field name="VAR" id="s">s</field>\n' +
+  '        <value name="VALUE">\n' +
+  '          <block type="math_number"><field name="NUM">0</field></block>\n' +
+  '        </value>\n' +
+  '        <next>\n' +
+  '          <block type="controls_for">\n' +
+  '            <field name="VAR" id="i">i</field>\n' +
+  '            <value name="FROM">\n' +
+  '              <block type="math_number"><field name="NUM">1</field></block>\n' +
+  '            </value>\n' +
+  '            <value name="TO">\n' +
+  '              <block type="math_number"><field name="NUM">3</field></block>\n' +
+  '            </value>\n' +
+  '            <value name="BY">\n' +
+  '              <block type="variables_get">\n' +
+  '                <field name="VAR" id="s">s</field>\n' +
+  '              </block>\n' +
+  '            </value>\n' +
+  '            <statement name="DO">\n' +
+  '              <block type="math_change">\n' +
+  '                <field name="VAR" id="n">n</field>\n' +
+  '                <value name="DELTA">\n' +
+  '                  <block type="math_number"><field name="NUM">1</field></block>\n' +
+  '                </value>\n' +
+  '                <next>\n' +
+  '                  <block type="controls_if">\n' +
+  '                    <value name="IF0">\n' +
+  '                      <block type="logic_compare">\n' +
+  '                        <field name="OP">GTE</field>\n' +
+  '                        <value name="A">\n' +
+  '                          <block type="variables_get">\n' +
+  '                            <field name="VAR" id="n">n</field>\n' +
+  '                          </block>\n' +
+  '                        </value>\n' +
+  '                        <value name="B">\n' +
+  '                          <block type="math_number"><field name="NUM">5</field></block>\n' +
+  '                        </value>\n' +
+  '                      </block>\n' +
+  '                    </value>\n' +
+  '                    <statement name="DO0">\n' +
+  '                      <block type="controls_flow_statements">\n' +
+  '                        <field name="FLOW">BREAK</field>\n' +
+  '                      </block>\n' +
+  '                    </statement>\n' +
+  '                  </block>\n' +
+  '                </next>\n' +
+  '              </block>\n' +
+  '            </statement>\n' +
+  '            <next>\n' +
+  '              <block type="text_print">\n' +
+  '                <value name="TEXT">\n' +
+  '                  <block type="variables_get">\n' +
+  '                    <field name="VAR" id="n">n</field>\n' +
+  '                  </block>\n' +
+  '                </value>\n' +
+  '              </block>\n' +
+  '            </next>\n' +
+  '          </block>\n' +
+  '        </next>\n' +
+  '      </block>\n' +
+  '    </next>\n' +
+  '  </block>\n' +
+  '</xml>';
+
+/**
+ * Returns the JSON state of a block.
+ *
+ * @param {string} type The block's type.
+ * @param {!Object<string, *>=} fields Values of its fields, by name.
+ * @param {!Object<string, !Object>=} inputs States of the blocks attached to
+ *     its inputs, by input name.
+ * @param {!Object=} extraState The block's extra state, if it has any.
+ * @returns {!Object} The block's state.
+ */
+function blockState(type, fields = {}, inputs = {}, extraState = undefined) {
+  const state = {'type': type, 'fields': fields, 'inputs': {}};
+  for (const name in inputs) {
+    state['inputs'][name] = {'block': inputs[name]};
+  }
+  if (extraState) {
+    state['extraState'] = extraState;
+  }
+  return state;
+}
+
+/**
+ * Returns the JSON state of a workspace that uses every helper function in
+ * the Python runtime package.
+ *
+ * @returns {!Object} The workspace's state.
+ */
+function runtimeHelpersState() {
+  const number = (value) => blockState('math_number', {'NUM': value});
+  const list = () => blockState('variables_get', {'VAR': {'id': 'l'}});
+  const numbers = () =>
+    blockState('lists_create_with', {}, {'ADD0': number(1)}, {'itemCount': 1});
+  const onList = (op, value) =>
+    blockState('math_on_list', {'OP': op}, {'LIST': value});
+  return {
+    'variables': [
+      {'name': 'l', 'id': 'l'},
+      {'name': 's', 'id': 's'},
+      {'name': 'i', 'id': 'i'},
+    ],
+    'blocks': {
+      'languageVersion': 0,
+      'blocks': [
+        blockState('variables_set', {'VAR': {'id': 's'}}, {'VALUE': number(2)}),
+        // Counting by a variable uses intRange, upRange and downRange.
+        blockState(
+          'controls_for',
+          {'VAR': {'id': 'i'}},
+          {
+            'FROM': number(1),
+            'TO': number(3),
+            'BY': blockState('variables_get', {'VAR': {'id': 's'}}),
+          },
+        ),
+        blockState(
+          'lists_getIndex',
+          {'MODE': 'GET_REMOVE', 'WHERE': 'RANDOM'},
+          {'VALUE': list()},
+        ),
+        blockState(
+          'lists_sort',
+          {'TYPE': 'NUMERIC', 'DIRECTION': '1'},
+          {'LIST': list()},
+        ),
+        blockState(
+          'math_number_property',
+          {'PROPERTY': 'PRIME'},
+          {'NUMBER_TO_CHECK': number(7)},
+        ),
+        onList('AVERAGE', list()),
+        onList('AVERAGE', numbers()),
+        onList('MEDIAN', list()),
+        onList('MEDIAN', numbers()),
+        onList('MODE', list()),
+        onList('STD_DEV', list()),
+        blockState('text_prompt_ext', {'TYPE': 'TEXT'}),
+        blockState(
+          'text_charAt',
+          {'WHERE': 'RANDOM'},
+          {'VALUE': blockState('text', {'TEXT': 'abc'})},
+        ),
+      ],
+    },
+  };
+}
+
+/**
+ * Finds the top-level functions and variables that Python code defines.
+ *
+ * @param {string} code Python code, with a blank line between definitions.
+ * @returns {!Map<string, string>} The text of each definition, including any
+ *     comments before it, by the name it defines.
+ */
+function pythonDefinitions(code) {
+  const definitions = new Map();
+  for (const chunk of code.split(/\n\n+/)) {
+    const match = chunk.match(/^(?:#.*\n)*(?:def (\w+)\(|(\w+) = )/);
+    if (match) {
+      definitions.set(match[1] || match[2], chunk.trim());
+    }
+  }
+  return definitions;
+}
+
+/**
+ * Runs Python code with python3.
+ *
+ * @param {Mocha.Context} context The running test, which is skipped if
+ *     python3 isn't installed.
+ * @param {string} code The code to run.
+ * @returns {string} What the code printed.
+ */
+function runPython(context, code) {
+  const result = spawnSync('python3', ['-c', code], {
+    encoding: 'utf8',
+    timeout: 10000,
+  });
+  if (result.error && result.error.code === 'ENOENT') {
+    context.skip();
+  }
+  assert.isUndefined(result.error);
+  assert.equal(result.stderr, '');
+  return result.stdout;
+}
+
 suite('Test Node.js', function () {
   test('Import XML', function () {
     const xml = Blockly.utils.xml.textToDom(xmlText);
@@ -189,3 +396,72 @@ suite('Test Node.js', function () {
     assert.equal(field.getText(), 'firstOption');
   });
 });
+
+suite('Python generator', function () {
+  test('Count with a variable step of 0', function () {
+    const xml = Blockly.utils.xml.textToDom(countByZeroXmlText);
+    const workspace = new Blockly.Workspace();
+    Blockly.Xml.domToWorkspace(xml, workspace);
+
+    const code = pythonGenerator.workspaceToCode(workspace);
+
+    assert.include(code, '\nfor i in intRange(1, 3, s):\n');
+    // range() raises an exception for a step of 0, but a count block keeps
+    // repeating its first value.
+    assert.equal(runPython(this, code), '5\n');
+  });
+});
+
+suite('Python runtime package', function () {
+  setup(function () {
+    const readFile = (path) =>
+      fs.readFileSync(new URL('../../' + path, import.meta.url), 'utf8');
+    this.source = readFile(
+      'generators/python/runtime/blockly_runtime/__init__.py',
+    );
+    this.packageJson = JSON.parse(readFile('package.json'));
+    this.workspace = new Blockly.Workspace();
+    Blockly.serialization.workspaces.load(
+      runtimeHelpersState(),
+      this.workspace,
+    );
+  });
+
+  teardown(function () {
+    pythonGenerator.RUNTIME_MODULE = null;
+  });
+
+  test('Helpers match the generated definitions', function () {
+    const expected = pythonDefinitions(this.source);
+    expected.delete('__version__');
+    expected.delete('__all__');
+
+    const code = pythonGenerator.workspaceToCode(this.workspace);
+    const actual = pythonDefinitions(code);
+
+    for (const [name, definition] of expected) {
+      assert.equal(actual.get(name), definition, name);
+    }
+  });
+
+  test('Every exported helper is imported', function () {
+    const exported = this.source
+      .match(/^__all__ = \[\n([^\]]*)\]/m)[1]
+      .match(/\w+/g);
+
+    pythonGenerator.RUNTIME_MODULE = 'blockly_runtime';
+    const code = pythonGenerator.workspaceToCode(this.workspace);
+    const imported = Array.from(
+      code.matchAll(/^from blockly_runtime import (\w+)$/gm),
+      (match) => match[1],
+    );
+
+    assert.sameMembers(imported, exported);
+    assert.notMatch(code, /^def /m);
+  });
+
+  test('Version matches package.json', function () {
+    const version = this.source.match(/^__version__ = '(.*)'$/m)[1];
+    assert.equal(version, this.packageJson.version);
+  });
+});